@@ -0,0 +1,254 @@
+# chat-service/broadcast.py
+# 채팅방 브로드캐스트 백엔드 (워커 / 컨테이너 간 메시지 전달)
+import asyncio
+import json
+import os
+import uuid
+
+from db import DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME
+
+# memory: 단일 프로세스 (기본값)
+# postgres: LISTEN/NOTIFY (추가 인프라 없이 여러 워커 / 컨테이너)
+# redis: Redis Pub/Sub (REDIS_URL 필요)
+CHAT_BROADCAST_BACKEND = os.getenv("CHAT_BROADCAST_BACKEND", "memory").lower()
+CHAT_BROADCAST_CHANNEL = os.getenv("CHAT_BROADCAST_CHANNEL", "chat_broadcast")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# 구독 연결이 끊겼을 때 재연결 대기 시간 (초)
+CHAT_BROADCAST_RECONNECT = float(os.getenv("CHAT_BROADCAST_RECONNECT", "1.0"))
+
+# NOTIFY payload 최대 크기 (PostgreSQL 기본 8000 bytes)
+PG_NOTIFY_MAX_BYTES = 7900
+
+
+class BroadcastBackend:
+    """
+    브로드캐스트 백엔드 공통 인터페이스
+    - publish: 모든 노드(자기 자신 포함)에 방 메시지 전달
+    - 수신한 메시지는 start()에서 받은 콜백으로 넘김 (각 노드가 자기 소켓에만 전송)
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.node_id = uuid.uuid4().hex
+        self._on_message = None
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+
+    async def start(self, on_message):
+        self._on_message = on_message
+
+    async def close(self):
+        pass
+
+    async def publish(self, room_id: int, message: dict, exclude=None):
+        raise NotImplementedError
+
+    def _envelope(self, room_id: int, message: dict, exclude) -> str:
+        return json.dumps({
+            "node": self.node_id,
+            "room_id": room_id,
+            "exclude": exclude,
+            "message": message,
+        }, ensure_ascii=False, default=str)
+
+    async def _dispatch(self, raw):
+        """다른 노드(또는 자신)가 보낸 envelope 처리"""
+        try:
+            envelope = json.loads(raw)
+        except (TypeError, ValueError):
+            self.errors += 1
+            return
+        self.received += 1
+        # exclude(보낸 소켓)는 보낸 노드에서만 의미가 있음
+        exclude = envelope.get("exclude") if envelope.get("node") == self.node_id else None
+        await self._on_message(envelope["room_id"], envelope["message"], exclude)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "node_id": self.node_id,
+            "published": self.published,
+            "received": self.received,
+            "errors": self.errors,
+        }
+
+
+class MemoryBackend(BroadcastBackend):
+    """단일 프로세스용 (직렬화 없이 바로 전달)"""
+
+    name = "memory"
+
+    async def publish(self, room_id: int, message: dict, exclude=None):
+        self.published += 1
+        self.received += 1
+        await self._on_message(room_id, message, exclude)
+
+
+class PostgresBackend(BroadcastBackend):
+    """PostgreSQL LISTEN/NOTIFY (전용 LISTEN 연결 + NOTIFY용 작은 풀)"""
+
+    name = "postgres"
+
+    def __init__(self, dsn: str = None, channel: str = CHAT_BROADCAST_CHANNEL):
+        super().__init__()
+        self.dsn = dsn or f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+        self.channel = channel
+        self._pool = None
+        self._listen_task = None
+        self._dispatch_task = None
+        # 알림 콜백은 동기 함수라 큐에 넣고 한 태스크에서 순서대로 처리
+        self._inbox = asyncio.Queue()
+        self.reconnects = 0
+        self.oversized = 0
+
+    async def start(self, on_message):
+        import asyncpg
+
+        await super().start(on_message)
+        self._pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=4)
+        self._dispatch_task = asyncio.create_task(self._dispatch_loop())
+        connected = asyncio.Event()
+        self._listen_task = asyncio.create_task(self._listen_loop(connected))
+        await connected.wait()
+
+    async def _listen_loop(self, connected: asyncio.Event):
+        import asyncpg
+
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _conn: closed.set())
+                await conn.add_listener(
+                    self.channel,
+                    lambda _conn, _pid, _channel, payload: self._inbox.put_nowait(payload)
+                )
+                connected.set()
+                print(f"[Broadcast] LISTEN {self.channel}")
+                await closed.wait()
+            except asyncio.CancelledError:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+                raise
+            except Exception as e:
+                self.errors += 1
+                print(f"[Broadcast] LISTEN 연결 오류: {e}")
+            # 시작 시 DB가 아직 안 떠 있어도 앱은 뜨도록 대기 해제
+            connected.set()
+            self.reconnects += 1
+            await asyncio.sleep(CHAT_BROADCAST_RECONNECT)
+
+    async def _dispatch_loop(self):
+        while True:
+            payload = await self._inbox.get()
+            try:
+                await self._dispatch(payload)
+            except Exception as e:
+                self.errors += 1
+                print(f"[Broadcast] 전달 오류: {e}")
+
+    async def close(self):
+        for task in (self._listen_task, self._dispatch_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if self._pool:
+            await self._pool.close()
+
+    async def publish(self, room_id: int, message: dict, exclude=None):
+        payload = self._envelope(room_id, message, exclude)
+        if len(payload.encode()) > PG_NOTIFY_MAX_BYTES:
+            # NOTIFY 한도 초과 시 이 노드의 소켓에만 전달
+            self.oversized += 1
+            print(f"[Broadcast] payload 크기 초과, 로컬 전달만 수행 (room {room_id})")
+            await self._on_message(room_id, message, exclude)
+            return
+        await self._pool.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+        self.published += 1
+
+    def stats(self) -> dict:
+        return {**super().stats(), "reconnects": self.reconnects, "oversized": self.oversized}
+
+
+class RedisBackend(BroadcastBackend):
+    """Redis Pub/Sub (redis-py asyncio 클라이언트)"""
+
+    name = "redis"
+
+    def __init__(self, url: str = REDIS_URL, channel: str = CHAT_BROADCAST_CHANNEL):
+        super().__init__()
+        self.url = url
+        self.channel = channel
+        self._client = None
+        self._listen_task = None
+        self.reconnects = 0
+
+    async def start(self, on_message):
+        import redis.asyncio as redis
+
+        await super().start(on_message)
+        self._client = redis.from_url(self.url)
+        subscribed = asyncio.Event()
+        self._listen_task = asyncio.create_task(self._listen_loop(subscribed))
+        await subscribed.wait()
+
+    async def _listen_loop(self, subscribed: asyncio.Event):
+        while True:
+            pubsub = self._client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                subscribed.set()
+                print(f"[Broadcast] SUBSCRIBE {self.channel}")
+                async for item in pubsub.listen():
+                    if item.get("type") == "message":
+                        try:
+                            await self._dispatch(item["data"])
+                        except Exception as e:
+                            self.errors += 1
+                            print(f"[Broadcast] 전달 오류: {e}")
+            except asyncio.CancelledError:
+                await pubsub.aclose()
+                raise
+            except Exception as e:
+                self.errors += 1
+                print(f"[Broadcast] SUBSCRIBE 연결 오류: {e}")
+            await pubsub.aclose()
+            subscribed.set()
+            self.reconnects += 1
+            await asyncio.sleep(CHAT_BROADCAST_RECONNECT)
+
+    async def close(self):
+        if self._listen_task:
+            self._listen_task.cancel()
+            try:
+                await self._listen_task
+            except asyncio.CancelledError:
+                pass
+        if self._client:
+            await self._client.aclose()
+
+    async def publish(self, room_id: int, message: dict, exclude=None):
+        await self._client.publish(self.channel, self._envelope(room_id, message, exclude))
+        self.published += 1
+
+    def stats(self) -> dict:
+        return {**super().stats(), "reconnects": self.reconnects}
+
+
+BACKENDS = {
+    "memory": MemoryBackend,
+    "postgres": PostgresBackend,
+    "redis": RedisBackend,
+}
+
+
+def create_backend(name: str = CHAT_BROADCAST_BACKEND) -> BroadcastBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"지원하지 않는 브로드캐스트 백엔드: {name}")
+    return BACKENDS[name]()
@@ -2,15 +2,183 @@
 # WebSocket 연결 관리자
 from fastapi import WebSocket
 from typing import Dict, List
+from collections import deque
+import asyncio
 import json
+import os
+import time
 
+from broadcast import BroadcastBackend, create_backend
+
+# 소켓 하나당 전송 대기 한도 (초, 넘으면 끊긴 연결로 보고 제거)
+CHAT_SEND_TIMEOUT = float(os.getenv("CHAT_SEND_TIMEOUT", "5.0"))
+# 연결별 송신 큐 한도 (개수 / 바이트)
+CHAT_OUTBOUND_QUEUE_SIZE = int(os.getenv("CHAT_OUTBOUND_QUEUE_SIZE", "256"))
+CHAT_OUTBOUND_QUEUE_BYTES = int(os.getenv("CHAT_OUTBOUND_QUEUE_BYTES", str(1024 * 1024)))
+# 큐가 가득 찼을 때 처리 방식
+# disconnect: 연결 종료 (클라이언트가 재연결 후 메시지 기록을 다시 조회)
+# drop_oldest: 가장 오래된 대기 메시지를 버리고 새 메시지 추가
+CHAT_SLOW_CLIENT_POLICY = os.getenv("CHAT_SLOW_CLIENT_POLICY", "disconnect").lower()
+
+# 최신 상태만 의미 있는 이벤트 (큐에 같은 이벤트가 남아 있으면 덮어씀)
+COALESCED_EVENT_TYPES = ("typing", "read")
 
-class ConnectionManager:
-    """WebSocket 연결 관리"""
+
+class RoomFanoutMetrics:
+    """방별 브로드캐스트 지연 시간 집계"""
 
     def __init__(self):
-        # room_id -> List[WebSocket]
-        self.active_connections: Dict[int, List[WebSocket]] = {}
+        self.fanouts = 0
+        self.recipients = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+        self.timeouts = 0
+        self.errors = 0
+        self.evicted = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def record(self, recipients: int, elapsed_ms: float):
+        self.fanouts += 1
+        self.recipients += recipients
+        self.total_ms += elapsed_ms
+        self.last_ms = elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def stats(self) -> dict:
+        return {
+            "fanouts": self.fanouts,
+            "recipients": self.recipients,
+            "avg_ms": round(self.total_ms / self.fanouts, 2) if self.fanouts else 0,
+            "max_ms": round(self.max_ms, 2),
+            "last_ms": round(self.last_ms, 2),
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "evicted": self.evicted,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+
+class ClientConnection:
+    """
+    WebSocket 연결 하나의 송신 큐 + 전용 writer 태스크
+    - 브로드캐스트는 큐에 넣기만 하고 바로 반환 (받는 쪽이 느려도 보내는 쪽은 대기하지 않음)
+    - typing / read 이벤트는 큐에 남아 있는 같은 이벤트를 최신 값으로 덮어씀
+    - 큐 한도(개수 / 바이트)를 넘으면 정책에 따라 오래된 메시지를 버리거나 연결 종료
+    """
+
+    def __init__(self, websocket: WebSocket, room_id: int, on_failure):
+        self.websocket = websocket
+        self.room_id = room_id
+        self._on_failure = on_failure
+        self._queue = deque()     # [coalesce_key, text, size]
+        self._coalesce = {}       # coalesce_key -> 큐 안의 항목
+        self._queued_bytes = 0
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self.closed = False
+
+    def start(self):
+        self._task = asyncio.create_task(self._writer())
+
+    def stop(self):
+        self.closed = True
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    def enqueue(self, text: str, size: int, coalesce_key=None, metrics: RoomFanoutMetrics = None) -> bool:
+        """송신 큐에 추가, 정책상 연결을 끊어야 하면 False"""
+        if self.closed:
+            return True
+
+        if coalesce_key is not None:
+            entry = self._coalesce.get(coalesce_key)
+            if entry is not None:
+                self._queued_bytes += size - entry[2]
+                entry[1] = text
+                entry[2] = size
+                if metrics:
+                    metrics.coalesced += 1
+                return True
+
+        while len(self._queue) >= CHAT_OUTBOUND_QUEUE_SIZE or \
+                (self._queue and self._queued_bytes + size > CHAT_OUTBOUND_QUEUE_BYTES):
+            if CHAT_SLOW_CLIENT_POLICY != "drop_oldest":
+                return False
+            self._pop()
+            if metrics:
+                metrics.dropped += 1
+
+        entry = [coalesce_key, text, size]
+        self._queue.append(entry)
+        self._queued_bytes += size
+        if coalesce_key is not None:
+            self._coalesce[coalesce_key] = entry
+        self._wakeup.set()
+        return True
+
+    def send(self, message: dict, metrics: RoomFanoutMetrics = None) -> bool:
+        """이 연결에만 보낼 메시지를 송신 큐에 추가 (writer 태스크가 다른 프레임과 순서대로 전송)"""
+        text = json.dumps(message, ensure_ascii=False, separators=(",", ":"), default=str)
+        return self.enqueue(text, len(text.encode()), metrics=metrics)
+
+    def _pop(self) -> str:
+        entry = self._queue.popleft()
+        self._queued_bytes -= entry[2]
+        if entry[0] is not None and self._coalesce.get(entry[0]) is entry:
+            del self._coalesce[entry[0]]
+        return entry[1]
+
+    async def _writer(self):
+        while not self.closed:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            text = self._pop()
+            try:
+                async with asyncio.timeout(CHAT_SEND_TIMEOUT):
+                    await self.websocket.send_text(text)
+            except TimeoutError:
+                self._on_failure(self, "timeout")
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._on_failure(self, str(e) or type(e).__name__)
+                return
+
+    def stats(self) -> dict:
+        return {"queued": len(self._queue), "queued_bytes": self._queued_bytes}
+
+
+class ConnectionManager:
+    """
+    WebSocket 연결 관리
+    - 소켓은 프로세스마다 따로 보관
+    - 방 브로드캐스트는 백엔드를 거쳐 모든 워커 / 컨테이너에 전달된 뒤
+      각 프로세스가 자기 소켓의 송신 큐에 넣음
+    """
+
+    def __init__(self, backend: BroadcastBackend = None):
+        # room_id -> List[ClientConnection]
+        self.active_connections: Dict[int, List[ClientConnection]] = {}
+        self.backend = backend or create_backend()
+        # room_id -> RoomFanoutMetrics (연결이 있는 방만 유지)
+        self.room_metrics: Dict[int, RoomFanoutMetrics] = {}
+        # 진행 중인 close 태스크 (GC로 사라지지 않도록 참조 유지)
+        self._closing = set()
+        self.total_evicted = 0
+
+    async def start(self):
+        """브로드캐스트 백엔드 구독 시작"""
+        await self.backend.start(self._deliver)
+        print(f"[WebSocket] Broadcast backend: {self.backend.name}")
+
+    async def close(self):
+        await self.backend.close()
 
     async def connect(self, websocket: WebSocket, room_id: int):
         """WebSocket 연결"""
@@ -19,39 +187,112 @@ class ConnectionManager:
         if room_id not in self.active_connections:
             self.active_connections[room_id] = []
 
-        self.active_connections[room_id].append(websocket)
+        conn = ClientConnection(websocket, room_id, self._on_send_failure)
+        conn.start()
+        self.active_connections[room_id].append(conn)
         print(f"[WebSocket] Connected to room {room_id}, total: {len(self.active_connections[room_id])}")
 
     def disconnect(self, websocket: WebSocket, room_id: int):
         """WebSocket 연결 해제"""
         if room_id in self.active_connections:
-            if websocket in self.active_connections[room_id]:
-                self.active_connections[room_id].remove(websocket)
-                print(f"[WebSocket] Disconnected from room {room_id}")
+            for conn in self.active_connections[room_id]:
+                if conn.websocket is websocket:
+                    conn.stop()
+                    self.active_connections[room_id].remove(conn)
+                    print(f"[WebSocket] Disconnected from room {room_id}")
+                    break
 
             if len(self.active_connections[room_id]) == 0:
                 del self.active_connections[room_id]
+                self.room_metrics.pop(room_id, None)
 
     async def send_personal_message(self, message: dict, websocket: WebSocket):
-        """개인 메시지 전송"""
-        await websocket.send_json(message)
+        """개인 메시지 전송 (연결의 송신 큐를 거쳐 브로드캐스트 프레임과 섞이지 않음)"""
+        for room_id, conns in self.active_connections.items():
+            for conn in conns:
+                if conn.websocket is websocket:
+                    if not conn.send(message, self.room_metrics.get(room_id)):
+                        print(f"[WebSocket] Outbound queue full in room {room_id}, 연결 제거")
+                        self._evict(conn)
+                    return
 
     async def broadcast(self, message: dict, room_id: int, exclude: WebSocket = None):
-        """방 전체에 메시지 브로드캐스트"""
+        """방 전체에 메시지 브로드캐스트 (다른 워커 / 컨테이너의 소켓 포함)"""
+        await self.backend.publish(room_id, message, id(exclude) if exclude is not None else None)
+
+    async def _deliver(self, room_id: int, message: dict, exclude: int = None):
+        """
+        백엔드에서 받은 메시지를 이 프로세스의 소켓 송신 큐에 추가
+        - JSON 직렬화는 한 번만
+        - 실제 전송은 연결별 writer 태스크가 담당 (여기서는 대기하지 않음)
+        """
         if room_id not in self.active_connections:
             return
 
-        for connection in self.active_connections[room_id]:
-            if connection != exclude:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    print(f"[WebSocket] Broadcast error: {e}")
+        targets = [conn for conn in self.active_connections[room_id] if id(conn.websocket) != exclude]
+        if not targets:
+            return
+
+        text = json.dumps(message, ensure_ascii=False, separators=(",", ":"), default=str)
+        size = len(text.encode())
+        event_type = message.get("type")
+        coalesce_key = (event_type, message.get("user_id")) if event_type in COALESCED_EVENT_TYPES else None
+
+        metrics = self.room_metrics.setdefault(room_id, RoomFanoutMetrics())
+        started = time.perf_counter()
+        for conn in targets:
+            if not conn.enqueue(text, size, coalesce_key, metrics):
+                print(f"[WebSocket] Outbound queue full in room {room_id}, 연결 제거")
+                self._evict(conn)
+        metrics.record(len(targets), (time.perf_counter() - started) * 1000)
+
+    def _on_send_failure(self, conn: ClientConnection, error: str):
+        metrics = self.room_metrics.get(conn.room_id)
+        if metrics:
+            if error == "timeout":
+                metrics.timeouts += 1
+            else:
+                metrics.errors += 1
+        print(f"[WebSocket] Send error in room {conn.room_id}: {error}, 연결 제거")
+        self._evict(conn)
+
+    def _evict(self, conn: ClientConnection):
+        """끊긴 / 느린 소켓 제거 (수신 루프는 close 이후 종료)"""
+        if conn not in self.active_connections.get(conn.room_id, []):
+            return
+        metrics = self.room_metrics.get(conn.room_id)
+        if metrics:
+            metrics.evicted += 1
+        self.total_evicted += 1
+        self.disconnect(conn.websocket, conn.room_id)
+        task = asyncio.create_task(self._close_quietly(conn.websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=1011), timeout=CHAT_SEND_TIMEOUT)
+        except Exception:
+            pass
 
     def get_room_connections(self, room_id: int) -> int:
-        """방의 연결 수 조회"""
+        """방의 연결 수 조회 (이 프로세스 기준)"""
         return len(self.active_connections.get(room_id, []))
 
+    def stats(self) -> dict:
+        connections = [conn for conns in self.active_connections.values() for conn in conns]
+        return {
+            "rooms": len(self.active_connections),
+            "connections": len(connections),
+            "queued": sum(conn.stats()["queued"] for conn in connections),
+            "queued_bytes": sum(conn.stats()["queued_bytes"] for conn in connections),
+            "evicted": self.total_evicted,
+            "slow_client_policy": CHAT_SLOW_CLIENT_POLICY,
+            "broadcast": self.backend.stats(),
+            "room_fanout": {room_id: m.stats() for room_id, m in self.room_metrics.items()},
+        }
+
 
 # 전역 연결 관리자 인스턴스
 manager = ConnectionManager()
@@ -1,11 +1,13 @@
 # chat-service/db.py
 # 채팅 DB 모델
 import os
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, BigInteger, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, Boolean, Text, ForeignKey, Index, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
+from db_pool import create_pooled_engine
+
 load_dotenv()
 
 DB_USER = os.getenv("DB_USER")
@@ -16,7 +18,7 @@ DB_NAME = os.getenv("DB_NAME")
 
 SQLALCHEMY_DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, echo=True, future=True)
+engine = create_pooled_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -32,6 +34,11 @@ class ChatRoom(Base):
     created_at = Column(DateTime, nullable=True)
     last_message_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        Index("ix_chat_rooms_user1", "user1_id", postgresql_concurrently=True),   # 내 채팅방 (user1_id OR user2_id)
+        Index("ix_chat_rooms_user2", "user2_id", postgresql_concurrently=True),
+    )
+
 
 class Message(Base):
     """메시지 모델"""
@@ -43,10 +50,77 @@ class Message(Base):
     content = Column(Text, nullable=True)
     message_type = Column(String(20), default="text")  # text/image
     image_url = Column(String(500), nullable=True)     # S3 URL (이미지인 경우)
-    is_read = Column(Boolean, default=False)
+    is_read = Column(Boolean, default=False)           # 미사용 (읽음 여부는 chat_room_reads.last_read_message_id 기준)
     created_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        # 방별 최근 메시지 (채팅방 목록의 마지막 메시지)
+        Index("ix_messages_room_created", "room_id", created_at.desc(), id.desc(), postgresql_concurrently=True),
+        # 방별 ID 범위 (메시지 기록 페이징, 읽음 위치 이후 메시지 수, 방의 마지막 메시지 ID)
+        Index("ix_messages_room_id", "room_id", "id", postgresql_concurrently=True),
+    )
+
+
+class ChatRoomRead(Base):
+    """
+    방별 / 사용자별 읽음 위치
+    - last_read_message_id 이하의 상대 메시지는 읽음 (NULL이면 읽은 메시지 없음)
+    - unread_count는 읽음 위치 이후 상대 메시지 수 (메시지 저장 시 증가, 읽음 처리 시 0으로)
+    """
+    __tablename__ = "chat_room_reads"
+
+    room_id = Column(Integer, ForeignKey("chat_rooms.id"), primary_key=True)
+    user_id = Column(BigInteger, primary_key=True)
+    last_read_message_id = Column(Integer, nullable=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # 사용자별 전체 안 읽은 수 (뱃지)
+        Index("ix_chat_room_reads_user", "user_id", postgresql_concurrently=True),
+    )
+
+
+# 읽음 위치 도입 전 DB: messages.is_read 기준으로 읽음 위치 채우기
+# (상대가 보낸 안 읽은 메시지 중 가장 오래된 것 직전, 없으면 방의 마지막 메시지)
+BACKFILL_READ_WATERMARK_SQL = text("""
+    INSERT INTO chat_room_reads (room_id, user_id, last_read_message_id, unread_count, updated_at)
+    SELECT r.id, u.user_id,
+           COALESCE(MIN(m.id) FILTER (WHERE m.sender_id <> u.user_id AND m.is_read = false) - 1, MAX(m.id)),
+           COUNT(m.id) FILTER (WHERE m.sender_id <> u.user_id AND m.is_read = false),
+           now()
+    FROM chat_rooms r
+    CROSS JOIN LATERAL (SELECT r.user1_id UNION SELECT r.user2_id) AS u(user_id)
+    LEFT JOIN messages m ON m.room_id = r.id
+    GROUP BY r.id, u.user_id
+    ON CONFLICT (room_id, user_id) DO UPDATE
+        SET last_read_message_id = EXCLUDED.last_read_message_id,
+            unread_count = EXCLUDED.unread_count,
+            updated_at = EXCLUDED.updated_at
+        WHERE chat_room_reads.last_read_message_id IS NULL
+""")
+
 
 def create_tables():
-    """데이터베이스 테이블 생성"""
-    Base.metadata.create_all(bind=engine)
+    """데이터베이스 테이블 생성 + 선언된 인덱스 중 없는 것 생성 + 읽음 위치 마이그레이션"""
+    # CREATE INDEX CONCURRENTLY는 트랜잭션 밖에서만 실행 가능 (기존 테이블 쓰기를 막지 않음)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        inspector = inspect(conn)
+        needs_backfill = inspector.has_table("messages") and (
+            not inspector.has_table("chat_room_reads")
+            or "last_read_message_id" not in {c["name"] for c in inspector.get_columns("chat_room_reads")}
+        )
+        Base.metadata.create_all(bind=conn)
+        if needs_backfill:
+            conn.execute(text("ALTER TABLE chat_room_reads ADD COLUMN IF NOT EXISTS last_read_message_id INTEGER"))
+            conn.execute(BACKFILL_READ_WATERMARK_SQL)
+            print("[chat-service] 읽음 위치(last_read_message_id) 마이그레이션 완료")
+        # is_read 기준 부분 인덱스는 더 이상 사용하지 않음 (INSERT마다 갱신 비용만 발생)
+        conn.execute(text("DROP INDEX CONCURRENTLY IF EXISTS ix_messages_room_unread"))
+        for table in Base.metadata.sorted_tables:
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                try:
+                    index.create(bind=conn, checkfirst=True)
+                except Exception as e:
+                    # 다른 워커가 동시에 만드는 중이면 실패할 수 있음 (다음 시작 때 다시 확인)
+                    print(f"[chat-service] 인덱스 {index.name} 생성 실패: {e}")
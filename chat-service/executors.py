@@ -0,0 +1,87 @@
+# chat-service/executors.py
+# 블로킹 I/O 전용 스레드 풀 (이벤트 루프가 DB / S3 대기로 멈추지 않도록)
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+# DB 작업 동시 실행 수 (커넥션 풀 DB_POOL_SIZE + DB_MAX_OVERFLOW 이하로)
+CHAT_DB_WORKERS = int(os.getenv("CHAT_DB_WORKERS", "8"))
+# S3 업로드 동시 실행 수 (느린 업로드가 DB 작업 스레드를 차지하지 않도록 분리)
+CHAT_S3_WORKERS = int(os.getenv("CHAT_S3_WORKERS", "4"))
+
+
+class BoundedExecutor:
+    """
+    작업 종류별 스레드 풀
+    - 동시 실행 수는 max_workers로 제한, 초과분은 큐에서 대기
+    - 큐 대기 시간 / 실행 시간 집계
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"chat-{name}")
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.active = 0
+        self.errors = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_run_ms = 0.0
+        self.max_run_ms = 0.0
+
+    def _call(self, fn, queued_at: float):
+        started = time.perf_counter()
+        wait_ms = (started - queued_at) * 1000
+        with self._lock:
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.active += 1
+        failed = False
+        try:
+            return fn()
+        except Exception:
+            failed = True
+            raise
+        finally:
+            run_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.active -= 1
+                self.errors += failed
+                self.total_run_ms += run_ms
+                self.max_run_ms = max(self.max_run_ms, run_ms)
+
+    async def run(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs)를 풀에서 실행하고 결과 대기"""
+        self.submitted += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool, self._call, partial(fn, *args, **kwargs), time.perf_counter()
+        )
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "submitted": self.submitted,
+            "active": self.active,
+            "errors": self.errors,
+            "avg_wait_ms": round(self.total_wait_ms / self.submitted, 2) if self.submitted else 0,
+            "max_wait_ms": round(self.max_wait_ms, 2),
+            "avg_run_ms": round(self.total_run_ms / self.submitted, 2) if self.submitted else 0,
+            "max_run_ms": round(self.max_run_ms, 2),
+        }
+
+
+# 전역 실행기 인스턴스
+db_executor = BoundedExecutor("db", CHAT_DB_WORKERS)
+s3_executor = BoundedExecutor("s3", CHAT_S3_WORKERS)
+
+
+def executor_stats() -> dict:
+    return {"db": db_executor.stats(), "s3": s3_executor.stats()}
@@ -2,20 +2,29 @@
 # 채팅 서비스 (WebSocket + REST API)
 import os
 import uuid
-from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect, UploadFile, File
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
-import httpx
 import boto3
 from botocore.exceptions import BotoCoreError, ClientError
+from sqlalchemy import select, func, true
 
-from db import SessionLocal, ChatRoom, Message, create_tables
+from db_pool import pool_stats
+from http_client import http_clients
+from jwt_utils import JWTAuthMiddleware, authorize_user, current_user_id, token_verifier
+from db import SessionLocal, ChatRoom, ChatRoomRead, Message, create_tables
 from connection import manager
+from message_writer import message_writer
+from executors import db_executor, s3_executor, executor_stats
+from unread import add_unread, mark_read, read_watermarks, is_read_by, unread_reconciler
 
 app = FastAPI(title="Chat Service", description="채팅 서비스 (WebSocket)")
 
+# JWT 인증 (login-service 호출 없이 서비스 내에서 검증, request.state에 호출자 정보)
+app.add_middleware(JWTAuthMiddleware)
+
 # CORS 설정
 app.add_middleware(
     CORSMiddleware,
@@ -48,6 +57,9 @@ s3_client = boto3.client(
 # 알림 서비스 URL
 NOTIFICATION_SERVICE_URL = os.getenv("NOTIFICATION_SERVICE_URL", "http://notification-service:8004")
 
+# 알림 서비스 호출용 keep-alive 클라이언트
+http_clients.register("notification", base_url=NOTIFICATION_SERVICE_URL, timeout=5.0)
+
 
 # ===== Pydantic 모델 =====
 
@@ -68,11 +80,36 @@ def health_check():
     return {"status": "ok", "service": "chat-service"}
 
 
+@app.get("/metrics/db")
+def get_db_metrics():
+    """DB 커넥션 풀 대기 시간 / 사용 중 커넥션 / 느린 쿼리 집계"""
+    return pool_stats()
+
+
+@app.get("/metrics/http")
+def get_http_metrics():
+    """업스트림별 HTTP 요청 수 / 커넥션 재사용률"""
+    return http_clients.stats()
+
+
+@app.get("/metrics/chat")
+def get_chat_metrics():
+    """WebSocket 연결 수 / 브로드캐스트 백엔드 전달 현황 / 메시지 저장 파이프라인 / DB·S3 스레드 풀 / 안 읽은 수 보정"""
+    return {
+        **manager.stats(),
+        "message_writer": message_writer.stats(),
+        "executors": executor_stats(),
+        "unread_reconciler": unread_reconciler.stats(),
+    }
+
+
 # ===== 채팅방 API =====
 
 @app.post("/rooms")
-def create_room(data: RoomCreateRequest):
+def create_room(data: RoomCreateRequest, request: Request):
     """채팅방 생성 (매칭 후 호출)"""
+    if not request.state.is_admin and authorize_user(request) not in (data.user1_id, data.user2_id):
+        raise HTTPException(status_code=403, detail="본인이 참여하는 채팅방만 만들 수 있습니다")
     db = SessionLocal()
     try:
         # 기존 채팅방 확인
@@ -113,42 +150,56 @@ def create_room(data: RoomCreateRequest):
 
 
 @app.get("/rooms")
-def get_my_rooms(user_id: int = Query(...)):
-    """내 채팅방 목록"""
+def get_my_rooms(user_id: int = Depends(current_user_id)):
+    """
+    내 채팅방 목록
+    - 마지막 메시지(LATERAL)와 안 읽은 메시지 수(chat_room_reads 카운터)를 한 번의 쿼리로 조회
+    """
     db = SessionLocal()
     try:
-        rooms = db.query(ChatRoom).filter(
-            (ChatRoom.user1_id == user_id) | (ChatRoom.user2_id == user_id),
-            ChatRoom.is_active == True
-        ).order_by(ChatRoom.last_message_at.desc().nullsfirst()).all()
+        last_message = (
+            select(Message.id, Message.content, Message.message_type, Message.created_at)
+            .where(Message.room_id == ChatRoom.id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(1)
+            .lateral("last_message")
+        )
+        rows = db.execute(
+            select(
+                ChatRoom.id,
+                ChatRoom.user1_id,
+                ChatRoom.user2_id,
+                ChatRoom.last_message_at,
+                last_message.c.id.label("last_message_id"),
+                last_message.c.content,
+                last_message.c.message_type,
+                last_message.c.created_at,
+                func.coalesce(ChatRoomRead.unread_count, 0).label("unread_count")
+            )
+            .outerjoin(last_message, true())
+            .outerjoin(ChatRoomRead, (ChatRoomRead.room_id == ChatRoom.id) & (ChatRoomRead.user_id == user_id))
+            .where(
+                (ChatRoom.user1_id == user_id) | (ChatRoom.user2_id == user_id),
+                ChatRoom.is_active == True
+            )
+            .order_by(ChatRoom.last_message_at.desc().nullsfirst())
+        ).all()
 
         result = []
-        for room in rooms:
+        for row in rows:
             # 상대방 ID
-            partner_id = room.user2_id if room.user1_id == user_id else room.user1_id
-
-            # 마지막 메시지
-            last_message = db.query(Message).filter(
-                Message.room_id == room.id
-            ).order_by(Message.created_at.desc()).first()
-
-            # 읽지 않은 메시지 수
-            unread_count = db.query(Message).filter(
-                Message.room_id == room.id,
-                Message.sender_id != user_id,
-                Message.is_read == False
-            ).count()
+            partner_id = row.user2_id if row.user1_id == user_id else row.user1_id
 
             result.append({
-                "room_id": room.id,
+                "room_id": row.id,
                 "partner_id": partner_id,
                 "last_message": {
-                    "content": last_message.content if last_message else None,
-                    "message_type": last_message.message_type if last_message else None,
-                    "created_at": str(last_message.created_at) if last_message else None
-                } if last_message else None,
-                "unread_count": unread_count,
-                "last_message_at": str(room.last_message_at) if room.last_message_at else None
+                    "content": row.content,
+                    "message_type": row.message_type,
+                    "created_at": str(row.created_at)
+                } if row.last_message_id is not None else None,
+                "unread_count": row.unread_count,
+                "last_message_at": str(row.last_message_at) if row.last_message_at else None
             })
 
         return {"total": len(result), "rooms": result}
@@ -157,14 +208,34 @@ def get_my_rooms(user_id: int = Query(...)):
         db.close()
 
 
+@app.get("/unread-count")
+def get_unread_count(user_id: int = Depends(current_user_id)):
+    """내 전체 안 읽은 메시지 수 (뱃지, 카운터 합계)"""
+    db = SessionLocal()
+    try:
+        total = db.execute(
+            select(func.coalesce(func.sum(ChatRoomRead.unread_count), 0))
+            .join(ChatRoom, ChatRoom.id == ChatRoomRead.room_id)
+            .where(ChatRoomRead.user_id == user_id, ChatRoom.is_active == True)
+        ).scalar()
+        return {"user_id": user_id, "unread_count": int(total)}
+
+    finally:
+        db.close()
+
+
 @app.get("/rooms/{room_id}/messages")
 def get_messages(
     room_id: int,
-    user_id: int = Query(...),
+    user_id: int = Depends(current_user_id),
     limit: int = 50,
     before_id: Optional[int] = None
 ):
-    """메시지 기록 조회 (페이징)"""
+    """
+    메시지 기록 조회 (페이징)
+    - 조회한 사용자의 읽음 위치를 방의 마지막 메시지로 갱신 (한 행 upsert)
+    - is_read는 상대방 읽음 위치 기준
+    """
     db = SessionLocal()
     try:
         # 채팅방 접근 권한 확인
@@ -183,13 +254,12 @@ def get_messages(
         messages = query.order_by(Message.id.desc()).limit(limit).all()
 
         # 읽음 처리
-        db.query(Message).filter(
-            Message.room_id == room_id,
-            Message.sender_id != user_id,
-            Message.is_read == False
-        ).update({"is_read": True})
+        mark_read(db, room_id, user_id)
+        watermarks = read_watermarks(db, room_id)
         db.commit()
 
+        members = (room.user1_id, room.user2_id)
+
         return {
             "room_id": room_id,
             "messages": [
@@ -199,7 +269,7 @@ def get_messages(
                     "content": m.content,
                     "message_type": m.message_type,
                     "image_url": m.image_url,
-                    "is_read": m.is_read,
+                    "is_read": is_read_by(m.id, m.sender_id, members, watermarks),
                     "created_at": str(m.created_at) if m.created_at else None
                 }
                 for m in reversed(messages)
@@ -210,86 +280,134 @@ def get_messages(
         db.close()
 
 
-@app.post("/rooms/{room_id}/messages")
-async def send_message(room_id: int, data: MessageCreateRequest):
-    """메시지 전송 (REST API)"""
+# ===== 블로킹 DB 작업 (async 핸들러에서 db_executor로 실행) =====
+
+def _load_room_members(room_id: int):
+    """채팅방 참여자 (user1_id, user2_id), 없으면 None"""
     db = SessionLocal()
     try:
-        room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
-        if not room:
-            raise HTTPException(status_code=404, detail="채팅방을 찾을 수 없습니다")
+        room = db.query(ChatRoom.user1_id, ChatRoom.user2_id).filter(ChatRoom.id == room_id).first()
+        return tuple(room) if room else None
+    finally:
+        db.close()
+
 
+def _save_message(room_id: int, sender_id: int, content: str = None,
+                  message_type: str = "text", image_url: str = None) -> dict:
+    """메시지 저장 + 방 마지막 메시지 시각 갱신"""
+    db = SessionLocal()
+    try:
+        now = datetime.now()
         message = Message(
             room_id=room_id,
-            sender_id=data.sender_id,
-            content=data.content,
-            message_type="text",
+            sender_id=sender_id,
+            content=content,
+            message_type=message_type,
+            image_url=image_url,
             is_read=False,
-            created_at=datetime.now()
+            created_at=now
         )
         db.add(message)
+        db.query(ChatRoom).filter(ChatRoom.id == room_id).update({"last_message_at": now})
+        db.flush()
+        add_unread(db, [(message.id, room_id, sender_id)])
+
+        saved = {
+            "id": message.id,
+            "sender_id": message.sender_id,
+            "content": message.content,
+            "message_type": message.message_type,
+            "image_url": message.image_url,
+            "created_at": str(message.created_at)
+        }
+        db.commit()
+        return saved
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
 
-        room.last_message_at = datetime.now()
+def _mark_room_read(room_id: int, user_id: int):
+    """읽음 위치를 방의 마지막 메시지로 갱신 + 안 읽은 수 카운터 초기화, 갱신된 읽음 위치 반환"""
+    db = SessionLocal()
+    try:
+        last_read_message_id = mark_read(db, room_id, user_id)
         db.commit()
-        db.refresh(message)
+        return last_read_message_id
+    finally:
+        db.close()
+
+
+@app.post("/rooms/{room_id}/messages")
+async def send_message(room_id: int, data: MessageCreateRequest, request: Request):
+    """메시지 전송 (REST API)"""
+    authorize_user(request, data.sender_id)
+    try:
+        members = await db_executor.run(_load_room_members, room_id)
+        if not members:
+            raise HTTPException(status_code=404, detail="채팅방을 찾을 수 없습니다")
+        if data.sender_id not in members:
+            raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
+
+        message = await db_executor.run(_save_message, room_id, data.sender_id, data.content)
 
         # WebSocket 브로드캐스트
         await manager.broadcast({
             "type": "message",
             "message": {
-                "id": message.id,
-                "sender_id": message.sender_id,
-                "content": message.content,
-                "message_type": message.message_type,
-                "created_at": str(message.created_at)
+                "id": message["id"],
+                "sender_id": message["sender_id"],
+                "content": message["content"],
+                "message_type": message["message_type"],
+                "created_at": message["created_at"]
             }
         }, room_id)
 
         # 상대방에게 푸시 알림 (비동기)
-        receiver_id = room.user2_id if room.user1_id == data.sender_id else room.user1_id
+        receiver_id = members[1] if members[0] == data.sender_id else members[0]
         try:
-            async with httpx.AsyncClient() as client:
-                await client.post(
-                    f"{NOTIFICATION_SERVICE_URL}/send",
-                    json={
-                        "user_id": receiver_id,
-                        "notification_type": "new_message",
-                        "data": {
-                            "sender_name": str(data.sender_id),
-                            "preview": data.content[:50] if data.content else ""
-                        }
-                    },
-                    timeout=5.0
-                )
+            await http_clients.get("notification").post(
+                "/send",
+                json={
+                    "user_id": receiver_id,
+                    "notification_type": "new_message",
+                    "data": {
+                        "sender_name": str(data.sender_id),
+                        "preview": data.content[:50] if data.content else ""
+                    }
+                }
+            )
         except Exception as e:
             print(f"[Chat] Notification error: {e}")
 
         return {
             "status": "success",
-            "message_id": message.id
+            "message_id": message["id"]
         }
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"메시지 전송 실패: {str(e)}")
-    finally:
-        db.close()
 
 
 @app.post("/rooms/{room_id}/images")
 async def upload_image(
     room_id: int,
-    sender_id: int = Query(...),
+    request: Request,
+    sender_id: Optional[int] = Query(None),
     file: UploadFile = File(...)
 ):
     """이미지 업로드"""
-    db = SessionLocal()
+    sender_id = authorize_user(request, sender_id)
     try:
-        room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
-        if not room:
+        members = await db_executor.run(_load_room_members, room_id)
+        if not members:
             raise HTTPException(status_code=404, detail="채팅방을 찾을 수 없습니다")
+        if sender_id not in members:
+            raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
 
         # 파일 확장자 확인
         allowed_extensions = [".jpg", ".jpeg", ".png", ".gif"]
@@ -297,12 +415,13 @@ async def upload_image(
         if file_ext not in allowed_extensions:
             raise HTTPException(status_code=400, detail="허용되지 않는 파일 형식입니다")
 
-        # S3 업로드
+        # S3 업로드 (전용 스레드 풀, 느린 업로드가 이벤트 루프 / DB 작업을 막지 않음)
         image_id = str(uuid.uuid4())
         file_key = f"chat_images/{room_id}/{image_id}{file_ext}"
 
         contents = await file.read()
-        s3_client.put_object(
+        await s3_executor.run(
+            s3_client.put_object,
             Bucket=S3_BUCKET_NAME,
             Key=file_key,
             Body=contents,
@@ -312,68 +431,53 @@ async def upload_image(
         image_url = f"https://{S3_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/{file_key}"
 
         # 메시지 저장
-        message = Message(
-            room_id=room_id,
-            sender_id=sender_id,
-            content=None,
-            message_type="image",
-            image_url=image_url,
-            is_read=False,
-            created_at=datetime.now()
-        )
-        db.add(message)
-
-        room.last_message_at = datetime.now()
-        db.commit()
-        db.refresh(message)
+        message = await db_executor.run(_save_message, room_id, sender_id, None, "image", image_url)
 
         # WebSocket 브로드캐스트
         await manager.broadcast({
             "type": "message",
             "message": {
-                "id": message.id,
-                "sender_id": message.sender_id,
+                "id": message["id"],
+                "sender_id": message["sender_id"],
                 "content": None,
                 "message_type": "image",
                 "image_url": image_url,
-                "created_at": str(message.created_at)
+                "created_at": message["created_at"]
             }
         }, room_id)
 
         return {
             "status": "success",
-            "message_id": message.id,
+            "message_id": message["id"],
             "image_url": image_url
         }
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"이미지 업로드 실패: {str(e)}")
-    finally:
-        db.close()
 
 
 # ===== WebSocket 엔드포인트 =====
 
 @app.websocket("/ws/{room_id}")
-async def websocket_endpoint(websocket: WebSocket, room_id: int, user_id: int = Query(...)):
-    """WebSocket 연결"""
-    db = SessionLocal()
+async def websocket_endpoint(websocket: WebSocket, room_id: int, user_id: Optional[int] = Query(None)):
+    """WebSocket 연결 (토큰은 Authorization 헤더 또는 ?token=)"""
     try:
-        # 채팅방 접근 권한 확인
-        room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
-        if not room:
-            await websocket.close(code=4004)
-            return
+        user_id = authorize_user(websocket, user_id)
+    except HTTPException as e:
+        await websocket.close(code=4001 if e.status_code == 401 else 4003)
+        return
 
-        if room.user1_id != user_id and room.user2_id != user_id:
-            await websocket.close(code=4003)
-            return
+    # 채팅방 접근 권한 확인
+    members = await db_executor.run(_load_room_members, room_id)
+    if not members:
+        await websocket.close(code=4004)
+        return
 
-    finally:
-        db.close()
+    if user_id not in members:
+        await websocket.close(code=4003)
+        return
 
     await manager.connect(websocket, room_id)
 
@@ -382,40 +486,24 @@ async def websocket_endpoint(websocket: WebSocket, room_id: int, user_id: int =
             data = await websocket.receive_json()
 
             if data.get("type") == "message":
-                # 메시지 저장
-                db = SessionLocal()
+                # message_writer가 묶어서 저장 (sync: 커밋 후 / async: ID 배정 즉시 브로드캐스트)
                 try:
-                    message = Message(
-                        room_id=room_id,
-                        sender_id=user_id,
-                        content=data.get("content"),
-                        message_type="text",
-                        is_read=False,
-                        created_at=datetime.now()
-                    )
-                    db.add(message)
-
-                    room = db.query(ChatRoom).filter(ChatRoom.id == room_id).first()
-                    if room:
-                        room.last_message_at = datetime.now()
-
-                    db.commit()
-                    db.refresh(message)
-
-                    # 브로드캐스트
-                    await manager.broadcast({
-                        "type": "message",
-                        "message": {
-                            "id": message.id,
-                            "sender_id": message.sender_id,
-                            "content": message.content,
-                            "message_type": message.message_type,
-                            "created_at": str(message.created_at)
-                        }
-                    }, room_id)
-
-                finally:
-                    db.close()
+                    message = await message_writer.submit(room_id, user_id, data.get("content"))
+                except Exception as e:
+                    print(f"[WebSocket] Message save failed in room {room_id}: {e}")
+                    await manager.send_personal_message({"type": "error", "detail": "메시지 저장 실패"}, websocket)
+                    continue
+
+                await manager.broadcast({
+                    "type": "message",
+                    "message": {
+                        "id": message["id"],
+                        "sender_id": message["sender_id"],
+                        "content": message["content"],
+                        "message_type": message["message_type"],
+                        "created_at": message["created_at"]
+                    }
+                }, room_id)
 
             elif data.get("type") == "typing":
                 # 타이핑 인디케이터
@@ -425,27 +513,22 @@ async def websocket_endpoint(websocket: WebSocket, room_id: int, user_id: int =
                 }, room_id, exclude=websocket)
 
             elif data.get("type") == "read":
-                # 읽음 처리
-                db = SessionLocal()
-                try:
-                    db.query(Message).filter(
-                        Message.room_id == room_id,
-                        Message.sender_id != user_id,
-                        Message.is_read == False
-                    ).update({"is_read": True})
-                    db.commit()
+                # 읽음 처리 (상대방은 last_read_message_id 이하 메시지를 읽음으로 표시)
+                last_read_message_id = await db_executor.run(_mark_room_read, room_id, user_id)
 
-                    await manager.broadcast({
-                        "type": "read",
-                        "user_id": user_id
-                    }, room_id, exclude=websocket)
-
-                finally:
-                    db.close()
+                await manager.broadcast({
+                    "type": "read",
+                    "user_id": user_id,
+                    "last_read_message_id": last_read_message_id
+                }, room_id, exclude=websocket)
 
     except WebSocketDisconnect:
-        manager.disconnect(websocket, room_id)
         print(f"[WebSocket] User {user_id} disconnected from room {room_id}")
+    except RuntimeError as e:
+        # 송신 지연 / 오류로 서버가 먼저 연결을 닫은 경우
+        print(f"[WebSocket] User {user_id} connection closed in room {room_id}: {e}")
+    finally:
+        manager.disconnect(websocket, room_id)
 
 
 # ===== 앱 시작 시 테이블 생성 =====
@@ -454,3 +537,57 @@ async def websocket_endpoint(websocket: WebSocket, room_id: int, user_id: int =
 def startup():
     create_tables()
     print("[chat-service] 시작됨")
+
+
+@app.on_event("startup")
+async def start_http_clients():
+    await http_clients.start()
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await http_clients.close()
+
+
+@app.on_event("startup")
+async def start_broadcast():
+    await manager.start()
+
+
+@app.on_event("shutdown")
+async def close_broadcast():
+    await manager.close()
+
+
+@app.on_event("startup")
+async def start_message_writer():
+    await message_writer.start()
+
+
+@app.on_event("shutdown")
+async def close_message_writer():
+    # 아직 저장하지 않은 메시지 모두 저장 후 종료
+    await message_writer.close()
+
+
+@app.on_event("startup")
+async def start_unread_reconciler():
+    # 시작 시 한 번 보정 (카운터 도입 전 방 포함) 후 주기적으로 반복
+    await unread_reconciler.start()
+
+
+@app.on_event("shutdown")
+async def close_unread_reconciler():
+    await unread_reconciler.close()
+
+
+@app.on_event("shutdown")
+def close_executors():
+    db_executor.shutdown()
+    s3_executor.shutdown()
+
+
+@app.on_event("startup")
+def start_jwt_revocations():
+    """로그아웃 토큰 목록 첫 동기화 (요청 처리 중에는 DB를 기다리지 않도록 시작 시 한 번)"""
+    token_verifier.revocations.start()
@@ -0,0 +1,264 @@
+# chat-service/message_writer.py
+# 채팅 메시지 묶음 저장 (여러 메시지가 INSERT / 커밋 한 번을 공유, 커밋 대기 / 즉시 브로드캐스트 선택)
+import asyncio
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy import func, values, column, insert, text, Integer, DateTime, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from db import SessionLocal, ChatRoom, Message
+from executors import db_executor
+from unread import add_unread
+
+# sync: 묶음이 커밋된 뒤 브로드캐스트 (기본값, 유실 없음, 여러 메시지가 커밋 한 번을 공유)
+# async: 접수 즉시 시퀀스에서 ID를 받아 브로드캐스트, 저장은 뒤에서 묶어서
+#        (비정상 종료 시 마지막 묶음 유실 가능, 저장 전 ID라 묶음 대기 시간 동안은 ID 순서 ≠ 저장 순서)
+CHAT_MESSAGE_DURABILITY = os.getenv("CHAT_MESSAGE_DURABILITY", "sync").lower()
+# 묶음 대기 시간 (ms) / 한 INSERT 최대 행 수
+CHAT_MESSAGE_FLUSH_MS = float(os.getenv("CHAT_MESSAGE_FLUSH_MS", "50"))
+CHAT_MESSAGE_BATCH_SIZE = int(os.getenv("CHAT_MESSAGE_BATCH_SIZE", "500"))
+# async 모드 저장 대기 메시지 한도 (넘으면 저장 완료까지 대기)
+CHAT_MESSAGE_MAX_PENDING = int(os.getenv("CHAT_MESSAGE_MAX_PENDING", "5000"))
+# 저장 실패 시 재시도 횟수 (넘으면 기다리던 요청에 예외 전달) / 재시도 대기 (초, 최대 5초까지 2배씩)
+CHAT_MESSAGE_RETRIES = int(os.getenv("CHAT_MESSAGE_RETRIES", "3"))
+CHAT_MESSAGE_RETRY_BACKOFF = float(os.getenv("CHAT_MESSAGE_RETRY_BACKOFF", "0.5"))
+
+
+def _allocate_ids(count: int) -> list:
+    """messages.id 시퀀스에서 지금 접수된 메시지 수만큼만 ID 할당 (남겨 두는 ID 없음)"""
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('messages', 'id')) FROM generate_series(1, :n)"),
+            {"n": count}
+        ).scalars().all()
+        db.commit()
+        return sorted(rows)
+    finally:
+        db.close()
+
+
+def _write_batch(rows: list) -> list:
+    """
+    메시지 묶음 저장 (한 트랜잭션), rows 순서대로 ID 반환
+    - sync: 다중 행 INSERT ... RETURNING (ID는 INSERT 시점에 시퀀스에서 배정 → 저장 순서 = ID 순서)
+    - async: 접수 시 받은 ID로 INSERT (이미 저장된 ID는 무시, 커밋 여부가 불확실한 재시도 대비)
+    - 방별 마지막 메시지 시각은 UPDATE 한 번으로 갱신
+    - 안 읽은 수 카운터는 INSERT된 행만큼 증가
+    """
+    last_at = {}
+    for row in rows:
+        if row["created_at"] > last_at.get(row["room_id"], datetime.min):
+            last_at[row["room_id"]] = row["created_at"]
+
+    latest = values(
+        column("room_id", Integer), column("created_at", DateTime), name="latest"
+    ).data(list(last_at.items()))
+
+    db = SessionLocal()
+    try:
+        if "id" in rows[0]:
+            sent = db.execute(
+                pg_insert(Message).values(rows)
+                .on_conflict_do_nothing(index_elements=[Message.id])
+                .returning(Message.id, Message.room_id, Message.sender_id)
+            ).all()
+        else:
+            sent = db.execute(
+                insert(Message).returning(
+                    Message.id, Message.room_id, Message.sender_id, sort_by_parameter_order=True
+                ),
+                rows
+            ).all()
+        db.execute(
+            update(ChatRoom)
+            .where(ChatRoom.id == latest.c.room_id)
+            .values(last_message_at=func.greatest(
+                func.coalesce(ChatRoom.last_message_at, latest.c.created_at), latest.c.created_at
+            ))
+        )
+        add_unread(db, sent)
+        db.commit()
+        if "id" in rows[0]:
+            return [row["id"] for row in rows]
+        return [message_id for message_id, _, _ in sent]
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class MessageWriter:
+    """
+    WebSocket 메시지 저장 파이프라인
+    - CHAT_MESSAGE_FLUSH_MS 동안 모아서 INSERT 한 번 + 방 UPDATE 한 번 (DB 전용 스레드 풀에서)
+    - 메시지마다 Future를 두고 커밋되면 ID로 완료
+      sync는 이 Future를 기다린 뒤 반환, async는 접수 시 받은 ID로 바로 반환
+    - async ID는 블록으로 쌓아 두지 않고, 동시에 접수된 메시지끼리만 nextval 한 번으로 묶어서 받음
+    - 저장 실패 시 CHAT_MESSAGE_RETRIES번까지 재시도 (롤백된 묶음이라 중복 없음), 그래도 실패하면 해당 Future 모두 예외
+    - 종료 시 남은 메시지 모두 처리
+    """
+
+    def __init__(self, durability: str = CHAT_MESSAGE_DURABILITY):
+        self.durability = durability
+        self._buffer = []          # (row, Future, 실패 횟수)
+        self._id_waiters = []      # async: ID를 기다리는 Future (접수 순서)
+        self._id_task = None
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._closing = False
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+        self.max_batch = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+
+    async def start(self):
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """남은 메시지 처리 후 종료"""
+        self._closing = True
+        self._wakeup.set()
+        if self._task:
+            await self._task
+
+    async def submit(self, room_id: int, sender_id: int, content: str = None,
+                     message_type: str = "text", image_url: str = None) -> dict:
+        """
+        메시지 접수 후 브로드캐스트용 dict 반환
+        - sync: 커밋된 뒤 반환 (저장 실패 시 예외)
+        - async: ID를 받으면 바로 반환 (저장 대기가 CHAT_MESSAGE_MAX_PENDING 이상이면 sync처럼 대기)
+        """
+        row = {
+            "room_id": room_id,
+            "sender_id": sender_id,
+            "content": content,
+            "message_type": message_type,
+            "image_url": image_url,
+            "is_read": False,
+            "created_at": datetime.now(),
+        }
+        if self.durability == "async":
+            row["id"] = await self._next_id()
+        future = asyncio.get_running_loop().create_future()
+        # 기다리는 쪽이 없어도(async / 연결 종료) 저장 실패는 로그 / dropped로만 남김
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._buffer.append((row, future, 0))
+        self.submitted += 1
+        if len(self._buffer) == 1 or len(self._buffer) >= CHAT_MESSAGE_BATCH_SIZE:
+            self._wakeup.set()
+
+        if self.durability == "async" and len(self._buffer) < CHAT_MESSAGE_MAX_PENDING:
+            message_id = row["id"]
+        else:
+            message_id = await asyncio.shield(future)
+
+        return {
+            "id": message_id,
+            "sender_id": sender_id,
+            "content": content,
+            "message_type": message_type,
+            "image_url": image_url,
+            "created_at": str(row["created_at"]),
+        }
+
+    async def _next_id(self) -> int:
+        """async: 접수 순서대로 ID 배정 (진행 중인 할당이 있으면 다음 할당에 함께 묶임)"""
+        future = asyncio.get_running_loop().create_future()
+        self._id_waiters.append(future)
+        if self._id_task is None or self._id_task.done():
+            self._id_task = asyncio.create_task(self._allocate_pending_ids())
+        return await future
+
+    async def _allocate_pending_ids(self):
+        while self._id_waiters:
+            waiters, self._id_waiters = self._id_waiters, []
+            try:
+                message_ids = await db_executor.run(_allocate_ids, len(waiters))
+            except Exception as e:
+                for future in waiters:
+                    future.set_exception(e)
+                continue
+            for future, message_id in zip(waiters, message_ids):
+                future.set_result(message_id)
+
+    async def _flush_loop(self):
+        backoff = CHAT_MESSAGE_RETRY_BACKOFF
+        while True:
+            if not self._buffer:
+                if self._closing:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # 첫 메시지 이후 잠시 더 모음 (배치가 차거나 종료 중이면 바로 저장)
+            if len(self._buffer) < CHAT_MESSAGE_BATCH_SIZE and not self._closing:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=CHAT_MESSAGE_FLUSH_MS / 1000)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._buffer[:CHAT_MESSAGE_BATCH_SIZE]
+            self._buffer = self._buffer[CHAT_MESSAGE_BATCH_SIZE:]
+
+            started = time.perf_counter()
+            try:
+                message_ids = await db_executor.run(_write_batch, [row for row, _, _ in batch])
+            except Exception as e:
+                self.failures += 1
+                retry = [(row, future, attempts + 1) for row, future, attempts in batch
+                         if attempts < CHAT_MESSAGE_RETRIES]
+                failed = [future for _, future, attempts in batch if attempts >= CHAT_MESSAGE_RETRIES]
+                if failed:
+                    # 재시도 한도를 넘긴 메시지는 기다리던 요청 모두에 예외 전달
+                    print(f"[MessageWriter] 저장 실패, {len(failed)}건 포기: {e}")
+                    self.dropped += len(failed)
+                    for future in failed:
+                        if not future.done():
+                            future.set_exception(e)
+                if retry:
+                    # 실패한 묶음은 순서를 유지하도록 버퍼 앞에 되돌려 재시도
+                    print(f"[MessageWriter] 저장 실패 ({len(retry)}건), {backoff:.1f}초 후 재시도: {e}")
+                    self._buffer = retry + self._buffer
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 5.0)
+                continue
+
+            backoff = CHAT_MESSAGE_RETRY_BACKOFF
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.written += len(batch)
+            self.batches += 1
+            self.max_batch = max(self.max_batch, len(batch))
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            for (_, future, _), message_id in zip(batch, message_ids):
+                if not future.done():
+                    future.set_result(message_id)
+
+    def stats(self) -> dict:
+        return {
+            "durability": self.durability,
+            "submitted": self.submitted,
+            "written": self.written,
+            "pending": len(self._buffer),
+            "batches": self.batches,
+            "avg_batch": round(self.written / self.batches, 1) if self.batches else 0,
+            "max_batch": self.max_batch,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+            "failures": self.failures,
+            "dropped": self.dropped,
+        }
+
+
+# 전역 메시지 저장 파이프라인 인스턴스
+message_writer = MessageWriter()
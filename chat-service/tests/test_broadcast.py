@@ -0,0 +1,197 @@
+# chat-service/tests/test_broadcast.py
+# 브로드캐스트 백엔드 + 연결별 송신 큐 (여러 노드 / 느린 소켓)
+import asyncio
+import json
+
+import pytest
+
+import connection
+from broadcast import BroadcastBackend, MemoryBackend, PostgresBackend, create_backend
+from connection import ConnectionManager
+
+
+class FakeSocket:
+    """send_text 기록, block이면 전송이 끝나지 않는 소켓"""
+
+    def __init__(self, block=False):
+        self.block = block
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.block:
+            await asyncio.Event().wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+class LoopbackBus:
+    """노드 간 Pub/Sub 대체: publish된 envelope를 모든 노드에 직렬화된 문자열로 전달"""
+
+    def __init__(self):
+        self.nodes = []
+
+
+class BusBackend(BroadcastBackend):
+    name = "bus"
+
+    def __init__(self, bus: LoopbackBus):
+        super().__init__()
+        self.bus = bus
+        bus.nodes.append(self)
+
+    async def publish(self, room_id, message, exclude=None):
+        self.published += 1
+        raw = self._envelope(room_id, message, exclude)
+        for node in self.bus.nodes:
+            await node._dispatch(raw)
+
+
+async def settle():
+    """writer 태스크가 큐를 비울 시간"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_message_reaches_sockets_on_every_node():
+    async def scenario():
+        bus = LoopbackBus()
+        node_a, node_b = ConnectionManager(BusBackend(bus)), ConnectionManager(BusBackend(bus))
+        await node_a.start()
+        await node_b.start()
+        sender, peer_a, peer_b = FakeSocket(), FakeSocket(), FakeSocket()
+        await node_a.connect(sender, 1)
+        await node_a.connect(peer_a, 1)
+        await node_b.connect(peer_b, 1)
+        await node_a.broadcast({"type": "message", "id": 1}, 1)
+        await node_a.broadcast({"type": "typing", "user_id": 7}, 1, exclude=sender)
+        await settle()
+        return sender, peer_a, peer_b
+
+    sender, peer_a, peer_b = asyncio.run(scenario())
+    assert sender.sent == [{"type": "message", "id": 1}]
+    # exclude는 보낸 노드의 소켓에만 적용
+    assert peer_a.sent == peer_b.sent == [{"type": "message", "id": 1}, {"type": "typing", "user_id": 7}]
+
+
+def test_slow_socket_does_not_delay_others_and_is_evicted(monkeypatch):
+    monkeypatch.setattr(connection, "CHAT_SEND_TIMEOUT", 0.05)
+
+    async def scenario():
+        manager = ConnectionManager(MemoryBackend())
+        await manager.start()
+        slow, fast = FakeSocket(block=True), FakeSocket()
+        await manager.connect(slow, 1)
+        await manager.connect(fast, 1)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await manager.broadcast({"type": "message", "id": 1}, 1)
+        publish_seconds = loop.time() - started
+        await settle()
+        delivered_fast = list(fast.sent)
+        await asyncio.sleep(0.15)
+        return manager, slow, delivered_fast, publish_seconds
+
+    manager, slow, delivered_fast, publish_seconds = asyncio.run(scenario())
+    assert publish_seconds < 0.05
+    assert delivered_fast == [{"type": "message", "id": 1}]
+    assert slow.closed_with == 1011
+    assert manager.get_room_connections(1) == 1
+    assert manager.stats()["evicted"] == 1
+
+
+def test_typing_events_are_coalesced_while_queued():
+    async def scenario():
+        manager = ConnectionManager(MemoryBackend())
+        await manager.start()
+        socket = FakeSocket()
+        await manager.connect(socket, 1)
+        # writer 태스크가 돌기 전에 연달아 넣음 → 마지막 typing만 남음
+        for n in range(5):
+            await manager._deliver(1, {"type": "typing", "user_id": 7, "n": n})
+        await manager._deliver(1, {"type": "message", "id": 1})
+        await settle()
+        return manager, socket
+
+    manager, socket = asyncio.run(scenario())
+    assert socket.sent == [{"type": "typing", "user_id": 7, "n": 4}, {"type": "message", "id": 1}]
+    assert manager.room_metrics[1].coalesced == 4
+
+
+def test_full_queue_disconnects_under_default_policy(monkeypatch):
+    monkeypatch.setattr(connection, "CHAT_OUTBOUND_QUEUE_SIZE", 3)
+    monkeypatch.setattr(connection, "CHAT_SLOW_CLIENT_POLICY", "disconnect")
+
+    async def scenario():
+        manager = ConnectionManager(MemoryBackend())
+        await manager.start()
+        socket = FakeSocket(block=True)
+        await manager.connect(socket, 1)
+        for n in range(6):
+            await manager._deliver(1, {"type": "message", "id": n})
+        await settle()
+        return manager, socket
+
+    manager, socket = asyncio.run(scenario())
+    assert manager.get_room_connections(1) == 0
+    assert socket.closed_with == 1011
+
+
+def test_postgres_backend_delivers_oversized_payload_locally():
+    received = []
+
+    async def on_message(room_id, message, exclude):
+        received.append((room_id, message["type"]))
+
+    async def scenario():
+        backend = PostgresBackend(dsn="postgresql://unused")
+        await BroadcastBackend.start(backend, on_message)
+        await backend.publish(1, {"type": "message", "content": "x" * 10_000})
+        return backend
+
+    backend = asyncio.run(scenario())
+    assert received == [(1, "message")]
+    assert backend.stats()["oversized"] == 1
+    assert backend.stats()["published"] == 0
+
+
+def test_unknown_backend_is_rejected():
+    assert create_backend("memory").name == "memory"
+    with pytest.raises(ValueError):
+        create_backend("carrier-pigeon")
+
+
+def test_personal_message_is_queued_behind_broadcast_frames():
+    class SlowSocket(FakeSocket):
+        """전송 중 다른 전송이 겹치면 기록"""
+
+        def __init__(self):
+            super().__init__()
+            self.sending = 0
+            self.overlapped = False
+
+        async def send_text(self, text):
+            self.sending += 1
+            self.overlapped |= self.sending > 1
+            await asyncio.sleep(0.01)
+            self.sending -= 1
+            self.sent.append(json.loads(text))
+
+    async def scenario():
+        manager = ConnectionManager(MemoryBackend())
+        await manager.start()
+        socket = SlowSocket()
+        await manager.connect(socket, 1)
+        await manager.broadcast({"type": "message", "id": 1}, 1)
+        await manager.send_personal_message({"type": "error", "detail": "x"}, socket)
+        await asyncio.sleep(0.05)
+        return socket
+
+    socket = asyncio.run(scenario())
+    assert socket.sent == [{"type": "message", "id": 1}, {"type": "error", "detail": "x"}]
+    assert not socket.overlapped
@@ -0,0 +1,83 @@
+# chat-service/tests/test_executors.py
+# BoundedExecutor: 동시 실행 수 제한 / 이벤트 루프 비차단 / 오류 집계
+import asyncio
+import threading
+import time
+
+import pytest
+
+from executors import BoundedExecutor
+
+
+class Probe:
+    """동시에 실행 중인 호출 수의 최댓값 기록"""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def work(self, value, seconds=0.02):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(seconds)
+        with self._lock:
+            self.running -= 1
+        return value
+
+
+@pytest.fixture
+def executor():
+    pool = BoundedExecutor("test", 3)
+    yield pool
+    pool.shutdown()
+
+
+def test_concurrency_is_bounded_by_max_workers(executor):
+    probe = Probe()
+
+    async def scenario():
+        return await asyncio.gather(*(executor.run(probe.work, i) for i in range(12)))
+
+    assert asyncio.run(scenario()) == list(range(12))
+    assert probe.peak == 3
+    stats = executor.stats()
+    assert stats["submitted"] == 12
+    assert stats["active"] == 0
+    # 12건 / 3개 스레드 → 뒤쪽 작업은 큐에서 대기
+    assert stats["max_wait_ms"] > 10
+
+
+def test_blocking_work_does_not_stall_event_loop(executor):
+    probe = Probe()
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await asyncio.gather(*(executor.run(probe.work, i, 0.1) for i in range(3)))
+        task.cancel()
+        return ticks
+
+    # 0.1초 블로킹 동안 루프가 계속 돌아야 함
+    assert asyncio.run(scenario()) >= 5
+
+
+def test_errors_propagate_and_are_counted(executor):
+    def fail():
+        raise ValueError("boom")
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+
+    asyncio.run(scenario())
+    assert executor.stats()["errors"] == 1
+    assert executor.stats()["active"] == 0
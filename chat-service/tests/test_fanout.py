@@ -0,0 +1,80 @@
+# chat-service/tests/test_fanout.py
+# 느린 이미지 업로드(S3)가 다른 방의 메시지 전송 / 브로드캐스트를 늦추지 않음
+import asyncio
+import itertools
+import threading
+
+import httpx
+
+import main
+from broadcast import MemoryBackend
+from connection import ConnectionManager
+from executors import CHAT_S3_WORKERS
+from jwt_utils import create_jwt
+
+from tests.test_broadcast import FakeSocket
+
+
+class BlockingS3:
+    """put_object가 release될 때까지 스레드를 붙잡는 S3 대역"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Semaphore(0)
+
+    def put_object(self, **kwargs):
+        self.started.release()
+        self.release.wait(5)
+
+
+def test_slow_upload_does_not_delay_fanout_in_other_rooms(monkeypatch):
+    ids = itertools.count(1)
+    s3 = BlockingS3()
+    monkeypatch.setattr(main, "s3_client", s3)
+    monkeypatch.setattr(main, "_load_room_members", lambda room_id: (1, 2))
+    monkeypatch.setattr(main, "_save_message", lambda room_id, sender_id, content=None, message_type="text",
+                        image_url=None: {"id": next(ids), "sender_id": sender_id, "content": content,
+                                         "message_type": message_type, "image_url": image_url,
+                                         "created_at": "2026-01-01 00:00:00"})
+    manager = ConnectionManager(MemoryBackend())
+    monkeypatch.setattr(main, "manager", manager)
+    headers = {"Authorization": f"Bearer {create_jwt({'kakao_id': 'admin', 'is_admin': True})}"}
+
+    async def scenario():
+        await manager.start()
+        socket = FakeSocket()
+        await manager.connect(socket, 2)
+        loop = asyncio.get_running_loop()
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+            # 업로드 스레드를 모두 막고 하나는 큐에서 대기하도록
+            uploads = [
+                asyncio.create_task(client.post(
+                    "/rooms/1/images", params={"sender_id": 1}, headers=headers,
+                    files={"file": ("a.png", b"png", "image/png")},
+                ))
+                for _ in range(CHAT_S3_WORKERS + 1)
+            ]
+            for _ in range(CHAT_S3_WORKERS):
+                assert await loop.run_in_executor(None, s3.started.acquire, True, 2)
+
+            started = loop.time()
+            response = await asyncio.wait_for(
+                client.post("/rooms/2/messages", json={"sender_id": 1, "content": "안녕"}, headers=headers), 1
+            )
+            while not socket.sent and loop.time() - started < 1:
+                await asyncio.sleep(0.001)
+            fanout_seconds = loop.time() - started
+            pending = sum(not task.done() for task in uploads)
+
+            s3.release.set()
+            upload_responses = await asyncio.gather(*uploads)
+        return response, socket, fanout_seconds, pending, upload_responses
+
+    response, socket, fanout_seconds, pending, upload_responses = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert [frame["message"]["content"] for frame in socket.sent] == ["안녕"]
+    assert fanout_seconds < 0.2
+    # 브로드캐스트가 끝날 때까지 업로드는 모두 막혀 있었음
+    assert pending == CHAT_S3_WORKERS + 1
+    assert all(r.status_code == 200 for r in upload_responses)
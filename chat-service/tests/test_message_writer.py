@@ -0,0 +1,230 @@
+# chat-service/tests/test_message_writer.py
+# 메시지 묶음 저장: 커밋 후 ID 반환 / 재시도 시 중복 없음 / 실패는 기다리던 요청 모두에 전달
+import asyncio
+import itertools
+import threading
+
+import pytest
+
+import message_writer
+from message_writer import MessageWriter
+
+
+class FakeStore:
+    """
+    _write_batch / _allocate_ids 대체
+    - 실패 주입 + 커밋된 행 기록, ID는 시퀀스처럼 INSERT 시점(sync) 또는 접수 시점(async)에 배정
+    - block에 든 호출은 커밋 직전에 멈췄다가 release 후 실패 (저장 도중 프로세스 종료 흉내)
+    """
+
+    def __init__(self, fail=(), block=()):
+        self.fail = set(fail)          # 실패시킬 호출 번호 (0부터)
+        self.block = set(block)
+        self.calls = 0
+        self.committed = []            # (id, row)
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def allocate(self, count):
+        with self._lock:
+            return [next(self._ids) for _ in range(count)]
+
+    def write(self, rows):
+        with self._lock:
+            call = self.calls
+            self.calls += 1
+        if call in self.block:
+            self.entered.set()
+            self.release.wait(5)
+            raise RuntimeError(f"killed ({call})")
+        with self._lock:
+            if call in self.fail or "*" in self.fail:
+                raise RuntimeError(f"db down ({call})")
+            ids = [row["id"] if "id" in row else next(self._ids) for row in rows]
+            self.committed.extend(zip(ids, rows))
+            return ids
+
+
+@pytest.fixture
+def store(monkeypatch):
+    def install(**kwargs):
+        fake = FakeStore(**kwargs)
+        monkeypatch.setattr(message_writer, "_write_batch", fake.write)
+        monkeypatch.setattr(message_writer, "_allocate_ids", fake.allocate)
+        return fake
+    monkeypatch.setattr(message_writer, "CHAT_MESSAGE_FLUSH_MS", 5)
+    monkeypatch.setattr(message_writer, "CHAT_MESSAGE_RETRY_BACKOFF", 0.001)
+    return install
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def submit_all(writer, count, room_id=1):
+    return await asyncio.gather(
+        *(writer.submit(room_id, 7, f"m{i}") for i in range(count)), return_exceptions=True
+    )
+
+
+def test_messages_share_one_commit_and_ids_follow_submit_order(store):
+    fake = store()
+
+    async def scenario():
+        writer = MessageWriter("sync")
+        await writer.start()
+        results = await submit_all(writer, 20)
+        await writer.close()
+        return writer, results
+
+    writer, results = run(scenario())
+    assert [r["id"] for r in results] == list(range(1, 21))
+    assert [r["content"] for r in results] == [f"m{i}" for i in range(20)]
+    assert fake.calls == 1
+    assert writer.stats()["written"] == 20
+
+
+def test_batch_size_splits_writes(store, monkeypatch):
+    monkeypatch.setattr(message_writer, "CHAT_MESSAGE_BATCH_SIZE", 4)
+    fake = store()
+
+    async def scenario():
+        writer = MessageWriter("sync")
+        await writer.start()
+        results = await submit_all(writer, 10)
+        await writer.close()
+        return writer, results
+
+    writer, results = run(scenario())
+    assert [r["id"] for r in results] == list(range(1, 11))
+    assert fake.calls == 3
+    assert writer.stats()["max_batch"] == 4
+
+
+def test_failed_batch_is_retried_exactly_once(store):
+    fake = store(fail={0, 1})
+
+    async def scenario():
+        writer = MessageWriter("sync")
+        await writer.start()
+        results = await submit_all(writer, 5)
+        await writer.close()
+        return writer, results
+
+    writer, results = run(scenario())
+    # 롤백된 시도는 행을 남기지 않으므로 메시지마다 정확히 한 번 저장
+    assert [row["content"] for _, row in fake.committed] == [f"m{i}" for i in range(5)]
+    assert [r["id"] for r in results] == [message_id for message_id, _ in fake.committed]
+    assert writer.stats()["failures"] == 2
+    assert writer.stats()["dropped"] == 0
+
+
+def test_exhausted_retries_fail_every_waiting_request(store, monkeypatch):
+    monkeypatch.setattr(message_writer, "CHAT_MESSAGE_RETRIES", 2)
+    fake = store(fail={"*"})
+
+    async def scenario():
+        writer = MessageWriter("sync")
+        await writer.start()
+        results = await submit_all(writer, 3)
+        await writer.close()
+        return writer, results
+
+    writer, results = run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert fake.committed == []
+    assert fake.calls == 3
+    assert writer.stats()["dropped"] == 3
+
+
+def test_older_batch_failure_is_not_reported_as_success(store, monkeypatch):
+    # 앞 묶음은 계속 실패, 뒤 묶음은 성공 → 앞 요청들은 예외, 뒤 요청들만 ID
+    monkeypatch.setattr(message_writer, "CHAT_MESSAGE_BATCH_SIZE", 2)
+    monkeypatch.setattr(message_writer, "CHAT_MESSAGE_RETRIES", 1)
+    fake = store(fail={0, 1})
+
+    async def scenario():
+        writer = MessageWriter("sync")
+        await writer.start()
+        results = await submit_all(writer, 4)
+        await writer.close()
+        return results
+
+    results = run(scenario())
+    assert isinstance(results[0], RuntimeError) and isinstance(results[1], RuntimeError)
+    assert [r["content"] for r in results[2:]] == ["m2", "m3"]
+    assert [row["content"] for _, row in fake.committed] == ["m2", "m3"]
+
+
+def test_close_flushes_pending_messages(store, monkeypatch):
+    monkeypatch.setattr(message_writer, "CHAT_MESSAGE_FLUSH_MS", 10_000)
+    fake = store()
+
+    async def scenario():
+        writer = MessageWriter("sync")
+        await writer.start()
+        pending = asyncio.gather(*(writer.submit(1, 7, f"m{i}") for i in range(3)))
+        await asyncio.sleep(0.01)
+        await writer.close()
+        return await pending
+
+    results = run(scenario())
+    assert [r["id"] for r in results] == [1, 2, 3]
+    assert len(fake.committed) == 3
+
+
+def test_async_mode_returns_ids_before_commit(store):
+    fake = store(block={0})
+
+    async def scenario():
+        writer = MessageWriter("async")
+        await writer.start()
+        results = await submit_all(writer, 5)
+        await asyncio.to_thread(fake.entered.wait, 5)
+        # 저장이 아직 끝나지 않았는데 ID는 접수 순서대로 배정됨
+        committed = list(fake.committed)
+        fake.release.set()
+        await writer.close()
+        return writer, results, committed
+
+    writer, results, committed = run(scenario())
+    assert [r["id"] for r in results] == [1, 2, 3, 4, 5]
+    assert committed == []
+    # 막혔던 시도는 실패 → 재시도로 같은 ID 그대로 저장
+    assert [message_id for message_id, _ in fake.committed] == [1, 2, 3, 4, 5]
+    assert writer.stats()["dropped"] == 0
+
+
+async def _crash_mid_batch(writer, fake, count):
+    """두 번째 묶음 저장 도중 저장 태스크 중단, (응답 받은 메시지, 저장된 메시지) 반환"""
+    await writer.start()
+    tasks = [asyncio.create_task(writer.submit(1, 7, f"m{i}")) for i in range(count)]
+    await asyncio.to_thread(fake.entered.wait, 5)
+    await asyncio.sleep(0.01)
+    writer._task.cancel()
+    fake.release.set()
+    await asyncio.sleep(0.01)
+    acknowledged = [t.result()["content"] for t in tasks if t.done() and not t.cancelled() and not t.exception()]
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return acknowledged, [row["content"] for _, row in fake.committed]
+
+
+@pytest.mark.parametrize("durability", ["sync", "async"])
+def test_crash_mid_batch(store, monkeypatch, durability):
+    monkeypatch.setattr(message_writer, "CHAT_MESSAGE_BATCH_SIZE", 3)
+    fake = store(block={1})
+
+    acknowledged, persisted = run(_crash_mid_batch(MessageWriter(durability), fake, 6))
+    assert persisted == ["m0", "m1", "m2"]
+    if durability == "sync":
+        # 응답한 메시지는 모두 저장됨 (저장 중이던 묶음은 응답하지 않음)
+        assert acknowledged == persisted
+    else:
+        # 모두 바로 응답, 저장 중이던 묶음(최대 CHAT_MESSAGE_BATCH_SIZE건)은 유실
+        assert acknowledged == [f"m{i}" for i in range(6)]
+        assert set(persisted) <= set(acknowledged)
+        assert len(set(acknowledged) - set(persisted)) == 3
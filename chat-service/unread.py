@@ -0,0 +1,219 @@
+# chat-service/unread.py
+# 방별 / 사용자별 읽음 위치 + 안 읽은 메시지 카운터 (chat_room_reads) 유지 + 주기적 보정
+import asyncio
+import os
+import time
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from db import SessionLocal, ChatRoom, ChatRoomRead, Message
+from executors import db_executor
+
+# 카운터 보정 주기 (초, 0이면 끔) / 최근 갱신된 카운터는 보정 대상에서 제외하는 시간 (초)
+CHAT_UNREAD_RECONCILE_INTERVAL = float(os.getenv("CHAT_UNREAD_RECONCILE_INTERVAL", "3600"))
+CHAT_UNREAD_RECONCILE_GRACE = int(os.getenv("CHAT_UNREAD_RECONCILE_GRACE", "60"))
+
+# 여러 워커 / 컨테이너 중 하나만 보정하도록 advisory lock 사용
+RECONCILE_LOCK_NAME = "chat_unread_reconcile"
+
+# 실제 안 읽은 수(읽음 위치 이후 상대가 보낸 메시지)와 다른 카운터만 덮어씀
+RECONCILE_SQL = text("""
+    INSERT INTO chat_room_reads (room_id, user_id, unread_count, updated_at)
+    SELECT r.id, u.user_id, COUNT(m.id), now()
+    FROM chat_rooms r
+    CROSS JOIN LATERAL (SELECT r.user1_id UNION SELECT r.user2_id) AS u(user_id)
+    LEFT JOIN chat_room_reads rr ON rr.room_id = r.id AND rr.user_id = u.user_id
+    LEFT JOIN messages m
+        ON m.room_id = r.id AND m.sender_id <> u.user_id AND m.id > COALESCE(rr.last_read_message_id, 0)
+    GROUP BY r.id, u.user_id
+    ON CONFLICT (room_id, user_id) DO UPDATE
+        SET unread_count = EXCLUDED.unread_count, updated_at = EXCLUDED.updated_at
+        WHERE chat_room_reads.unread_count IS DISTINCT FROM EXCLUDED.unread_count
+          AND (chat_room_reads.updated_at IS NULL
+               OR chat_room_reads.updated_at < now() - make_interval(secs => :grace))
+""")
+
+
+def add_unread(db, sent: list):
+    """
+    저장된 메시지만큼 받는 사람 카운터 증가 (호출한 트랜잭션 안에서 실행)
+    - sent: 실제로 INSERT된 메시지의 (id, room_id, sender_id) 목록
+    - 보낸 사람을 제외한 방 참여자 모두 +1
+    - 읽음 위치 이하의 메시지는 이미 읽음으로 표시되므로(is_read_by) 세지 않음
+    """
+    if not sent:
+        return
+    room_ids = {room_id for _, room_id, _ in sent}
+    members = {
+        room.id: {room.user1_id, room.user2_id}
+        for room in db.query(ChatRoom.id, ChatRoom.user1_id, ChatRoom.user2_id).filter(ChatRoom.id.in_(room_ids))
+    }
+    watermarks = {
+        (row.room_id, row.user_id): row.last_read_message_id
+        for row in db.query(ChatRoomRead.room_id, ChatRoomRead.user_id, ChatRoomRead.last_read_message_id)
+        .filter(ChatRoomRead.room_id.in_(room_ids))
+    }
+
+    counts = Counter()
+    for message_id, room_id, sender_id in sent:
+        for user_id in members.get(room_id, ()):
+            if user_id == sender_id:
+                continue
+            watermark = watermarks.get((room_id, user_id))
+            if watermark is None or message_id > watermark:
+                counts[(room_id, user_id)] += 1
+
+    if not counts:
+        return
+
+    now = datetime.now()
+    # 키 순서대로 갱신 (동시에 저장하는 트랜잭션끼리 교착 방지)
+    stmt = pg_insert(ChatRoomRead).values([
+        {"room_id": room_id, "user_id": user_id, "unread_count": count, "updated_at": now}
+        for (room_id, user_id), count in sorted(counts.items())
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[ChatRoomRead.room_id, ChatRoomRead.user_id],
+        set_={
+            "unread_count": ChatRoomRead.unread_count + stmt.excluded.unread_count,
+            "updated_at": stmt.excluded.updated_at,
+        }
+    ))
+
+
+def mark_read(db, room_id: int, user_id: int):
+    """
+    읽음 처리 (호출한 트랜잭션 안에서 실행)
+    - 읽음 위치를 방의 마지막 메시지 ID로 올리고 카운터를 0으로 (메시지 수와 관계없이 한 행 upsert)
+    - 갱신된 읽음 위치 반환 (메시지가 없으면 None)
+    """
+    last_id = select(func.max(Message.id)).where(Message.room_id == room_id).scalar_subquery()
+    stmt = pg_insert(ChatRoomRead).values(
+        room_id=room_id, user_id=user_id, last_read_message_id=last_id,
+        unread_count=0, updated_at=datetime.now()
+    )
+    return db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ChatRoomRead.room_id, ChatRoomRead.user_id],
+            set_={
+                # 뒤로 가지 않음 (GREATEST는 NULL 무시)
+                "last_read_message_id": func.greatest(
+                    ChatRoomRead.last_read_message_id, stmt.excluded.last_read_message_id
+                ),
+                "unread_count": 0,
+                "updated_at": stmt.excluded.updated_at,
+            }
+        ).returning(ChatRoomRead.last_read_message_id)
+    ).scalar()
+
+
+def read_watermarks(db, room_id: int) -> dict:
+    """방 참여자별 읽음 위치 {user_id: last_read_message_id}"""
+    return dict(
+        db.query(ChatRoomRead.user_id, ChatRoomRead.last_read_message_id)
+        .filter(ChatRoomRead.room_id == room_id)
+        .all()
+    )
+
+
+def is_read_by(message_id: int, sender_id: int, members, watermarks: dict) -> bool:
+    """보낸 사람을 제외한 참여자가 모두 이 메시지까지 읽었는지"""
+    readers = [user_id for user_id in members if user_id != sender_id]
+    return bool(readers) and all(
+        watermarks.get(user_id) is not None and message_id <= watermarks[user_id] for user_id in readers
+    )
+
+
+def reconcile_unread_counters(grace: int = CHAT_UNREAD_RECONCILE_GRACE):
+    """
+    카운터를 messages 기준 실제 값으로 보정
+    - 누락된 카운터 행은 생성, 값이 다른 행만 UPDATE
+    - 방금 갱신된 행은 진행 중인 저장 / 읽음 처리와 겹칠 수 있어 다음 보정으로 미룸
+    - 다른 프로세스가 보정 중이면 None 반환
+    """
+    db = SessionLocal()
+    try:
+        locked = db.execute(
+            text("SELECT pg_try_advisory_xact_lock(hashtext(:name))"), {"name": RECONCILE_LOCK_NAME}
+        ).scalar()
+        if not locked:
+            db.rollback()
+            return None
+        repaired = db.execute(RECONCILE_SQL, {"grace": grace}).rowcount
+        db.commit()
+        return repaired
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class UnreadReconciler:
+    """시작 시 한 번 + CHAT_UNREAD_RECONCILE_INTERVAL마다 카운터 보정 (DB 전용 스레드 풀에서)"""
+
+    def __init__(self, interval: float = CHAT_UNREAD_RECONCILE_INTERVAL):
+        self.interval = interval
+        self._task = None
+        self.runs = 0
+        self.skipped = 0
+        self.errors = 0
+        self.repaired = 0
+        self.last_repaired = 0
+        self.last_run_ms = 0.0
+        self.last_run_at = None
+
+    async def start(self):
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def run_once(self):
+        started = time.perf_counter()
+        try:
+            repaired = await db_executor.run(reconcile_unread_counters)
+        except Exception as e:
+            self.errors += 1
+            print(f"[Unread] 카운터 보정 실패: {e}")
+            return
+        if repaired is None:
+            self.skipped += 1
+            return
+        self.runs += 1
+        self.repaired += repaired
+        self.last_repaired = repaired
+        self.last_run_ms = (time.perf_counter() - started) * 1000
+        self.last_run_at = datetime.now()
+        if repaired:
+            print(f"[Unread] 카운터 {repaired}건 보정")
+
+    async def _loop(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "repaired": self.repaired,
+            "last_repaired": self.last_repaired,
+            "last_run_ms": round(self.last_run_ms, 2),
+            "last_run_at": str(self.last_run_at) if self.last_run_at else None,
+        }
+
+
+# 전역 카운터 보정 인스턴스
+unread_reconciler = UnreadReconciler()
@@ -0,0 +1,62 @@
+# login-service/kakao.py
+# 카카오 OAuth / 사용자 정보 API (비동기, 타임아웃 + 재시도)
+import asyncio
+import os
+
+import httpx
+
+from http_client import http_clients
+
+# 로컬 테스트 시 대체 서버로 바꿀 수 있도록 환경변수로 분리
+KAKAO_AUTH_URL = os.getenv("KAKAO_AUTH_URL", "https://kauth.kakao.com")
+KAKAO_API_URL = os.getenv("KAKAO_API_URL", "https://kapi.kakao.com")
+# 실패 시 재시도 횟수 / 첫 재시도 대기 시간 (초, 시도마다 2배)
+KAKAO_RETRIES = int(os.getenv("KAKAO_RETRIES", "2"))
+KAKAO_RETRY_BACKOFF = float(os.getenv("KAKAO_RETRY_BACKOFF", "0.2"))
+
+http_clients.register("kakao_auth", base_url=KAKAO_AUTH_URL, timeout=5.0, http2=True)
+http_clients.register("kakao_api", base_url=KAKAO_API_URL, timeout=5.0, http2=True)
+
+
+async def _request(upstream: str, method: str, path: str, idempotent: bool, **kwargs) -> httpx.Response:
+    """
+    재시도 포함 요청
+    - 연결 실패는 요청이 전달되지 않았으므로 항상 재시도
+    - 응답 타임아웃 / 5xx는 같은 요청을 다시 보내도 되는 경우(idempotent)만 재시도
+      (인가 코드는 1회용이라 토큰 발급은 재전송하지 않음)
+    """
+    client = http_clients.get(upstream)
+    for attempt in range(KAKAO_RETRIES + 1):
+        last = attempt == KAKAO_RETRIES
+        try:
+            response = await client.request(method, path, **kwargs)
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+            if last:
+                raise
+        except httpx.TransportError:
+            if last or not idempotent:
+                raise
+        else:
+            if response.status_code < 500 or last or not idempotent:
+                return response
+        print(f"[Kakao] {method} {path} 재시도 {attempt + 1}/{KAKAO_RETRIES}")
+        await asyncio.sleep(KAKAO_RETRY_BACKOFF * (2 ** attempt))
+
+
+async def request_token(code: str, client_id: str, client_secret: str, redirect_uri: str) -> httpx.Response:
+    """인가 코드 → access token 발급"""
+    return await _request("kakao_auth", "POST", "/oauth/token", idempotent=False, data={
+        "grant_type": "authorization_code",
+        "client_id": client_id,
+        "client_secret": client_secret,
+        "redirect_uri": redirect_uri,
+        "code": code,
+    })
+
+
+async def request_user_info(access_token: str) -> httpx.Response:
+    """access token으로 카카오 사용자 정보 조회"""
+    return await _request(
+        "kakao_api", "GET", "/v2/user/me", idempotent=True,
+        headers={"Authorization": f"Bearer {access_token}"}
+    )
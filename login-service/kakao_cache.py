@@ -0,0 +1,91 @@
+# login-service/kakao_cache.py
+# 카카오 사용자 정보 캐시 (로그인 시 조회한 프로필을 /submit에서 재사용)
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# 캐시 유지 시간 (초) / 최대 항목 수
+KAKAO_PROFILE_CACHE_TTL = float(os.getenv("KAKAO_PROFILE_CACHE_TTL", "600"))
+KAKAO_PROFILE_CACHE_SIZE = int(os.getenv("KAKAO_PROFILE_CACHE_SIZE", "10000"))
+
+
+def profile_from_user_info(user_info: dict) -> dict:
+    """카카오 /v2/user/me 응답에서 필요한 항목만 추출"""
+    kakao_account = user_info.get("kakao_account", {})
+    return {
+        "id": user_info.get("id"),
+        "nickname": kakao_account.get("profile", {}).get("nickname"),
+        "email": kakao_account.get("email"),
+    }
+
+
+class KakaoProfileCache:
+    """
+    access token 해시 -> 카카오 프로필
+    - 토큰 원문은 보관하지 않음 (sha256 키)
+    - TTL 만료 + 최대 크기 초과 시 가장 오래 안 쓴 항목부터 제거 (LRU)
+    """
+
+    def __init__(self, ttl: float = KAKAO_PROFILE_CACHE_TTL, max_size: int = KAKAO_PROFILE_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    @staticmethod
+    def _key(access_token: str) -> str:
+        return hashlib.sha256(access_token.encode()).hexdigest()
+
+    def get(self, access_token: str):
+        key = self._key(access_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, profile = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(profile)
+
+    def put(self, access_token: str, profile: dict):
+        key = self._key(access_token)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, dict(profile))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+
+    def discard(self, access_token: str):
+        with self._lock:
+            self._entries.pop(self._key(access_token), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
+
+
+# 전역 카카오 프로필 캐시 인스턴스
+kakao_profile_cache = KakaoProfileCache()
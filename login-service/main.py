@@ -1,14 +1,17 @@
 # login-service/main.py
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-import requests
 import os
 import jwt
 import datetime
 import httpx
 
-from jwt_utils import create_jwt, decode_jwt
+from jwt_utils import create_jwt, decode_jwt, token_verifier
+from http_client import http_clients
+from kakao import request_token, request_user_info
+from kakao_cache import kakao_profile_cache, profile_from_user_info
 
 app = FastAPI()
 
@@ -29,6 +32,9 @@ ADMIN_REDIRECT_URI = os.getenv("ADMIN_REDIRECT_URI", os.getenv("KAKAO_REDIRECT_U
 
 USER_SERVICE_URL = os.getenv("USER_SERVICE_URL")
 
+# user-service 호출용 keep-alive 클라이언트
+http_clients.register("user", base_url=USER_SERVICE_URL, timeout=5.0)
+
 # 허용된 관리자 카카오 ID 목록 (쉼표로 구분)
 ADMIN_KAKAO_IDS = os.getenv("ADMIN_KAKAO_IDS", "").split(",")
 ADMIN_KAKAO_IDS = [id.strip() for id in ADMIN_KAKAO_IDS if id.strip()]
@@ -51,15 +57,7 @@ async def login_kakao(data: KakaoCodeRequest):
     print("[요청] 카카오 코드:", data.code)  # 요청 받은 코드 출력
 
     # 1. 카카오 access token 얻기
-    token_url = "https://kauth.kakao.com/oauth/token"
-    token_data = {
-        "grant_type": "authorization_code",
-        "client_id": REST_API_KEY,
-        "client_secret": CLIENT_SECRET,
-        "redirect_uri": REDIRECT_URI,
-        "code": data.code,
-    }
-    token_res = requests.post(token_url, data=token_data)
+    token_res = await request_token(data.code, REST_API_KEY, CLIENT_SECRET, REDIRECT_URI)
     print("[카카오 토큰 요청] 상태:", token_res.status_code)
     print("[카카오 토큰 요청] 응답:", token_res.text)
 
@@ -69,10 +67,7 @@ async def login_kakao(data: KakaoCodeRequest):
     print("[카카오 access token]:", access_token)
 
     # 2. 카카오에서 이메일, 닉네임 가져오기
-    user_info_res = requests.get(
-        "https://kapi.kakao.com/v2/user/me",
-        headers={"Authorization": f"Bearer {access_token}"}
-    )
+    user_info_res = await request_user_info(access_token)
     print("[카카오 사용자 정보 요청] 상태:", user_info_res.status_code)
     print("[카카오 사용자 정보 요청] 응답:", user_info_res.text)
 
@@ -83,14 +78,16 @@ async def login_kakao(data: KakaoCodeRequest):
     kakao_account = user_info.get("kakao_account", {})
     nickname = kakao_account.get("profile", {}).get("nickname")
     kakao_id = user_info.get("id")  # 여기서 가져와야 함
+
+    # /submit에서 같은 토큰으로 다시 조회하지 않도록 보관
+    kakao_profile_cache.put(access_token, profile_from_user_info(user_info))
     print(f"[카카오 사용자 정보] nickname: {nickname}, id: {kakao_id}")
 
     # 3. user-service에 이메일 확인 요청
-    async with httpx.AsyncClient() as client:
-        response = await client.post(f"{USER_SERVICE_URL}/users/login-or-register", json={
-            "kakao_id": str(kakao_id),  # 이메일 대신 카카오 ID
-            "nickname": nickname
-        })
+    response = await http_clients.get("user").post("/users/login-or-register", json={
+        "kakao_id": str(kakao_id),  # 이메일 대신 카카오 ID
+        "nickname": nickname
+    })
 
     print("[User-service 요청] 상태:", response.status_code)
     print("[User-service 응답]:", response.text)
@@ -102,9 +99,8 @@ async def login_kakao(data: KakaoCodeRequest):
 
     # 4. 회원/비회원 판정
     if user.get("member_status") == "회원":
-        url = f"{USER_SERVICE_URL}/users/{kakao_id}"
         try:
-            response = httpx.get(url, timeout=5.0)
+            response = await http_clients.get("user").get(f"/users/{kakao_id}")
             response.raise_for_status()
             user_data = response.json()
             name = user_data.get("name")  # user-service에서 받은 이름
@@ -117,11 +113,11 @@ async def login_kakao(data: KakaoCodeRequest):
             name = None
         print(f"[로그인] 회원")
         # 5. JWT 생성 후 반환
-        jwt_token = create_jwt({"nickname": nickname, "kakaotoken" : access_token })
+        jwt_token = create_jwt({"kakao_id": str(kakao_id), "nickname": nickname, "kakaotoken" : access_token })
         print("[JWT 생성] token:", jwt_token)
     else:
         # 5. JWT 생성 후 반환
-        jwt_token = create_jwt({"nickname": nickname, "kakaotoken" : access_token })
+        jwt_token = create_jwt({"kakao_id": str(kakao_id), "nickname": nickname, "kakaotoken" : access_token })
         print("[JWT 생성] token:", jwt_token)
         print(f"[로그인] 비회원")
 
@@ -150,17 +146,17 @@ async def submit_user_data(request: Request, data: SubmitRequest):
     if not kakao_token:
         raise HTTPException(status_code=401, detail="JWT에 카카오 토큰이 없습니다.")
 
-    kakao_res = requests.get(
-        "https://kapi.kakao.com/v2/user/me",
-        headers={"Authorization": f"Bearer {kakao_token}"}
-    )
-    if kakao_res.status_code != 200:
-        raise HTTPException(status_code=401, detail="카카오 토큰이 유효하지 않습니다.")
-
-    kakao_info = kakao_res.json()
-    kakao_id = kakao_info.get("id")
-    kakao_account = kakao_info.get("kakao_account", {})
-    email = kakao_account.get("email")
+    # 로그인 때 조회한 프로필이 캐시에 있으면 카카오 호출 생략
+    kakao_profile = kakao_profile_cache.get(kakao_token)
+    if kakao_profile is None:
+        kakao_res = await request_user_info(kakao_token)
+        if kakao_res.status_code != 200:
+            raise HTTPException(status_code=401, detail="카카오 토큰이 유효하지 않습니다.")
+        kakao_profile = profile_from_user_info(kakao_res.json())
+        kakao_profile_cache.put(kakao_token, kakao_profile)
+
+    kakao_id = kakao_profile["id"]
+    email = kakao_profile["email"]
     print(email)
 
     # 4. 생년월일 + 시간 + 양력/음력 + 오전/오후 합치기
@@ -179,9 +175,7 @@ async def submit_user_data(request: Request, data: SubmitRequest):
     print("최종 JSON:", result)
 
     # 6. user-service로 전송
-    USER_SERVICE_URL = os.getenv("USER_SERVICE_URL")  # 예: http://user-service:8000/users
-    async with httpx.AsyncClient() as client:
-        user_res = await client.post(f"{USER_SERVICE_URL}/users/add", json=result)
+    user_res = await http_clients.get("user").post("/users/add", json=result)
     
     if user_res.status_code != 200:
         raise HTTPException(status_code=500, detail="User service DB 삽입 실패")
@@ -211,15 +205,7 @@ async def admin_login_kakao(data: AdminKakaoCodeRequest):
     redirect_uri = data.redirect_uri or ADMIN_REDIRECT_URI
 
     # 1. 카카오 access token 얻기
-    token_url = "https://kauth.kakao.com/oauth/token"
-    token_data = {
-        "grant_type": "authorization_code",
-        "client_id": REST_API_KEY,
-        "client_secret": CLIENT_SECRET,
-        "redirect_uri": redirect_uri,
-        "code": data.code,
-    }
-    token_res = requests.post(token_url, data=token_data)
+    token_res = await request_token(data.code, REST_API_KEY, CLIENT_SECRET, redirect_uri)
     print("[관리자 카카오 토큰 요청] 상태:", token_res.status_code)
 
     if token_res.status_code != 200:
@@ -228,10 +214,7 @@ async def admin_login_kakao(data: AdminKakaoCodeRequest):
     access_token = token_res.json().get("access_token")
 
     # 2. 카카오에서 사용자 정보 가져오기
-    user_info_res = requests.get(
-        "https://kapi.kakao.com/v2/user/me",
-        headers={"Authorization": f"Bearer {access_token}"}
-    )
+    user_info_res = await request_user_info(access_token)
 
     if user_info_res.status_code != 200:
         raise HTTPException(status_code=401, detail="Invalid Kakao token")
@@ -304,7 +287,63 @@ async def verify_admin(request: Request):
     }
 
 
+@app.post("/logout")
+async def logout(request: Request):
+    """
+    로그아웃
+    - 현재 JWT를 만료 시각까지 폐기 목록(revoked_tokens)에 등록 (모든 서비스에 JWT_REVOCATION_POLL초 안에 반영)
+    - 해당 카카오 토큰의 프로필 캐시도 제거
+    """
+    auth_header = request.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="JWT 토큰이 필요합니다")
+
+    token = auth_header.split(" ")[1]
+
+    try:
+        # 폐기 목록 DB 기록은 블로킹이므로 스레드풀에서 (이벤트 루프의 다른 요청이 기다리지 않도록)
+        payload = await run_in_threadpool(token_verifier.revoke, token)
+    except ValueError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    except Exception as e:
+        # 폐기 목록에 기록하지 못하면 토큰이 계속 유효하므로 로그아웃 실패로 응답
+        raise HTTPException(status_code=503, detail=f"로그아웃 처리 실패: {e}")
+
+    if payload.get("kakaotoken"):
+        kakao_profile_cache.discard(payload["kakaotoken"])
+
+    return {"status": "logged_out"}
+
+
 @app.get("/health")
 def health_check():
     """헬스체크"""
     return {"status": "ok", "service": "login-service"}
+
+
+@app.get("/metrics/http")
+def get_http_metrics():
+    """업스트림별 HTTP 요청 수 / 커넥션 재사용률"""
+    return http_clients.stats()
+
+
+@app.get("/metrics/cache")
+def get_cache_metrics():
+    """카카오 프로필 캐시 / JWT 검증 캐시 적중률"""
+    return {"kakao_profile": kakao_profile_cache.stats(), "jwt": token_verifier.stats()}
+
+
+@app.on_event("startup")
+async def start_http_clients():
+    await http_clients.start()
+
+
+@app.on_event("startup")
+def start_jwt_revocations():
+    """로그아웃 토큰 목록 첫 동기화 (요청 처리 중에는 DB를 기다리지 않도록 시작 시 한 번)"""
+    token_verifier.revocations.start()
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await http_clients.close()
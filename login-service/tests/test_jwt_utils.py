@@ -0,0 +1,107 @@
+# login-service/tests/test_jwt_utils.py
+# JWT 검증 캐시 / 로그아웃 폐기 목록 (다른 프로세스 간 공유는 SQLite 파일 DB로 확인)
+import threading
+import time
+
+import jwt
+import pytest
+
+from jwt_utils import ALGORITHM, SECRET_KEY, RevocationStore, TokenVerifier, create_jwt
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'revocations.db'}"
+
+
+def _verifier(url=None):
+    return TokenVerifier(revocations=RevocationStore(url, poll=3600))
+
+
+def test_verified_token_is_cached():
+    verifier = _verifier()
+    token = create_jwt({"kakao_id": "42"})
+
+    assert verifier.verify(token)["kakao_id"] == "42"
+    assert verifier.verify(token)["kakao_id"] == "42"
+    assert (verifier.hits, verifier.misses) == (1, 1)
+
+
+def test_token_without_exp_is_rejected():
+    token = jwt.encode({"kakao_id": "42"}, SECRET_KEY, algorithm=ALGORITHM)
+
+    with pytest.raises(ValueError):
+        _verifier().verify(token)
+
+
+def test_revoked_token_is_rejected_even_when_cached():
+    verifier = _verifier()
+    token = create_jwt({"kakao_id": "42"})
+    verifier.verify(token)
+
+    verifier.revoke(token)
+
+    with pytest.raises(ValueError, match="로그아웃"):
+        verifier.verify(token)
+
+
+def test_revocation_reaches_other_processes_after_sync(db_url):
+    login = _verifier(db_url)
+    user_service = _verifier(db_url)
+    token = create_jwt({"kakao_id": "42"})
+    user_service.verify(token)
+
+    login.revoke(token)
+    user_service.revocations.sync()
+
+    with pytest.raises(ValueError, match="로그아웃"):
+        user_service.verify(token)
+
+
+def test_revocation_survives_restart(db_url):
+    token = create_jwt({"kakao_id": "42"})
+    _verifier(db_url).revoke(token)
+
+    # 새 프로세스: startup 훅(start)에서 DB 목록을 읽음
+    restarted = _verifier(db_url)
+    restarted.revocations.start()
+
+    with pytest.raises(ValueError, match="로그아웃"):
+        restarted.verify(token)
+    assert restarted.revocations.stats()["revoked"] == 1
+
+
+def test_expired_revocations_are_dropped(db_url):
+    store = RevocationStore(db_url, poll=3600)
+    store.add("old", time.time() - 1)
+    store.add("new", time.time() + 60)
+
+    store.sync()
+
+    assert not store.is_revoked("old")
+    assert store.is_revoked("new")
+    assert store.stats()["revoked"] == 1
+
+
+def test_logout_fails_when_store_is_unavailable(tmp_path):
+    verifier = _verifier(f"sqlite:///{tmp_path / 'missing' / 'revocations.db'}")
+    token = create_jwt({"kakao_id": "42"})
+
+    with pytest.raises(Exception):
+        verifier.revoke(token)
+
+
+def test_unstarted_store_does_not_block_request_path(db_url, monkeypatch):
+    store = RevocationStore(db_url, poll=3600)
+    synced = threading.Event()
+
+    def slow_sync():
+        time.sleep(0.5)
+        synced.set()
+
+    monkeypatch.setattr(store, "sync", slow_sync)
+    started = time.perf_counter()
+    assert not store.is_revoked("key")
+    # 첫 동기화는 백그라운드 스레드에서
+    assert time.perf_counter() - started < 0.1
+    assert synced.wait(2)
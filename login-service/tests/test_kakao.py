@@ -0,0 +1,97 @@
+# login-service/tests/test_kakao.py
+# 카카오 API 호출: 재시도 정책 (인가 코드는 재전송 안 함) / 동시 요청이 서로 막지 않음
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import kakao
+from http_client import http_clients
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """카카오 서버 대신 MockTransport 응답 (handler는 호출 순서대로 결과 반환)"""
+    monkeypatch.setattr(kakao, "KAKAO_RETRY_BACKOFF", 0)
+    calls = []
+
+    def install(*results, delay=0.0):
+        results = list(results)
+
+        async def handler(request: httpx.Request):
+            calls.append(request)
+            if delay:
+                await asyncio.sleep(delay)
+            result = results.pop(0) if len(results) > 1 else results[0]
+            if isinstance(result, Exception):
+                raise result
+            return httpx.Response(result, json={"id": 42})
+
+        transport = httpx.MockTransport(handler)
+        for name, base_url in (("kakao_auth", kakao.KAKAO_AUTH_URL), ("kakao_api", kakao.KAKAO_API_URL)):
+            monkeypatch.setitem(http_clients._clients, name,
+                                httpx.AsyncClient(transport=transport, base_url=base_url))
+        return calls
+
+    return install
+
+
+def user_info():
+    return asyncio.run(kakao.request_user_info("token"))
+
+
+def token():
+    return asyncio.run(kakao.request_token("code", "id", "secret", "http://localhost/cb"))
+
+
+def test_user_info_retries_server_errors(upstream):
+    calls = upstream(503, 502, 200)
+    assert user_info().status_code == 200
+    assert len(calls) == 3
+    assert calls[0].headers["Authorization"] == "Bearer token"
+
+
+def test_user_info_returns_last_error_after_retries(upstream):
+    calls = upstream(503)
+    assert user_info().status_code == 503
+    assert len(calls) == kakao.KAKAO_RETRIES + 1
+
+
+def test_user_info_retries_read_timeout(upstream):
+    calls = upstream(httpx.ReadTimeout("slow"), 200)
+    assert user_info().status_code == 200
+    assert len(calls) == 2
+
+
+def test_token_is_not_resent_after_server_error_or_timeout(upstream):
+    calls = upstream(503)
+    assert token().status_code == 503
+    assert len(calls) == 1
+
+    calls.clear()
+    upstream(httpx.ReadTimeout("slow"))
+    with pytest.raises(httpx.ReadTimeout):
+        token()
+    assert len(calls) == 1
+
+
+def test_token_retries_connection_failures(upstream):
+    calls = upstream(httpx.ConnectError("refused"), 200)
+    assert token().status_code == 200
+    assert len(calls) == 2
+    assert b"grant_type=authorization_code" in calls[-1].content
+
+
+def test_concurrent_logins_do_not_serialize(upstream):
+    upstream(200, delay=0.05)
+
+    async def scenario():
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(kakao.request_user_info(f"t{i}") for i in range(20)))
+        return responses, time.perf_counter() - started
+
+    responses, elapsed = asyncio.run(scenario())
+    assert all(r.status_code == 200 for r in responses)
+    # 순차 실행이면 1초, 이벤트 루프를 막지 않으면 한 번의 지연 수준
+    assert elapsed < 0.5
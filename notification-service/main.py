@@ -1,16 +1,21 @@
 # notification-service/main.py
 # 알림 서비스 (FCM 푸시 알림)
 import os
+import asyncio
+import time
+from collections import Counter
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, BigInteger, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, Boolean, Text, ForeignKey, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
+from db_pool import create_pooled_engine, pool_stats
 from fcm import init_firebase, send_notification, send_notification_batch, get_notification_content
 
 load_dotenv()
@@ -40,9 +45,13 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT", "5432")
 DB_NAME = os.getenv("DB_NAME")
 
+# 안 읽은 알림 카운터 보정 주기 (초, 0이면 끔) / 최근 갱신된 카운터는 보정 대상에서 제외하는 시간 (초)
+NOTIFICATION_UNREAD_RECONCILE_INTERVAL = float(os.getenv("NOTIFICATION_UNREAD_RECONCILE_INTERVAL", "3600"))
+NOTIFICATION_UNREAD_RECONCILE_GRACE = int(os.getenv("NOTIFICATION_UNREAD_RECONCILE_GRACE", "60"))
+
 SQLALCHEMY_DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, echo=True, future=True)
+engine = create_pooled_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -76,10 +85,165 @@ class Notification(Base):
     created_at = Column(DateTime, nullable=True)
 
 
+class NotificationCounter(Base):
+    """사용자별 안 읽은 알림 수 (알림 저장 시 증가, 읽음 처리 시 감소 / 0으로)"""
+    __tablename__ = "notification_counters"
+
+    user_id = Column(BigInteger, primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True)
+
+
 def create_tables():
     Base.metadata.create_all(bind=engine)
 
 
+# ===== 안 읽은 알림 카운터 =====
+
+# 여러 워커 / 컨테이너 중 하나만 보정하도록 advisory lock 사용
+RECONCILE_LOCK_NAME = "notification_unread_reconcile"
+
+# 실제 안 읽은 알림 수와 다른 카운터만 덮어씀 (알림이 있는 사용자 + 기존 카운터 행)
+RECONCILE_SQL = text("""
+    INSERT INTO notification_counters (user_id, unread_count, updated_at)
+    SELECT u.user_id, COUNT(n.id), now()
+    FROM (
+        SELECT DISTINCT user_id FROM notifications
+        UNION
+        SELECT user_id FROM notification_counters
+    ) u
+    LEFT JOIN notifications n ON n.user_id = u.user_id AND n.is_read = false
+    GROUP BY u.user_id
+    ON CONFLICT (user_id) DO UPDATE
+        SET unread_count = EXCLUDED.unread_count, updated_at = EXCLUDED.updated_at
+        WHERE notification_counters.unread_count IS DISTINCT FROM EXCLUDED.unread_count
+          AND (notification_counters.updated_at IS NULL
+               OR notification_counters.updated_at < now() - make_interval(secs => :grace))
+""")
+
+
+def add_unread(db, user_ids: list):
+    """알림 저장 시 사용자별 카운터 증가 (호출한 트랜잭션 안에서 실행)"""
+    counts = Counter(user_ids)
+    if not counts:
+        return
+    now = datetime.now()
+    # 키 순서대로 갱신 (동시에 저장하는 트랜잭션끼리 교착 방지)
+    stmt = pg_insert(NotificationCounter).values([
+        {"user_id": user_id, "unread_count": count, "updated_at": now}
+        for user_id, count in sorted(counts.items())
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[NotificationCounter.user_id],
+        set_={
+            "unread_count": NotificationCounter.unread_count + stmt.excluded.unread_count,
+            "updated_at": stmt.excluded.updated_at,
+        }
+    ))
+
+
+def set_unread(db, user_id: int, delta: int = None):
+    """읽음 처리 시 카운터 감소 (delta=None이면 0으로, 음수로 내려가지 않음)"""
+    values = {"unread_count": 0, "updated_at": datetime.now()}
+    if delta is not None:
+        values["unread_count"] = func.greatest(NotificationCounter.unread_count + delta, 0)
+    db.query(NotificationCounter).filter(
+        NotificationCounter.user_id == user_id
+    ).update(values, synchronize_session=False)
+
+
+def reconcile_unread_counters(grace: int = NOTIFICATION_UNREAD_RECONCILE_GRACE):
+    """
+    카운터를 notifications 기준 실제 값으로 보정
+    - 누락된 카운터 행은 생성, 값이 다른 행만 UPDATE
+    - 방금 갱신된 행은 진행 중인 저장 / 읽음 처리와 겹칠 수 있어 다음 보정으로 미룸
+    - 다른 프로세스가 보정 중이면 None 반환
+    """
+    db = SessionLocal()
+    try:
+        locked = db.execute(
+            text("SELECT pg_try_advisory_xact_lock(hashtext(:name))"), {"name": RECONCILE_LOCK_NAME}
+        ).scalar()
+        if not locked:
+            db.rollback()
+            return None
+        repaired = db.execute(RECONCILE_SQL, {"grace": grace}).rowcount
+        db.commit()
+        return repaired
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class UnreadReconciler:
+    """시작 시 한 번 + NOTIFICATION_UNREAD_RECONCILE_INTERVAL마다 카운터 보정 (스레드에서 실행)"""
+
+    def __init__(self, interval: float = NOTIFICATION_UNREAD_RECONCILE_INTERVAL):
+        self.interval = interval
+        self._task = None
+        self.runs = 0
+        self.skipped = 0
+        self.errors = 0
+        self.repaired = 0
+        self.last_repaired = 0
+        self.last_run_ms = 0.0
+        self.last_run_at = None
+
+    async def start(self):
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def run_once(self):
+        started = time.perf_counter()
+        try:
+            repaired = await asyncio.to_thread(reconcile_unread_counters)
+        except Exception as e:
+            self.errors += 1
+            print(f"[Unread] 카운터 보정 실패: {e}")
+            return
+        if repaired is None:
+            self.skipped += 1
+            return
+        self.runs += 1
+        self.repaired += repaired
+        self.last_repaired = repaired
+        self.last_run_ms = (time.perf_counter() - started) * 1000
+        self.last_run_at = datetime.now()
+        if repaired:
+            print(f"[Unread] 카운터 {repaired}건 보정")
+
+    async def _loop(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "repaired": self.repaired,
+            "last_repaired": self.last_repaired,
+            "last_run_ms": round(self.last_run_ms, 2),
+            "last_run_at": str(self.last_run_at) if self.last_run_at else None,
+        }
+
+
+# 전역 카운터 보정 인스턴스
+unread_reconciler = UnreadReconciler()
+
+
 # ===== Pydantic 모델 =====
 
 class DeviceRegisterRequest(BaseModel):
@@ -111,6 +275,18 @@ def health_check():
     return {"status": "ok", "service": "notification-service"}
 
 
+@app.get("/metrics/db")
+def get_db_metrics():
+    """DB 커넥션 풀 대기 시간 / 사용 중 커넥션 / 느린 쿼리 집계"""
+    return pool_stats()
+
+
+@app.get("/metrics/unread")
+def get_unread_metrics():
+    """안 읽은 알림 카운터 보정 현황"""
+    return unread_reconciler.stats()
+
+
 @app.post("/devices/register")
 def register_device(data: DeviceRegisterRequest):
     """
@@ -231,6 +407,7 @@ def send_notification_api(data: SendNotificationRequest):
             created_at=datetime.now()
         )
         db.add(notification)
+        add_unread(db, [data.user_id])
         db.commit()
 
         return {
@@ -292,6 +469,7 @@ def send_batch_notification(data: BatchNotificationRequest):
             )
             db.add(notification)
 
+        add_unread(db, data.user_ids)
         db.commit()
 
         return {
@@ -322,11 +500,10 @@ def get_my_notifications(
             Notification.user_id == user_id
         ).order_by(Notification.created_at.desc()).offset(offset).limit(limit).all()
 
-        # 읽지 않은 알림 수
-        unread_count = db.query(Notification).filter(
-            Notification.user_id == user_id,
-            Notification.is_read == False
-        ).count()
+        # 읽지 않은 알림 수 (카운터 조회)
+        unread_count = db.query(NotificationCounter.unread_count).filter(
+            NotificationCounter.user_id == user_id
+        ).scalar() or 0
 
         result = []
         for n in notifications:
@@ -349,6 +526,20 @@ def get_my_notifications(
         db.close()
 
 
+@app.get("/notifications/unread-count")
+def get_unread_count(user_id: int = Query(..., description="사용자 ID")):
+    """안 읽은 알림 수 (뱃지, 카운터 조회)"""
+    db = SessionLocal()
+    try:
+        unread_count = db.query(NotificationCounter.unread_count).filter(
+            NotificationCounter.user_id == user_id
+        ).scalar() or 0
+        return {"user_id": user_id, "unread_count": unread_count}
+
+    finally:
+        db.close()
+
+
 @app.put("/notifications/{notification_id}/read")
 def mark_notification_read(notification_id: int):
     """알림 읽음 처리"""
@@ -361,7 +552,13 @@ def mark_notification_read(notification_id: int):
         if not notification:
             raise HTTPException(status_code=404, detail="알림을 찾을 수 없습니다")
 
-        notification.is_read = True
+        # 안 읽은 알림이었을 때만 카운터 감소 (동시 요청으로 두 번 감소하지 않도록 조건부 UPDATE)
+        updated = db.query(Notification).filter(
+            Notification.id == notification_id,
+            Notification.is_read == False
+        ).update({"is_read": True}, synchronize_session=False)
+        if updated:
+            set_unread(db, notification.user_id, -1)
         db.commit()
 
         return {"message": "읽음 처리되었습니다"}
@@ -384,6 +581,7 @@ def mark_all_notifications_read(user_id: int = Query(...)):
             Notification.user_id == user_id,
             Notification.is_read == False
         ).update({"is_read": True})
+        set_unread(db, user_id)
 
         db.commit()
         return {"message": "모든 알림이 읽음 처리되었습니다"}
@@ -402,3 +600,14 @@ def startup():
     create_tables()
     init_firebase()
     print("[notification-service] 시작됨")
+
+
+@app.on_event("startup")
+async def start_unread_reconciler():
+    # 시작 시 한 번 보정 (카운터 도입 전 알림 포함) 후 주기적으로 반복
+    await unread_reconciler.start()
+
+
+@app.on_event("shutdown")
+async def close_unread_reconciler():
+    await unread_reconciler.close()
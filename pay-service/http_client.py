@@ -0,0 +1,145 @@
+# http_client.py
+# 서비스 간 / 외부 API 호출용 공유 HTTP 클라이언트 (keep-alive 커넥션 재사용)
+# 서비스마다 빌드 컨텍스트가 달라 chat/pay/login/place-service에 같은 사본을 둠
+import os
+import threading
+import time
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+# HTTP/2 사용 여부 (http2=True로 등록한 업스트림에만 적용)
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "1") == "1"
+
+
+class UpstreamMetrics:
+    """업스트림 하나의 요청 수 / 새 연결 수 / 응답 시간"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+
+    def record(self, seconds: float, new_connection: bool, error: bool = False):
+        with self._lock:
+            self.requests += 1
+            self.total_seconds += seconds
+            if new_connection:
+                self.new_connections += 1
+            if error:
+                self.errors += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            reused = self.requests - self.new_connections
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_rate": round(reused / self.requests, 3) if self.requests else 0,
+                "errors": self.errors,
+                "avg_ms": round(self.total_seconds / self.requests * 1000, 1) if self.requests else 0,
+            }
+
+
+class _RequestTrace:
+    """httpcore trace 확장 - 요청 중 TCP 연결을 새로 맺었는지 기록"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.new_connection = False
+
+    async def __call__(self, event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.complete":
+            self.new_connection = True
+
+
+class HttpClients:
+    """
+    업스트림별 공유 AsyncClient
+    - register()로 업스트림 등록 → startup에서 start(), shutdown에서 close()
+    - 타임아웃은 업스트림별, 환경변수 HTTP_TIMEOUT_<이름>으로 조정
+    """
+
+    def __init__(self):
+        self._upstreams = {}
+        self._clients = {}
+        self._metrics = {}
+
+    def register(self, name: str, base_url: str = None, timeout: float = 5.0, http2: bool = False):
+        timeout = float(os.getenv(f"HTTP_TIMEOUT_{name.upper()}", timeout))
+        self._upstreams[name] = {"base_url": base_url or "", "timeout": timeout, "http2": http2 and HTTP2_ENABLED}
+        self._metrics[name] = UpstreamMetrics()
+
+    def _create(self, name: str) -> httpx.AsyncClient:
+        upstream = self._upstreams[name]
+        metrics = self._metrics[name]
+
+        async def on_request(request: httpx.Request):
+            request.extensions["trace"] = _RequestTrace()
+
+        async def on_response(response: httpx.Response):
+            trace = response.request.extensions.get("trace")
+            if isinstance(trace, _RequestTrace):
+                metrics.record(
+                    time.perf_counter() - trace.started,
+                    trace.new_connection,
+                    error=response.status_code >= 500
+                )
+
+        kwargs = dict(
+            base_url=upstream["base_url"],
+            timeout=httpx.Timeout(upstream["timeout"], connect=min(HTTP_CONNECT_TIMEOUT, upstream["timeout"])),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            ),
+            event_hooks={"request": [on_request], "response": [on_response]},
+        )
+        try:
+            return httpx.AsyncClient(http2=upstream["http2"], **kwargs)
+        except ImportError:
+            # h2 패키지가 없으면 HTTP/1.1로 동작
+            print(f"[HTTP] {name}: h2 패키지가 없어 HTTP/1.1 사용")
+            upstream["http2"] = False
+            return httpx.AsyncClient(**kwargs)
+
+    async def start(self):
+        for name in self._upstreams:
+            if name not in self._clients:
+                self._clients[name] = self._create(name)
+
+    async def close(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """업스트림 클라이언트 (startup 이전 호출이면 이 자리에서 생성)"""
+        client = self._clients.get(name)
+        if client is None:
+            client = self._clients[name] = self._create(name)
+        return client
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                **self._metrics[name].stats(),
+                "http2": upstream["http2"],
+                "timeout_seconds": upstream["timeout"],
+            }
+            for name, upstream in self._upstreams.items()
+        }
+
+
+# 전역 HTTP 클라이언트 인스턴스
+http_clients = HttpClients()
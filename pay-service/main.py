@@ -5,10 +5,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
-import httpx
 import os
 import base64
 
+from http_client import http_clients
+
 app = FastAPI(
     title="Pay Service",
     description="토스페이먼츠 결제 처리 서비스",
@@ -39,6 +40,10 @@ USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://user-service:8001")
 # 토스 API 기본 URL
 TOSS_API_BASE = "https://api.tosspayments.com/v1"
 
+# 업스트림별 keep-alive 클라이언트 (토스는 HTTP/2 지원)
+http_clients.register("toss", base_url=TOSS_API_BASE, timeout=30.0, http2=True)
+http_clients.register("user", base_url=USER_SERVICE_URL, timeout=10.0)
+
 
 # ===== Pydantic Models =====
 
@@ -114,6 +119,22 @@ def health_check():
     return {"status": "ok", "service": "pay-service"}
 
 
+@app.get("/metrics/http")
+def get_http_metrics():
+    """업스트림별 HTTP 요청 수 / 커넥션 재사용률"""
+    return http_clients.stats()
+
+
+@app.on_event("startup")
+async def start_http_clients():
+    await http_clients.start()
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await http_clients.close()
+
+
 @app.post("/payments/ready", response_model=PaymentReadyResponse)
 async def payment_ready(req: PaymentReadyRequest):
     """
@@ -153,17 +174,15 @@ async def payment_confirm(req: PaymentConfirmRequest):
     - 토스에 최종 승인 요청 및 회원 등급 업데이트
     """
     # 토스 결제 승인 API 호출
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{TOSS_API_BASE}/payments/confirm",
-            headers=get_toss_auth_header(),
-            json={
-                "paymentKey": req.payment_key,
-                "orderId": req.order_id,
-                "amount": req.amount
-            },
-            timeout=30.0
-        )
+    response = await http_clients.get("toss").post(
+        "/payments/confirm",
+        headers=get_toss_auth_header(),
+        json={
+            "paymentKey": req.payment_key,
+            "orderId": req.order_id,
+            "amount": req.amount
+        }
+    )
 
     if response.status_code != 200:
         error_data = response.json()
@@ -181,15 +200,13 @@ async def payment_confirm(req: PaymentConfirmRequest):
             user_id = int(parts[1])
 
             # 결제 성공 시 user-service에 회원 등급 업데이트 요청
-            async with httpx.AsyncClient() as client:
-                await client.patch(
-                    f"{USER_SERVICE_URL}/users/{user_id}/membership",
-                    json={
-                        "membership_type": "결제회원",
-                        "payment_date": data.get("approvedAt", datetime.now().isoformat())
-                    },
-                    timeout=10.0
-                )
+            await http_clients.get("user").patch(
+                f"/users/{user_id}/membership",
+                json={
+                    "membership_type": "결제회원",
+                    "payment_date": data.get("approvedAt", datetime.now().isoformat())
+                }
+            )
     except (ValueError, IndexError) as e:
         print(f"[결제 승인] user_id 추출 실패: {e}")
 
@@ -208,12 +225,11 @@ async def get_payment(payment_key: str):
     """
     결제 상태 조회 API
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{TOSS_API_BASE}/payments/{payment_key}",
-            headers=get_toss_auth_header(),
-            timeout=10.0
-        )
+    response = await http_clients.get("toss").get(
+        f"/payments/{payment_key}",
+        headers=get_toss_auth_header(),
+        timeout=10.0
+    )
 
     if response.status_code != 200:
         raise HTTPException(status_code=404, detail="결제 정보를 찾을 수 없습니다")
@@ -235,13 +251,11 @@ async def cancel_payment(payment_key: str, cancel_reason: str = "고객 요청")
     """
     결제 취소 API
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{TOSS_API_BASE}/payments/{payment_key}/cancel",
-            headers=get_toss_auth_header(),
-            json={"cancelReason": cancel_reason},
-            timeout=30.0
-        )
+    response = await http_clients.get("toss").post(
+        f"/payments/{payment_key}/cancel",
+        headers=get_toss_auth_header(),
+        json={"cancelReason": cancel_reason}
+    )
 
     if response.status_code != 200:
         error_data = response.json()
@@ -1,11 +1,13 @@
 # place-service/db.py
 # 데이트 장소 및 코스 관리용 DB 모델
 import os
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, BigInteger, Boolean, Text, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, Boolean, Text, Float, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
+from db_pool import create_pooled_engine
+
 load_dotenv()
 
 DB_USER = os.getenv("DB_USER")
@@ -16,7 +18,7 @@ DB_NAME = os.getenv("DB_NAME")
 
 SQLALCHEMY_DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, echo=True, future=True)
+engine = create_pooled_engine(SQLALCHEMY_DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -0,0 +1,168 @@
+# db_pool.py
+# DB 엔진 생성 공통 모듈 (커넥션 풀 설정 / 풀 대기 시간 / 느린 쿼리 로그)
+# 서비스마다 빌드 컨텍스트가 달라 user/chat/place/notification-service에 같은 사본을 둠
+import os
+import random
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+# 모든 SQL 출력 (디버깅용, 기본 꺼짐)
+DB_ECHO = os.getenv("DB_ECHO", "0") == "1"
+# 이 시간(ms) 이상 걸린 쿼리를 느린 쿼리로 집계
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+# 느린 쿼리 중 로그로 남길 비율 (0~1)
+DB_SLOW_QUERY_SAMPLE = float(os.getenv("DB_SLOW_QUERY_SAMPLE", "1.0"))
+
+
+class PoolMetrics:
+    """엔진 하나의 풀 대기 시간 / 쿼리 집계"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.slow_queries = 0
+        self.pool = None
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def record_query(self, seconds: float) -> bool:
+        """쿼리 시간 기록, 느린 쿼리면 True"""
+        slow = seconds * 1000 >= DB_SLOW_QUERY_MS
+        with self._lock:
+            self.queries += 1
+            self.query_seconds += seconds
+            if slow:
+                self.slow_queries += 1
+        return slow
+
+    def stats(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            return {
+                "pool_size": pool.size() if pool else None,
+                "checked_out": pool.checkedout() if pool else None,
+                "checked_in": pool.checkedin() if pool else None,
+                "overflow": pool.overflow() if pool else None,
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(self.wait_seconds / self.checkouts * 1000, 3) if self.checkouts else 0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+                "timeouts": self.timeouts,
+                "queries": self.queries,
+                "avg_query_ms": round(self.query_seconds / self.queries * 1000, 3) if self.queries else 0,
+                "slow_queries": self.slow_queries,
+                "slow_query_ms": DB_SLOW_QUERY_MS,
+            }
+
+
+# 엔진 이름 -> PoolMetrics
+_metrics = {}
+
+
+class _InstrumentedPoolMixin:
+    """커넥션을 꺼낼 때까지 기다린 시간 측정"""
+
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics:
+                self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.metrics:
+            self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # dispose() 등으로 풀이 다시 만들어져도 같은 집계 유지
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        if self.metrics:
+            self.metrics.pool = pool
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_kwargs(overrides: dict) -> dict:
+    kwargs = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "echo": DB_ECHO,
+    }
+    kwargs.update(overrides)
+    return kwargs
+
+
+def _instrument(sync_engine, name: str):
+    metrics = _metrics[name] = PoolMetrics(name)
+    sync_engine.pool.metrics = metrics
+    metrics.pool = sync_engine.pool
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info.pop("query_started", time.perf_counter())
+        if metrics.record_query(elapsed) and random.random() < DB_SLOW_QUERY_SAMPLE:
+            print(f"[DB:{name}] 느린 쿼리 {elapsed * 1000:.1f}ms: {' '.join(statement.split())[:500]}")
+
+    return metrics
+
+
+def create_pooled_engine(url: str, name: str = "main", **overrides):
+    """환경변수 기반 풀 설정 + 계측이 적용된 동기 엔진"""
+    engine = create_engine(url, future=True, poolclass=InstrumentedQueuePool, **_pool_kwargs(overrides))
+    _instrument(engine, name)
+    return engine
+
+
+def create_pooled_async_engine(url: str, name: str = "async", **overrides):
+    """create_pooled_engine의 비동기(asyncpg) 버전"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(url, poolclass=InstrumentedAsyncQueuePool, **_pool_kwargs(overrides))
+    _instrument(engine.sync_engine, name)
+    return engine
+
+
+def pool_stats() -> dict:
+    """엔진별 풀/쿼리 집계 (/metrics/db 응답)"""
+    return {name: metrics.stats() for name, metrics in _metrics.items()}
@@ -0,0 +1,328 @@
+# place-service/jwt_utils.py
+# JWT 발급 / 검증 (user, chat, place-service에 동일 파일 복사 사용)
+import jwt
+import datetime
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException, Query
+from sqlalchemy import create_engine, text
+from starlette.requests import HTTPConnection
+
+SECRET_KEY = os.getenv("JWT_SECRET", "supersecret")
+ALGORITHM = "HS256"
+
+# 검증 완료 토큰 캐시 최대 항목 수 (초과 시 LRU 제거)
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+# 로그아웃 토큰 목록을 DB에서 다시 읽는 주기 (초, 다른 서비스 / 워커의 로그아웃이 이 시간 안에 반영)
+JWT_REVOCATION_POLL = float(os.getenv("JWT_REVOCATION_POLL", "5"))
+
+
+def revocation_db_url():
+    """폐기 목록 DB (서비스 공용 PostgreSQL, DB_HOST가 없으면 None → 프로세스 메모리에만 보관)"""
+    if not os.getenv("DB_HOST"):
+        return None
+    return (
+        f"postgresql+psycopg2://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+        f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('DB_NAME')}"
+    )
+
+
+def create_jwt(data: dict):
+    to_encode = data.copy()
+    expire = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    to_encode.update({"exp": expire})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+class RevocationStore:
+    """
+    로그아웃한 토큰 목록 (revoked_tokens 테이블, 모든 서비스가 같은 DB 공유)
+    - add(): DB에 기록 후 이 프로세스 목록에 바로 반영 (login-service, 블로킹이므로 스레드풀에서 호출)
+    - 각 프로세스는 만료 전 목록을 메모리에 두고 백그라운드 스레드가 poll초마다 통째로 다시 읽음
+      (요청마다 DB를 조회하지 않음, 재시작해도 목록 유지)
+    - 첫 동기화는 startup 훅의 start()에서 (요청 처리 중에는 DB를 기다리지 않음)
+    - DB를 읽지 못하면 마지막으로 읽은 목록을 계속 사용
+    """
+
+    CREATE_SQL = text(
+        "CREATE TABLE IF NOT EXISTS revoked_tokens ("
+        "token_hash VARCHAR(64) PRIMARY KEY, "
+        "expires_at DOUBLE PRECISION NOT NULL)"   # 토큰 exp (epoch 초)
+    )
+
+    def __init__(self, url: str = None, poll: float = JWT_REVOCATION_POLL):
+        self.url = url
+        self.poll = poll
+        self._engine = create_engine(url, pool_size=1, max_overflow=1, pool_pre_ping=True) if url else None
+        self._lock = threading.Lock()
+        self._revoked = {}   # key -> exp
+        self._thread = None
+        self._table_ready = False
+        self.synced_at = None
+        self.sync_errors = 0
+
+    def _ensure_table(self, conn):
+        if not self._table_ready:
+            conn.execute(self.CREATE_SQL)
+            self._table_ready = True
+
+    def add(self, key: str, exp: float):
+        """폐기 기록 (DB 기록에 실패하면 예외, 로그아웃 실패로 처리)"""
+        if self._engine is not None:
+            now = time.time()
+            with self._engine.begin() as conn:
+                self._ensure_table(conn)
+                conn.execute(text(
+                    "INSERT INTO revoked_tokens (token_hash, expires_at) VALUES (:key, :exp) "
+                    "ON CONFLICT (token_hash) DO NOTHING"
+                ), {"key": key, "exp": exp})
+                conn.execute(text("DELETE FROM revoked_tokens WHERE expires_at <= :now"), {"now": now})
+        with self._lock:
+            self._revoked[key] = exp
+
+    def sync(self):
+        """DB의 만료 전 폐기 목록으로 교체"""
+        if self._engine is None:
+            return
+        now = time.time()
+        with self._engine.begin() as conn:
+            self._ensure_table(conn)
+            rows = conn.execute(
+                text("SELECT token_hash, expires_at FROM revoked_tokens WHERE expires_at > :now"), {"now": now}
+            ).all()
+        with self._lock:
+            # 읽는 동안 이 프로세스에서 추가된 항목은 유지
+            pending = {key: exp for key, exp in self._revoked.items() if exp > now}
+            self._revoked = {**pending, **dict(rows)}
+            self.synced_at = time.time()
+
+    def _sync_logged(self):
+        try:
+            self.sync()
+        except Exception as e:
+            self.sync_errors += 1
+            print(f"[JWT] 폐기 목록 동기화 실패: {e}")
+
+    def _loop(self, initial_sync: bool):
+        if initial_sync:
+            self._sync_logged()
+        while True:
+            time.sleep(self.poll)
+            self._sync_logged()
+
+    def _launch(self, initial_sync: bool) -> bool:
+        with self._lock:
+            if self._thread is not None or self._engine is None:
+                return False
+            self._thread = threading.Thread(
+                target=self._loop, args=(initial_sync,), name="jwt-revocations", daemon=True
+            )
+        self._thread.start()
+        return True
+
+    def start(self):
+        """
+        startup 훅에서 호출: 첫 목록을 직접 읽은 뒤 주기 동기화 시작
+        (재시작 직후 이미 로그아웃된 토큰이 통과하지 않도록 요청을 받기 전에 읽음)
+        """
+        if self._thread is None and self._engine is not None:
+            self._sync_logged()
+            self._launch(initial_sync=False)
+
+    def is_revoked(self, key: str) -> bool:
+        if self._thread is None:
+            # start()를 거치지 않은 경우(스크립트 등)에도 요청 경로에서는 DB를 기다리지 않음
+            self._launch(initial_sync=True)
+        with self._lock:
+            exp = self._revoked.get(key)
+            return exp is not None and exp > time.time()
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            self._revoked = {key: exp for key, exp in self._revoked.items() if exp > now}
+            return {
+                "store": "postgres" if self._engine is not None else "memory",
+                "revoked": len(self._revoked),
+                "synced_seconds_ago": round(now - self.synced_at, 1) if self.synced_at else None,
+                "sync_errors": self.sync_errors,
+            }
+
+
+class TokenVerifier:
+    """
+    JWT 검증기
+    - 한 번 검증한 토큰은 exp까지 캐시 (같은 토큰 재검증 시 서명 계산 생략)
+    - 캐시 키는 토큰 전체의 sha256 (서명이 다르면 다른 키)
+    - 로그아웃한 토큰은 exp까지 RevocationStore에 보관 (캐시 적중 시에도 확인)
+    """
+
+    def __init__(self, secret: str = SECRET_KEY, algorithm: str = ALGORITHM, max_size: int = JWT_CACHE_SIZE,
+                 revocations: RevocationStore = None):
+        # 키 / 알고리즘 / 검증 옵션은 생성 시 한 번만 준비
+        # exp 없는 토큰은 캐시 만료 시점을 정할 수 없으므로 거부
+        self.secret = secret.encode()
+        self.algorithms = [algorithm]
+        self.options = {"require": ["exp"]}
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # key -> (exp, payload)
+        self.revocations = revocations if revocations is not None else RevocationStore(revocation_db_url())
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _decode(self, token: str) -> dict:
+        try:
+            return jwt.decode(token, self.secret, algorithms=self.algorithms, options=self.options)
+        except jwt.ExpiredSignatureError:
+            raise ValueError("JWT 토큰이 만료되었습니다.")
+        except jwt.InvalidTokenError:
+            raise ValueError("유효하지 않은 JWT 토큰입니다.")
+
+    def verify(self, token: str) -> dict:
+        key = self._key(token)
+        now = time.time()
+        if self.revocations.is_revoked(key):
+            raise ValueError("로그아웃된 JWT 토큰입니다.")
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                exp, payload = entry
+                if exp is not None and exp <= now:
+                    del self._cache[key]
+                    raise ValueError("JWT 토큰이 만료되었습니다.")
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return dict(payload)
+            self.misses += 1
+
+        payload = self._decode(token)
+
+        # 검증하는 사이 로그아웃된 경우 캐시하지 않음
+        if self.revocations.is_revoked(key):
+            raise ValueError("로그아웃된 JWT 토큰입니다.")
+        with self._lock:
+            self._cache[key] = (payload.get("exp"), dict(payload))
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+                self.evicted += 1
+        return payload
+
+    def revoke(self, token: str) -> dict:
+        """토큰 폐기 (서명이 유효한 토큰만, 만료 시각까지 보관, 저장 실패 시 예외)"""
+        payload = self._decode(token)
+        key = self._key(token)
+        self.revocations.add(key, payload["exp"])
+        with self._lock:
+            self._cache.pop(key, None)
+        return payload
+
+    def stats(self) -> dict:
+        revocations = self.revocations.stats()
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0,
+                "evicted": self.evicted,
+                "revocations": revocations,
+            }
+
+
+# 전역 JWT 검증기 인스턴스
+token_verifier = TokenVerifier()
+
+
+def decode_jwt(token: str):
+    """
+    JWT 디코드 함수
+    만료 / 로그아웃된 토큰은 예외 발생
+    """
+    return token_verifier.verify(token)
+
+
+def caller_user_id(payload: dict):
+    """JWT의 kakao_id (= users.user_id) 를 정수로 반환, 없으면 None"""
+    kakao_id = payload.get("kakao_id")
+    try:
+        return int(kakao_id) if kakao_id is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def authorize_user(conn: HTTPConnection, user_id: Optional[int] = None) -> int:
+    """
+    요청 대상 회원 ID를 검증된 토큰 기준으로 확정
+    - 토큰이 없거나 유효하지 않으면 401
+    - user_id가 토큰 사용자와 다르면 403 (관리자 토큰은 다른 회원 대상 허용)
+    - user_id를 생략하면 토큰 사용자
+    """
+    state = conn.state
+    if getattr(state, "is_admin", False) and user_id is not None:
+        return user_id
+    token_user_id = getattr(state, "user_id", None)
+    if token_user_id is None:
+        raise HTTPException(status_code=401, detail=getattr(state, "auth_error", None) or "JWT 토큰이 필요합니다")
+    if user_id is not None and user_id != token_user_id:
+        raise HTTPException(status_code=403, detail="본인 정보만 요청할 수 있습니다")
+    return token_user_id
+
+
+def current_user_id(conn: HTTPConnection, user_id: Optional[int] = Query(None)) -> int:
+    """FastAPI 의존성: ?user_id= 를 토큰 사용자와 대조해 확정된 회원 ID 반환"""
+    return authorize_user(conn, user_id)
+
+
+class JWTAuthMiddleware:
+    """
+    ASGI 인증 미들웨어
+    - Authorization: Bearer 토큰을 서비스 내에서 바로 검증 (login-service 호출 없음)
+    - WebSocket은 브라우저가 헤더를 못 붙이므로 ?token= 쿼리도 허용
+    - 성공 시 request.state.jwt_payload / user_id / is_admin, 실패 시 request.state.auth_error 설정
+    - 거부 여부는 각 엔드포인트에서 결정 (토큰 없는 공개 API 유지)
+    """
+
+    def __init__(self, app, verifier: TokenVerifier = None):
+        self.app = app
+        self.verifier = verifier or token_verifier
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            state = scope.setdefault("state", {})
+            state["jwt_payload"] = None
+            state["user_id"] = None
+            state["is_admin"] = False
+            state["auth_error"] = None
+            token = None
+            for name, value in scope.get("headers", []):
+                if name == b"authorization":
+                    auth = value.decode("latin-1")
+                    if auth.startswith("Bearer "):
+                        token = auth[7:]
+                    break
+            if token is None and scope["type"] == "websocket":
+                token = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("token", [None])[0]
+            if token:
+                try:
+                    payload = self.verifier.verify(token)
+                    state["jwt_payload"] = payload
+                    state["user_id"] = caller_user_id(payload)
+                    state["is_admin"] = bool(payload.get("is_admin"))
+                except ValueError as e:
+                    state["auth_error"] = str(e)
+        await self.app(scope, receive, send)
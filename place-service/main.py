@@ -1,11 +1,14 @@
 # place-service/main.py
 # 데이트 장소 큐레이팅 서비스
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 
+from db_pool import pool_stats
+from http_client import http_clients
+from jwt_utils import JWTAuthMiddleware, authorize_user, current_user_id, token_verifier
 from db import SessionLocal, DatePlace, DateCourse, DateCoursePlace, create_tables
 from naver_api import (
     search_places,
@@ -17,6 +20,9 @@ from naver_api import (
 
 app = FastAPI(title="Place Service", description="데이트 장소 큐레이팅 서비스")
 
+# JWT 인증 (login-service 호출 없이 서비스 내에서 검증, request.state에 호출자 정보)
+app.add_middleware(JWTAuthMiddleware)
+
 # CORS 설정
 app.add_middleware(
     CORSMiddleware,
@@ -71,6 +77,18 @@ def health_check():
     return {"status": "ok", "service": "place-service"}
 
 
+@app.get("/metrics/db")
+def get_db_metrics():
+    """DB 커넥션 풀 대기 시간 / 사용 중 커넥션 / 느린 쿼리 집계"""
+    return pool_stats()
+
+
+@app.get("/metrics/http")
+def get_http_metrics():
+    """업스트림별 HTTP 요청 수 / 커넥션 재사용률"""
+    return http_clients.stats()
+
+
 # ===== 장소 검색 API =====
 
 @app.get("/places/search")
@@ -182,11 +200,21 @@ def get_place_detail(place_id: int):
 
 # ===== 코스 관리 API =====
 
+def _load_own_course(db, course_id: int, request: Request):
+    """코스 조회 + 작성자(또는 관리자) 토큰 확인"""
+    course = db.query(DateCourse).filter(DateCourse.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="코스를 찾을 수 없습니다")
+    authorize_user(request, course.creator_id)
+    return course
+
+
 @app.post("/courses")
-def create_course(data: CourseCreateRequest):
+def create_course(data: CourseCreateRequest, request: Request):
     """
     데이트 코스 생성
     """
+    authorize_user(request, data.creator_id)
     db = SessionLocal()
     try:
         course = DateCourse(
@@ -213,7 +241,7 @@ def create_course(data: CourseCreateRequest):
 
 
 @app.get("/courses/my")
-def get_my_courses(user_id: int = Query(..., description="사용자 ID")):
+def get_my_courses(user_id: int = Depends(current_user_id)):
     """
     내가 만든 코스 목록
     """
@@ -247,7 +275,7 @@ def get_my_courses(user_id: int = Query(..., description="사용자 ID")):
 
 
 @app.get("/courses/shared")
-def get_shared_courses(user_id: int = Query(..., description="사용자 ID")):
+def get_shared_courses(user_id: int = Depends(current_user_id)):
     """
     나에게 공유된 코스 목록
     """
@@ -279,15 +307,17 @@ def get_shared_courses(user_id: int = Query(..., description="사용자 ID")):
 
 
 @app.get("/courses/{course_id}")
-def get_course_detail(course_id: int):
+def get_course_detail(course_id: int, request: Request):
     """
-    코스 상세 정보 (장소 목록 포함)
+    코스 상세 정보 (장소 목록 포함, 작성자 / 공유 대상만)
     """
     db = SessionLocal()
     try:
         course = db.query(DateCourse).filter(DateCourse.id == course_id).first()
         if not course:
             raise HTTPException(status_code=404, detail="코스를 찾을 수 없습니다")
+        if not request.state.is_admin and authorize_user(request) not in (course.creator_id, course.shared_with):
+            raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
 
         # 코스에 포함된 장소 목록
         course_places = db.query(DateCoursePlace).filter(
@@ -327,16 +357,14 @@ def get_course_detail(course_id: int):
 
 
 @app.post("/courses/{course_id}/places")
-def add_place_to_course(course_id: int, data: CoursePlaceAddRequest):
+def add_place_to_course(course_id: int, data: CoursePlaceAddRequest, request: Request):
     """
     코스에 장소 추가
     """
     db = SessionLocal()
     try:
-        # 코스 존재 확인
-        course = db.query(DateCourse).filter(DateCourse.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="코스를 찾을 수 없습니다")
+        # 코스 존재 / 작성자 확인
+        course = _load_own_course(db, course_id, request)
 
         # 장소 존재 확인
         place = db.query(DatePlace).filter(DatePlace.id == data.place_id).first()
@@ -376,12 +404,13 @@ def add_place_to_course(course_id: int, data: CoursePlaceAddRequest):
 
 
 @app.delete("/courses/{course_id}/places/{place_id}")
-def remove_place_from_course(course_id: int, place_id: int):
+def remove_place_from_course(course_id: int, place_id: int, request: Request):
     """
     코스에서 장소 제거
     """
     db = SessionLocal()
     try:
+        _load_own_course(db, course_id, request)
         course_place = db.query(DateCoursePlace).filter(
             DateCoursePlace.course_id == course_id,
             DateCoursePlace.place_id == place_id
@@ -404,15 +433,13 @@ def remove_place_from_course(course_id: int, place_id: int):
 
 
 @app.post("/courses/{course_id}/share")
-def share_course(course_id: int, data: CourseShareRequest):
+def share_course(course_id: int, data: CourseShareRequest, request: Request):
     """
     매칭 상대와 코스 공유
     """
     db = SessionLocal()
     try:
-        course = db.query(DateCourse).filter(DateCourse.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="코스를 찾을 수 없습니다")
+        course = _load_own_course(db, course_id, request)
 
         course.is_shared = True
         course.shared_with = data.shared_with
@@ -433,15 +460,13 @@ def share_course(course_id: int, data: CourseShareRequest):
 
 
 @app.put("/courses/{course_id}/complete")
-def complete_course(course_id: int):
+def complete_course(course_id: int, request: Request):
     """
     코스 완성 처리
     """
     db = SessionLocal()
     try:
-        course = db.query(DateCourse).filter(DateCourse.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="코스를 찾을 수 없습니다")
+        course = _load_own_course(db, course_id, request)
 
         course.status = "완성"
         course.updated_at = datetime.now()
@@ -458,15 +483,13 @@ def complete_course(course_id: int):
 
 
 @app.delete("/courses/{course_id}")
-def delete_course(course_id: int):
+def delete_course(course_id: int, request: Request):
     """
     코스 삭제
     """
     db = SessionLocal()
     try:
-        course = db.query(DateCourse).filter(DateCourse.id == course_id).first()
-        if not course:
-            raise HTTPException(status_code=404, detail="코스를 찾을 수 없습니다")
+        course = _load_own_course(db, course_id, request)
 
         # 연결된 장소 관계 삭제
         db.query(DateCoursePlace).filter(
@@ -492,3 +515,19 @@ def delete_course(course_id: int):
 def startup():
     create_tables()
     print("[place-service] 데이터베이스 테이블 생성 완료")
+
+
+@app.on_event("startup")
+async def start_http_clients():
+    await http_clients.start()
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    await http_clients.close()
+
+
+@app.on_event("startup")
+def start_jwt_revocations():
+    """로그아웃 토큰 목록 첫 동기화 (요청 처리 중에는 DB를 기다리지 않도록 시작 시 한 번)"""
+    token_verifier.revocations.start()
@@ -1,10 +1,11 @@
 # place-service/naver_api.py
 # 네이버 지도 API 연동 모듈
 import os
-import httpx
 from typing import Optional, List, Dict, Any
 from dotenv import load_dotenv
 
+from http_client import http_clients
+
 load_dotenv()
 
 NAVER_CLIENT_ID = os.getenv("NAVER_CLIENT_ID")
@@ -14,6 +15,9 @@ NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET")
 NAVER_LOCAL_SEARCH_URL = "https://openapi.naver.com/v1/search/local.json"
 NAVER_GEOCODE_URL = "https://naveropenapi.apigw.ntruss.com/map-geocode/v2/geocode"
 
+# 네이버 검색 API keep-alive 클라이언트 (HTTP/2 지원)
+http_clients.register("naver", timeout=10.0, http2=True)
+
 
 class NaverAPIError(Exception):
     """네이버 API 에러"""
@@ -53,18 +57,16 @@ async def search_places(
         "sort": sort
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            NAVER_LOCAL_SEARCH_URL,
-            headers=headers,
-            params=params,
-            timeout=10.0
-        )
+    response = await http_clients.get("naver").get(
+        NAVER_LOCAL_SEARCH_URL,
+        headers=headers,
+        params=params
+    )
 
-        if response.status_code != 200:
-            raise NaverAPIError(f"네이버 API 오류: {response.status_code}")
+    if response.status_code != 200:
+        raise NaverAPIError(f"네이버 API 오류: {response.status_code}")
 
-        return response.json()
+    return response.json()
 
 
 def parse_place_result(item: Dict[str, Any]) -> Dict[str, Any]:
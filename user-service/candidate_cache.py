@@ -0,0 +1,115 @@
+# user-service/candidate_cache.py
+# 성별별 매칭 후보자 풀 캐시 (프로세스 내)
+import os
+import threading
+import time
+from collections import namedtuple
+
+from db import SessionLocal
+from matching import load_candidates, make_pool
+
+# 캐시 유지 시간 (초) - 다른 워커에서 변경된 내용도 이 시간 안에 반영됨
+CANDIDATE_CACHE_TTL = float(os.getenv("CANDIDATE_CACHE_TTL", "60"))
+
+# 점수 계산/응답에 필요한 컬럼만 보관
+CandidateRow = namedtuple("CandidateRow", [
+    "user_id", "name", "age", "gender", "birth_date", "membership_type", "matching_count"
+])
+ProfileRow = namedtuple("ProfileRow", [
+    "height", "job", "education", "introduction", "religion", "smoking", "location"
+])
+
+
+class CandidateSnapshot:
+    """한 성별의 후보자 스냅샷"""
+
+    def __init__(self, rows):
+        self.candidates = [
+            (
+                CandidateRow(*(getattr(user, f) for f in CandidateRow._fields)),
+                ProfileRow(*(getattr(profile, f) for f in ProfileRow._fields)) if profile else None
+            )
+            for user, profile in rows
+        ]
+        self.loaded_at = time.monotonic()
+        self._pool = None
+
+    def __len__(self):
+        return len(self.candidates)
+
+    @property
+    def pool(self):
+        """점수 계산용 풀 (처음 필요할 때 생성)"""
+        if self._pool is None:
+            self._pool = make_pool(self.candidates)
+        return self._pool
+
+    def users(self, exclude_user_id: int = None):
+        return [user for user, _ in self.candidates if user.user_id != exclude_user_id]
+
+
+class CandidatePoolCache:
+    """
+    성별별 후보자 풀 캐시
+    - "이성, 매칭전, 추방/탈퇴 아님" 조회 결과를 성별 단위로 보관
+    - 회원 상태를 바꾸는 API에서 invalidate() 호출
+    """
+
+    def __init__(self, ttl: float = CANDIDATE_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshots = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, gender: str) -> CandidateSnapshot:
+        with self._lock:
+            snapshot = self._snapshots.get(gender)
+            if snapshot is not None and time.monotonic() - snapshot.loaded_at < self.ttl:
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+            generation = self._generation
+
+        db = SessionLocal()
+        try:
+            snapshot = CandidateSnapshot(load_candidates(db, gender))
+        finally:
+            db.close()
+
+        with self._lock:
+            # 로드 중에 무효화되었다면 저장하지 않음 (이번 요청에만 사용)
+            if generation == self._generation:
+                self._snapshots[gender] = snapshot
+        return snapshot
+
+    def invalidate(self):
+        """모든 성별 스냅샷 폐기"""
+        with self._lock:
+            self._generation += 1
+            self._snapshots.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0,
+                "invalidations": self.invalidations,
+                "ttl_seconds": self.ttl,
+                "snapshots": {
+                    gender: {
+                        "size": len(snapshot),
+                        "age_seconds": round(time.monotonic() - snapshot.loaded_at, 1)
+                    }
+                    for gender, snapshot in self._snapshots.items()
+                }
+            }
+
+
+# 전역 후보자 풀 캐시 인스턴스
+candidate_cache = CandidatePoolCache()
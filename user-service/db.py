@@ -1,11 +1,14 @@
 # db.py
 # PostgreSQL 버전 (MySQL에서 마이그레이션)
 import os
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, BigInteger, Boolean, Text, Date, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, Boolean, Text, Date, ForeignKey, Float, Index, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
+from db_pool import create_pooled_engine, create_pooled_async_engine
+
 # .env 파일 로드
 load_dotenv()
 
@@ -19,16 +22,32 @@ DB_NAME = os.getenv("DB_NAME")
 # PostgreSQL 연결 URL
 SQLALCHEMY_DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-# 엔진 생성
-engine = create_engine(SQLALCHEMY_DATABASE_URL, echo=True, future=True)
+# 엔진 생성 (풀 설정/SQL 로그는 db_pool 환경변수로 조정)
+engine = create_pooled_engine(SQLALCHEMY_DATABASE_URL)
 
 # 세션 로컬 생성
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 비동기 엔진 (asyncpg) - async def 엔드포인트에서 get_async_db로 사용
+ASYNC_SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+async_engine = create_pooled_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    pool_size=int(os.getenv("DB_ASYNC_POOL_SIZE", "20")),
+    max_overflow=int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "10"))
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base 클래스 선언 (모델 상속용)
 Base = declarative_base()
 
 
+def keyset_index(name: str, created_at: Column, row_id: Column, *leading, **kwargs) -> Index:
+    """관리자 목록 키셋 페이징 순서 (created_at DESC NULLS LAST, id DESC)와 같은 인덱스"""
+    return Index(
+        name, *leading, created_at.desc().nullslast(), row_id.desc(), postgresql_concurrently=True, **kwargs
+    )
+
+
 class User(Base):
     """회원 모델"""
     __tablename__ = "users"
@@ -67,6 +86,13 @@ class User(Base):
     referral_code = Column(String(20), unique=True, nullable=True)  # 내 추천 코드
     referred_by = Column(BigInteger, nullable=True)                  # 나를 추천한 사람
 
+    __table_args__ = (
+        # 매칭 후보자 풀 (이성, 매칭전, 추방/탈퇴 아님)
+        Index("ix_users_candidates", "gender", "status",
+              postgresql_where=text("is_banned = false AND deleted_at IS NULL"), postgresql_concurrently=True),
+        keyset_index("ix_users_created", created_at, user_id),      # 회원 검색 페이징
+    )
+
 
 class Admin(Base):
     """관리자 모델"""
@@ -108,6 +134,12 @@ class Consultation(Base):
     created_at = Column(DateTime, nullable=True)
     updated_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        Index("ix_consultations_user_created", "user_id", "created_at", postgresql_concurrently=True),            # 내 상담 목록
+        keyset_index("ix_consultations_status_created", created_at, id, status),    # 상태별 목록/대기 건수
+        keyset_index("ix_consultations_created", created_at, id),                   # 관리자 목록 페이징
+    )
+
 
 class Meeting(Base):
     """만남 기록 모델"""
@@ -131,6 +163,12 @@ class Meeting(Base):
     created_at = Column(DateTime, nullable=True)
     updated_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        Index("ix_meetings_user", "user_id", postgresql_concurrently=True),                   # 내 만남 목록 (user_id OR partner_id)
+        Index("ix_meetings_partner", "partner_id", postgresql_concurrently=True),
+        keyset_index("ix_meetings_created", created_at, id),    # 관리자 목록 페이징
+    )
+
 
 class MeetingReview(Base):
     """만남 후기/평가 모델"""
@@ -156,6 +194,11 @@ class MeetingReview(Base):
     # 타임스탬프
     created_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        Index("ix_meeting_reviews_meeting", "meeting_id", postgresql_concurrently=True),              # 만남별 후기
+        keyset_index("ix_meeting_reviews_created", created_at, id),     # 관리자 목록 페이징
+    )
+
 
 class UserProfile(Base):
     """회원 상세 프로필 모델"""
@@ -209,6 +252,13 @@ class UserPhoto(Base):
     # 타임스탬프
     created_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        Index("ix_user_photos_user_order", "user_id", "order_index", postgresql_concurrently=True),   # 내 사진 목록
+        # 승인 대기 사진 (대기 건만 담는 부분 인덱스)
+        keyset_index("ix_user_photos_pending", created_at, id,
+                     postgresql_where=text("is_approved = false")),
+    )
+
 
 class MatchScore(Base):
     """매칭 점수 모델"""
@@ -223,6 +273,23 @@ class MatchScore(Base):
 
     calculated_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        Index("ix_match_scores_user_score", "user_id", "score", postgresql_concurrently=True),     # 추천 상위 N 조회
+        Index("ix_match_scores_candidate", "candidate_id", postgresql_concurrently=True),          # 후보자 기준 재계산
+    )
+
+
+class MatchScoreStatus(Base):
+    """
+    회원별 매칭 점수 계산 상태
+    - 행이 있으면 점수가 계산된 회원 (후보가 0명이어도 행은 남아 매 요청마다 다시 계산하지 않음)
+    """
+    __tablename__ = "match_score_status"
+
+    user_id = Column(BigInteger, ForeignKey("users.user_id"), primary_key=True)
+    candidate_count = Column(Integer, nullable=False, default=0)   # 저장된 점수 행 수
+    calculated_at = Column(DateTime, nullable=False)
+
 
 class MatchHistory(Base):
     """매칭 히스토리 모델"""
@@ -262,6 +329,10 @@ class SuccessStory(Base):
     created_at = Column(DateTime, nullable=True)
     approved_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        keyset_index("ix_success_stories_created", created_at, id),     # 관리자 목록 페이징
+    )
+
 
 class Referral(Base):
     """추천인 모델"""
@@ -280,8 +351,15 @@ class Referral(Base):
     created_at = Column(DateTime, nullable=True)
     rewarded_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        Index("ix_referrals_referrer", "referrer_id", postgresql_concurrently=True),              # 내가 추천한 사람 목록
+        keyset_index("ix_referrals_created", created_at, id),       # 관리자 목록 페이징
+    )
+
 
 # 테이블 생성 함수
 def create_tables():
     """데이터베이스 테이블 생성"""
-    Base.metadata.create_all(bind=engine)
+    # 인덱스는 CREATE INDEX CONCURRENTLY로 선언되어 있어 트랜잭션 밖에서 실행
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        Base.metadata.create_all(bind=conn)
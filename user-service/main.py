@@ -1,11 +1,26 @@
 # user-service/main.py
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Request
 from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
 from db import (
-    SessionLocal, engine, User, Consultation, Meeting, MeetingReview,
+    SessionLocal, AsyncSessionLocal, engine, User, Consultation, Meeting, MeetingReview,
     UserProfile, UserPhoto, MatchScore, MatchHistory, SuccessStory, Referral
 )
+from matching import opposite_gender_of, rank_candidates
+from candidate_cache import candidate_cache
+from stats import (
+    stats_snapshot, counter_keys, pick,
+    USER_STATUSES, GENDERS, MEMBERSHIP_TYPES, CONSULTATION_STATUSES, CONSULTATION_TYPES, MEETING_INTENTS
+)
+from match_scores import recalculate_all, recalculate_for_users, read_top_scores_async
+from pagination import cursor_page
+from user_export import EXPORT_MEDIA_TYPES, EXPORT_WRITERS
+from member_search import member_search
+from db_pool import pool_stats
+from jwt_utils import JWTAuthMiddleware, authorize_user, current_user_id, token_verifier
 from fastapi import UploadFile, File, Query
 import random
 import string
@@ -15,6 +30,7 @@ from typing import Optional
 import os
 import httpx
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from typing import List
 from fastapi import FastAPI, HTTPException, Path
 from pydantic import BaseModel
@@ -24,6 +40,10 @@ from botocore.exceptions import BotoCoreError, ClientError
 
 app = FastAPI()
 
+# JWT 인증 (login-service 호출 없이 서비스 내에서 검증, request.state에 호출자 정보)
+app.add_middleware(JWTAuthMiddleware)
+
+# CORS 설정
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://www.abysscm.com","http://www.abysscm.com:5173","http://www.abysscm.com:5174","http://admin.abysscm.com","http://admin.abysscm.com:5173","http://admin.abysscm.com:5174"],
@@ -48,6 +68,11 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """async def 엔드포인트용 세션 (스레드풀을 거치지 않음)"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
 class AddUserRequest(BaseModel):
     username: str
     birthDate: str
@@ -102,11 +127,11 @@ class MatchRequest(BaseModel):
     partner_id: int
 
 @app.post("/users/login-or-register", response_model=UserResponse)
-def login_or_register(user_req: UserRequest, db: Session = Depends(get_db)):
-    # 카카오 ID로 조회
-    user = db.query(User).filter(User.user_id == int(user_req.kakao_id)).first()
+async def login_or_register(user_req: UserRequest, db: AsyncSession = Depends(get_async_db)):
+    # 카카오 ID로 조회 (존재 여부만 확인)
+    user = await db.scalar(select(User.user_id).where(User.user_id == int(user_req.kakao_id)))
 
-    if user:
+    if user is not None:
         return UserResponse(
             kakao_id=user_req.kakao_id,
             nickname=user_req.nickname,
@@ -121,7 +146,7 @@ def login_or_register(user_req: UserRequest, db: Session = Depends(get_db)):
 
 
 @app.post("/users/add")
-def add_user(data: AddUserRequest, db: Session = Depends(get_db)):
+def add_user(data: AddUserRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     # user_id = kakao_id 기준으로 중복 체크
     existing_user = db.query(User).filter(User.user_id == int(data.kakao_id)).first()
     if existing_user:
@@ -169,6 +194,12 @@ def add_user(data: AddUserRequest, db: Session = Depends(get_db)):
         print(f"DB 삽입 오류: {e}")
         raise HTTPException(status_code=500, detail=f"User service DB 삽입 실패: {e}")
 
+    stats_snapshot.apply_change(frozenset(), counter_keys(user))
+
+    # 매칭 점수 재계산 (신규 후보)
+    candidate_cache.invalidate()
+    background_tasks.add_task(recalculate_for_users, user.user_id)
+
     return {
         "status": "success",
         "user": {
@@ -187,8 +218,8 @@ def add_user(data: AddUserRequest, db: Session = Depends(get_db)):
     }
 
 @app.get("/users/{kakao_id}")
-def get_user(kakao_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.user_id == kakao_id).first()
+async def get_user(kakao_id: int, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.user_id == kakao_id))
     if not user:
         raise HTTPException(status_code=404, detail="사용자 없음")
     
@@ -212,6 +243,24 @@ def get_all_users(db: Session = Depends(get_db)):
     users = db.query(User).all()
     return users
 
+
+@app.get("/admin/users/export")
+def export_users(format: str = Query("ndjson")):
+    """
+    전체 회원 스트리밍 내보내기
+    - format: ndjson (한 줄에 회원 한 명) 또는 csv
+    - 서버 측 커서로 배치 단위 조회 후 바로 전송 (전체 행을 메모리에 올리지 않음)
+    """
+    if format not in EXPORT_WRITERS:
+        raise HTTPException(status_code=400, detail="format은 ndjson 또는 csv만 가능합니다")
+
+    filename = f"users_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    return StreamingResponse(
+        EXPORT_WRITERS[format](),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @app.put("/admin/users/memo/{user_id}")
 async def update_user(user_id: int = Path(...), req: UpdateUserRequest = ...):
     try:
@@ -249,6 +298,7 @@ async def get_user(user_id: int = Path(...)):
 # 회원 매칭 처리: Partner 선택 시 호출
 @app.post("/admin/users/match/{user_id}/{partner_id}")
 def match_partner(
+    background_tasks: BackgroundTasks,
     user_id: int = Path(..., description="현재 회원 ID"),
     partner_id: int = Path(..., description="선택한 이성 회원 ID"),
     db: Session = Depends(get_db)
@@ -264,14 +314,20 @@ def match_partner(
         raise HTTPException(status_code=404, detail="Partner not found")
     
     # 매칭 적용
+    before = counter_keys(user)
     user.matching_count = (user.matching_count or 0) + 1
     user.matched_partner = partner.user_id
     user.status = "매칭중"
-    
+    after = counter_keys(user)
+
     db.commit()
     db.refresh(user)
-    
-    
+    stats_snapshot.apply_change(before, after)
+
+    # 매칭중으로 바뀐 회원은 추천 후보에서 제외
+    candidate_cache.invalidate()
+    background_tasks.add_task(recalculate_for_users, user.user_id)
+
     return {
         "user_id": user.user_id,
         "matched_partner": user.matched_partner,
@@ -298,6 +354,7 @@ def update_membership(user_id: int, req: MembershipUpdateRequest, db: Session =
     if req.membership_type not in valid_types:
         raise HTTPException(status_code=400, detail=f"유효하지 않은 멤버십 타입: {req.membership_type}")
 
+    before = counter_keys(user)
     user.membership_type = req.membership_type
 
     # 결제일 파싱
@@ -308,9 +365,12 @@ def update_membership(user_id: int, req: MembershipUpdateRequest, db: Session =
             user.payment_date = datetime.fromisoformat(payment_date)
     except ValueError:
         user.payment_date = datetime.now()
+    after = counter_keys(user)
 
     db.commit()
     db.refresh(user)
+    candidate_cache.invalidate()
+    stats_snapshot.apply_change(before, after)
 
     return {
         "status": "success",
@@ -326,6 +386,22 @@ def health_check():
     return {"status": "ok", "service": "user-service"}
 
 
+@app.get("/metrics/cache")
+def get_cache_metrics():
+    """프로세스 내 캐시 적중률"""
+    return {
+        "candidate_pool": candidate_cache.stats(),
+        "stats_snapshot": stats_snapshot.stats(),
+        "member_search": member_search.stats()
+    }
+
+
+@app.get("/metrics/db")
+def get_db_metrics():
+    """DB 커넥션 풀 대기 시간 / 사용 중 커넥션 / 느린 쿼리 집계"""
+    return pool_stats()
+
+
 # ===== 관리자 전용 API =====
 
 class UserSearchParams(BaseModel):
@@ -348,13 +424,17 @@ def search_users(
     is_banned: bool = None,
     search: str = None,
     skip: int = 0,
-    limit: int = 50,
+    limit: int = Query(50, ge=1),
+    cursor: str = None,
+    use_cursor: bool = False,
+    with_total: bool = False,
     db: Session = Depends(get_db)
 ):
     """
     회원 필터링 검색 API
     - 상태, 멤버십, 성별, 결제여부, 매칭여부 등으로 필터링
     - 이름/전화번호 검색 지원
+    - use_cursor=true 또는 cursor 지정 시 키셋 페이징 (응답의 next_cursor로 다음 페이지 요청)
     """
     query = db.query(User)
 
@@ -387,22 +467,21 @@ def search_users(
         query = query.filter(User.is_banned == is_banned)
 
     if search:
-        search_pattern = f"%{search}%"
-        query = query.filter(
-            (User.name.like(search_pattern)) |
-            (User.phone_number.like(search_pattern))
-        )
+        # 이름 / 전화번호(숫자만 비교) 검색 - trigram 인덱스 또는 n-gram 인덱스 사용
+        query = member_search.apply(db, query, search)
 
-    # 전체 개수
-    total = query.count()
+    if use_cursor or cursor:
+        users, page = cursor_page(query, User.created_at, User.user_id, cursor, limit, with_total)
+    else:
+        # 전체 개수
+        total = query.count()
 
-    # 페이징 적용
-    users = query.offset(skip).limit(limit).all()
+        # 페이징 적용
+        users = query.offset(skip).limit(limit).all()
+        page = {"total": total, "skip": skip, "limit": limit}
 
     return {
-        "total": total,
-        "skip": skip,
-        "limit": limit,
+        **page,
         "users": [
             {
                 "user_id": u.user_id,
@@ -457,7 +536,7 @@ def get_user_detail(user_id: int, db: Session = Depends(get_db)):
 
 
 @app.delete("/admin/users/{user_id}")
-def delete_user(user_id: int, db: Session = Depends(get_db)):
+def delete_user(user_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     회원 탈퇴 처리 (소프트 삭제)
     - deleted_at에 현재 시간 저장
@@ -470,10 +549,15 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
     if user.deleted_at:
         raise HTTPException(status_code=400, detail="이미 탈퇴한 회원입니다")
 
+    before = counter_keys(user)
     user.deleted_at = datetime.now()
     user.status = "만료"
+    after = counter_keys(user)
 
     db.commit()
+    candidate_cache.invalidate()
+    stats_snapshot.apply_change(before, after)
+    background_tasks.add_task(recalculate_for_users, user_id)
 
     return {
         "status": "success",
@@ -487,7 +571,7 @@ class BanUserRequest(BaseModel):
 
 
 @app.post("/admin/users/{user_id}/ban")
-def ban_user(user_id: int, req: BanUserRequest, db: Session = Depends(get_db)):
+def ban_user(user_id: int, req: BanUserRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     회원 추방 (블랙리스트)
     - is_banned = True, banned_at, ban_reason 저장
@@ -499,12 +583,17 @@ def ban_user(user_id: int, req: BanUserRequest, db: Session = Depends(get_db)):
     if user.is_banned:
         raise HTTPException(status_code=400, detail="이미 추방된 회원입니다")
 
+    before = counter_keys(user)
     user.is_banned = True
     user.banned_at = datetime.now()
     user.ban_reason = req.reason
     user.status = "만료"
+    after = counter_keys(user)
 
     db.commit()
+    candidate_cache.invalidate()
+    stats_snapshot.apply_change(before, after)
+    background_tasks.add_task(recalculate_for_users, user_id)
 
     return {
         "status": "success",
@@ -515,7 +604,7 @@ def ban_user(user_id: int, req: BanUserRequest, db: Session = Depends(get_db)):
 
 
 @app.post("/admin/users/{user_id}/unban")
-def unban_user(user_id: int, db: Session = Depends(get_db)):
+def unban_user(user_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """회원 추방 해제"""
     user = db.query(User).filter(User.user_id == user_id).first()
     if not user:
@@ -524,12 +613,17 @@ def unban_user(user_id: int, db: Session = Depends(get_db)):
     if not user.is_banned:
         raise HTTPException(status_code=400, detail="추방된 회원이 아닙니다")
 
+    before = counter_keys(user)
     user.is_banned = False
     user.banned_at = None
     user.ban_reason = None
     user.status = "매칭전"
+    after = counter_keys(user)
 
     db.commit()
+    candidate_cache.invalidate()
+    stats_snapshot.apply_change(before, after)
+    background_tasks.add_task(recalculate_for_users, user_id)
 
     return {
         "status": "success",
@@ -549,16 +643,10 @@ def get_matching_candidates(user_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="사용자 없음")
 
     # 이성 성별 결정
-    opposite_gender = "여" if user.gender == "남" else "남"
+    opposite_gender = opposite_gender_of(user.gender)
 
-    # 후보자 조회
-    candidates = db.query(User).filter(
-        User.gender == opposite_gender,
-        User.status == "매칭전",
-        User.is_banned == False,
-        User.deleted_at == None,
-        User.user_id != user_id
-    ).all()
+    # 후보자 조회 (성별별 캐시)
+    candidates = candidate_cache.get(opposite_gender).users(exclude_user_id=user_id)
 
     return {
         "user_id": user_id,
@@ -581,7 +669,7 @@ def get_matching_candidates(user_id: int, db: Session = Depends(get_db)):
 
 
 @app.delete("/admin/users/match/{user_id}")
-def unmatch_user(user_id: int, db: Session = Depends(get_db)):
+def unmatch_user(user_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     매칭 해제
     - matched_partner를 None으로 설정
@@ -595,16 +683,24 @@ def unmatch_user(user_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="매칭된 상대가 없습니다")
 
     old_partner_id = user.matched_partner
+    partner = db.query(User).filter(User.user_id == old_partner_id).first()
+    changed = [(user, counter_keys(user))]
+
     user.matched_partner = None
     user.status = "매칭전"
 
     # 상대방도 매칭 해제
-    partner = db.query(User).filter(User.user_id == old_partner_id).first()
     if partner and partner.matched_partner == user_id:
+        changed.append((partner, counter_keys(partner)))
         partner.matched_partner = None
         partner.status = "매칭전"
 
+    changed = [(before, counter_keys(u)) for u, before in changed]
     db.commit()
+    candidate_cache.invalidate()
+    for before, after in changed:
+        stats_snapshot.apply_change(before, after)
+    background_tasks.add_task(recalculate_for_users, user_id, old_partner_id)
 
     return {
         "status": "success",
@@ -613,56 +709,21 @@ def unmatch_user(user_id: int, db: Session = Depends(get_db)):
 
 
 @app.get("/admin/stats")
-def get_admin_stats(db: Session = Depends(get_db)):
+def get_admin_stats(fresh: bool = False, db: Session = Depends(get_db)):
     """
     관리자 대시보드 통계
     - 전체 회원 수, 상태별 회원 수, 결제 회원 수 등
+    - users 테이블 1회 집계 (스냅샷 캐시, fresh=true면 다시 계산)
     """
-    # 전체 회원 (탈퇴 제외)
-    total_users = db.query(User).filter(User.deleted_at == None).count()
-
-    # 상태별 회원 수
-    status_counts = {}
-    for status in ["매칭전", "매칭중", "성혼", "만료"]:
-        count = db.query(User).filter(
-            User.status == status,
-            User.deleted_at == None
-        ).count()
-        status_counts[status] = count
-
-    # 성별 회원 수
-    gender_counts = {}
-    for gender in ["남", "여"]:
-        count = db.query(User).filter(
-            User.gender == gender,
-            User.deleted_at == None
-        ).count()
-        gender_counts[gender] = count
-
-    # 결제 회원 수
-    paid_users = db.query(User).filter(
-        User.payment_date != None,
-        User.deleted_at == None
-    ).count()
-
-    # 추방된 회원 수
-    banned_users = db.query(User).filter(
-        User.is_banned == True
-    ).count()
-
-    # 매칭된 회원 수
-    matched_users = db.query(User).filter(
-        User.matched_partner != None,
-        User.deleted_at == None
-    ).count()
+    counts = stats_snapshot.get(db, "users", fresh)
 
     return {
-        "total_users": total_users,
-        "status_counts": status_counts,
-        "gender_counts": gender_counts,
-        "paid_users": paid_users,
-        "banned_users": banned_users,
-        "matched_users": matched_users
+        "total_users": counts["total"],
+        "status_counts": pick(counts, "status", USER_STATUSES),
+        "gender_counts": pick(counts, "gender", GENDERS),
+        "paid_users": counts["paid"],
+        "banned_users": counts["banned"],
+        "matched_users": counts["matched"]
     }
 
 
@@ -683,8 +744,9 @@ class ConsultationConfirmRequest(BaseModel):
 
 
 @app.post("/consultations")
-def create_consultation(req: ConsultationCreateRequest, db: Session = Depends(get_db)):
+def create_consultation(req: ConsultationCreateRequest, request: Request, db: Session = Depends(get_db)):
     """상담 요청 생성"""
+    authorize_user(request, req.user_id)
     # 사용자 확인
     user = db.query(User).filter(User.user_id == req.user_id).first()
     if not user:
@@ -708,6 +770,7 @@ def create_consultation(req: ConsultationCreateRequest, db: Session = Depends(ge
     db.add(consultation)
     db.commit()
     db.refresh(consultation)
+    stats_snapshot.apply_change(frozenset(), counter_keys(consultation))
 
     return {
         "status": "success",
@@ -723,7 +786,7 @@ def create_consultation(req: ConsultationCreateRequest, db: Session = Depends(ge
 
 
 @app.get("/consultations/my")
-def get_my_consultations(user_id: int, db: Session = Depends(get_db)):
+def get_my_consultations(user_id: int = Depends(current_user_id), db: Session = Depends(get_db)):
     """내 상담 요청 목록"""
     consultations = db.query(Consultation).filter(
         Consultation.user_id == user_id
@@ -749,11 +812,12 @@ def get_my_consultations(user_id: int, db: Session = Depends(get_db)):
 
 
 @app.get("/consultations/{consultation_id}")
-def get_consultation(consultation_id: int, db: Session = Depends(get_db)):
+def get_consultation(consultation_id: int, request: Request, db: Session = Depends(get_db)):
     """상담 상세 조회"""
     consultation = db.query(Consultation).filter(Consultation.id == consultation_id).first()
     if not consultation:
         raise HTTPException(status_code=404, detail="상담 요청을 찾을 수 없습니다")
+    authorize_user(request, consultation.user_id)
 
     return {
         "id": consultation.id,
@@ -772,18 +836,22 @@ def get_consultation(consultation_id: int, db: Session = Depends(get_db)):
 
 
 @app.put("/consultations/{consultation_id}/cancel")
-def cancel_consultation(consultation_id: int, db: Session = Depends(get_db)):
+def cancel_consultation(consultation_id: int, request: Request, db: Session = Depends(get_db)):
     """상담 취소"""
     consultation = db.query(Consultation).filter(Consultation.id == consultation_id).first()
     if not consultation:
         raise HTTPException(status_code=404, detail="상담 요청을 찾을 수 없습니다")
+    authorize_user(request, consultation.user_id)
 
     if consultation.status == "완료됨":
         raise HTTPException(status_code=400, detail="이미 완료된 상담은 취소할 수 없습니다")
 
+    before = counter_keys(consultation)
     consultation.status = "취소됨"
     consultation.updated_at = datetime.now()
+    after = counter_keys(consultation)
     db.commit()
+    stats_snapshot.apply_change(before, after)
 
     return {"status": "success", "message": "상담이 취소되었습니다"}
 
@@ -793,7 +861,10 @@ def get_all_consultations(
     status: str = None,
     consultation_type: str = None,
     skip: int = 0,
-    limit: int = 50,
+    limit: int = Query(50, ge=1),
+    cursor: str = None,
+    use_cursor: bool = False,
+    with_total: bool = False,
     db: Session = Depends(get_db)
 ):
     """관리자용 전체 상담 목록"""
@@ -804,13 +875,15 @@ def get_all_consultations(
     if consultation_type:
         query = query.filter(Consultation.consultation_type == consultation_type)
 
-    total = query.count()
-    consultations = query.order_by(Consultation.created_at.desc()).offset(skip).limit(limit).all()
+    if use_cursor or cursor:
+        consultations, page = cursor_page(query, Consultation.created_at, Consultation.id, cursor, limit, with_total)
+    else:
+        total = query.count()
+        consultations = query.order_by(Consultation.created_at.desc()).offset(skip).limit(limit).all()
+        page = {"total": total, "skip": skip, "limit": limit}
 
     return {
-        "total": total,
-        "skip": skip,
-        "limit": limit,
+        **page,
         "consultations": [
             {
                 "id": c.id,
@@ -837,12 +910,15 @@ def confirm_consultation(consultation_id: int, req: ConsultationConfirmRequest,
     if not consultation:
         raise HTTPException(status_code=404, detail="상담 요청을 찾을 수 없습니다")
 
+    before = counter_keys(consultation)
     consultation.status = "확인됨"
     consultation.confirmed_date = datetime.strptime(req.confirmed_date, "%Y-%m-%d").date()
     consultation.confirmed_time = req.confirmed_time
     consultation.admin_note = req.admin_note
     consultation.updated_at = datetime.now()
+    after = counter_keys(consultation)
     db.commit()
+    stats_snapshot.apply_change(before, after)
 
     return {"status": "success", "message": "상담이 확정되었습니다"}
 
@@ -854,9 +930,11 @@ def complete_consultation(consultation_id: int, db: Session = Depends(get_db)):
     if not consultation:
         raise HTTPException(status_code=404, detail="상담 요청을 찾을 수 없습니다")
 
+    before = counter_keys(consultation)
     consultation.status = "완료됨"
     consultation.completed_at = datetime.now()
     consultation.updated_at = datetime.now()
+    after = counter_keys(consultation)
 
     # 사용자의 상담 횟수 증가
     user = db.query(User).filter(User.user_id == consultation.user_id).first()
@@ -867,6 +945,7 @@ def complete_consultation(consultation_id: int, db: Session = Depends(get_db)):
             user.first_consultation = datetime.now()
 
     db.commit()
+    stats_snapshot.apply_change(before, after)
 
     return {"status": "success", "message": "상담이 완료 처리되었습니다"}
 
@@ -889,9 +968,19 @@ class MeetingReviewCreateRequest(BaseModel):
     next_meeting_intent: Optional[str] = None  # 원함/미정/원하지않음
 
 
+def authorize_meeting(request: Request, meeting: Meeting):
+    """만남 참여자(또는 관리자) 토큰인지 확인"""
+    if request.state.is_admin:
+        return
+    user_id = authorize_user(request)
+    if user_id not in (meeting.user_id, meeting.partner_id):
+        raise HTTPException(status_code=403, detail="본인 만남만 요청할 수 있습니다")
+
+
 @app.post("/meetings")
-def create_meeting(req: MeetingCreateRequest, db: Session = Depends(get_db)):
+def create_meeting(req: MeetingCreateRequest, request: Request, db: Session = Depends(get_db)):
     """만남 일정 생성"""
+    authorize_user(request, req.user_id)
     # 사용자 확인
     user = db.query(User).filter(User.user_id == req.user_id).first()
     partner = db.query(User).filter(User.user_id == req.partner_id).first()
@@ -912,6 +1001,7 @@ def create_meeting(req: MeetingCreateRequest, db: Session = Depends(get_db)):
     db.add(meeting)
     db.commit()
     db.refresh(meeting)
+    stats_snapshot.apply_change(frozenset(), counter_keys(meeting))
 
     return {
         "status": "success",
@@ -928,7 +1018,7 @@ def create_meeting(req: MeetingCreateRequest, db: Session = Depends(get_db)):
 
 
 @app.get("/meetings/my")
-def get_my_meetings(user_id: int, db: Session = Depends(get_db)):
+def get_my_meetings(user_id: int = Depends(current_user_id), db: Session = Depends(get_db)):
     """내 만남 목록"""
     meetings = db.query(Meeting).filter(
         (Meeting.user_id == user_id) | (Meeting.partner_id == user_id)
@@ -953,11 +1043,12 @@ def get_my_meetings(user_id: int, db: Session = Depends(get_db)):
 
 
 @app.get("/meetings/{meeting_id}")
-def get_meeting(meeting_id: int, db: Session = Depends(get_db)):
+def get_meeting(meeting_id: int, request: Request, db: Session = Depends(get_db)):
     """만남 상세 조회"""
     meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
     if not meeting:
         raise HTTPException(status_code=404, detail="만남을 찾을 수 없습니다")
+    authorize_meeting(request, meeting)
 
     # 후기 조회
     reviews = db.query(MeetingReview).filter(MeetingReview.meeting_id == meeting_id).all()
@@ -984,39 +1075,50 @@ def get_meeting(meeting_id: int, db: Session = Depends(get_db)):
 
 
 @app.put("/meetings/{meeting_id}/complete")
-def complete_meeting(meeting_id: int, db: Session = Depends(get_db)):
+def complete_meeting(meeting_id: int, request: Request, db: Session = Depends(get_db)):
     """만남 완료 처리"""
     meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
     if not meeting:
         raise HTTPException(status_code=404, detail="만남을 찾을 수 없습니다")
+    authorize_meeting(request, meeting)
 
+    before = counter_keys(meeting)
     meeting.status = "완료됨"
     meeting.updated_at = datetime.now()
+    after = counter_keys(meeting)
     db.commit()
+    stats_snapshot.apply_change(before, after)
 
     return {"status": "success", "message": "만남이 완료 처리되었습니다"}
 
 
 @app.put("/meetings/{meeting_id}/cancel")
-def cancel_meeting(meeting_id: int, db: Session = Depends(get_db)):
+def cancel_meeting(meeting_id: int, request: Request, db: Session = Depends(get_db)):
     """만남 취소"""
     meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
     if not meeting:
         raise HTTPException(status_code=404, detail="만남을 찾을 수 없습니다")
+    authorize_meeting(request, meeting)
 
+    before = counter_keys(meeting)
     meeting.status = "취소됨"
     meeting.updated_at = datetime.now()
+    after = counter_keys(meeting)
     db.commit()
+    stats_snapshot.apply_change(before, after)
 
     return {"status": "success", "message": "만남이 취소되었습니다"}
 
 
 @app.post("/meetings/{meeting_id}/reviews")
-def create_meeting_review(meeting_id: int, req: MeetingReviewCreateRequest, db: Session = Depends(get_db)):
+def create_meeting_review(meeting_id: int, req: MeetingReviewCreateRequest, request: Request, db: Session = Depends(get_db)):
     """만남 후기 작성"""
     meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
     if not meeting:
         raise HTTPException(status_code=404, detail="만남을 찾을 수 없습니다")
+    authorize_user(request, req.reviewer_id)
+    if req.reviewer_id not in (meeting.user_id, meeting.partner_id):
+        raise HTTPException(status_code=403, detail="만남 참여자만 후기를 작성할 수 있습니다")
 
     # 평점 검증
     if req.rating < 1 or req.rating > 5:
@@ -1044,6 +1146,7 @@ def create_meeting_review(meeting_id: int, req: MeetingReviewCreateRequest, db:
     db.add(review)
     db.commit()
     db.refresh(review)
+    stats_snapshot.apply_change(frozenset(), counter_keys(review))
 
     return {
         "status": "success",
@@ -1060,22 +1163,30 @@ def create_meeting_review(meeting_id: int, req: MeetingReviewCreateRequest, db:
 def get_all_meetings(
     status: str = None,
     skip: int = 0,
-    limit: int = 50,
+    limit: int = Query(50, ge=1),
+    cursor: str = None,
+    use_cursor: bool = False,
+    with_total: bool = False,
     db: Session = Depends(get_db)
 ):
-    """관리자용 전체 만남 목록"""
+    """
+    관리자용 전체 만남 목록
+    - 커서 모드는 등록일(created_at) 역순
+    """
     query = db.query(Meeting)
 
     if status:
         query = query.filter(Meeting.status == status)
 
-    total = query.count()
-    meetings = query.order_by(Meeting.meeting_date.desc()).offset(skip).limit(limit).all()
+    if use_cursor or cursor:
+        meetings, page = cursor_page(query, Meeting.created_at, Meeting.id, cursor, limit, with_total)
+    else:
+        total = query.count()
+        meetings = query.order_by(Meeting.meeting_date.desc()).offset(skip).limit(limit).all()
+        page = {"total": total, "skip": skip, "limit": limit}
 
     return {
-        "total": total,
-        "skip": skip,
-        "limit": limit,
+        **page,
         "meetings": [
             {
                 "id": m.id,
@@ -1093,15 +1204,26 @@ def get_all_meetings(
 
 
 @app.get("/admin/reviews")
-def get_all_reviews(skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
+def get_all_reviews(
+    skip: int = 0,
+    limit: int = Query(50, ge=1),
+    cursor: str = None,
+    use_cursor: bool = False,
+    with_total: bool = False,
+    db: Session = Depends(get_db)
+):
     """관리자용 전체 후기 열람"""
-    total = db.query(MeetingReview).count()
-    reviews = db.query(MeetingReview).order_by(MeetingReview.created_at.desc()).offset(skip).limit(limit).all()
+    query = db.query(MeetingReview)
+
+    if use_cursor or cursor:
+        reviews, page = cursor_page(query, MeetingReview.created_at, MeetingReview.id, cursor, limit, with_total)
+    else:
+        total = query.count()
+        reviews = query.order_by(MeetingReview.created_at.desc()).offset(skip).limit(limit).all()
+        page = {"total": total, "skip": skip, "limit": limit}
 
     return {
-        "total": total,
-        "skip": skip,
-        "limit": limit,
+        **page,
         "reviews": [
             {
                 "id": r.id,
@@ -1119,31 +1241,17 @@ def get_all_reviews(skip: int = 0, limit: int = 50, db: Session = Depends(get_db
 
 
 @app.get("/admin/meetings/stats")
-def get_meeting_stats(db: Session = Depends(get_db)):
+def get_meeting_stats(fresh: bool = False, db: Session = Depends(get_db)):
     """만남 통계"""
-    total_meetings = db.query(Meeting).count()
-    completed_meetings = db.query(Meeting).filter(Meeting.status == "완료됨").count()
-    cancelled_meetings = db.query(Meeting).filter(Meeting.status == "취소됨").count()
-
-    total_reviews = db.query(MeetingReview).count()
-    avg_rating = db.query(MeetingReview).with_entities(
-        db.query(MeetingReview.rating).scalar_subquery()
-    ).scalar() or 0
-
-    # 다음 만남 의향 통계
-    intent_counts = {}
-    for intent in ["원함", "미정", "원하지않음"]:
-        count = db.query(MeetingReview).filter(
-            MeetingReview.next_meeting_intent == intent
-        ).count()
-        intent_counts[intent] = count
+    meetings = stats_snapshot.get(db, "meetings", fresh)
+    reviews = stats_snapshot.get(db, "reviews", fresh)
 
     return {
-        "total_meetings": total_meetings,
-        "completed_meetings": completed_meetings,
-        "cancelled_meetings": cancelled_meetings,
-        "total_reviews": total_reviews,
-        "intent_counts": intent_counts
+        "total_meetings": meetings["total"],
+        "completed_meetings": meetings["completed"],
+        "cancelled_meetings": meetings["cancelled"],
+        "total_reviews": reviews["total"],
+        "intent_counts": pick(reviews, "intent", MEETING_INTENTS)
     }
 
 
@@ -1171,17 +1279,17 @@ class ProfileUpdateRequest(BaseModel):
 
 
 @app.get("/profile/my")
-def get_my_profile(user_id: int = Query(...), db: Session = Depends(get_db)):
-    """내 프로필 조회"""
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+async def get_my_profile(user_id: int = Depends(current_user_id), db: AsyncSession = Depends(get_async_db)):
+    """내 프로필 조회 (JWT 토큰의 사용자 기준)"""
+    profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == user_id))
 
     if not profile:
         return {"user_id": user_id, "profile": None, "message": "프로필이 없습니다"}
 
-    photos = db.query(UserPhoto).filter(
+    photos = (await db.scalars(select(UserPhoto).where(
         UserPhoto.user_id == user_id,
         UserPhoto.is_approved == True
-    ).order_by(UserPhoto.order_index).all()
+    ).order_by(UserPhoto.order_index))).all()
 
     return {
         "user_id": user_id,
@@ -1218,7 +1326,12 @@ def get_my_profile(user_id: int = Query(...), db: Session = Depends(get_db)):
 
 
 @app.put("/profile/my")
-def update_my_profile(user_id: int = Query(...), req: ProfileUpdateRequest = None, db: Session = Depends(get_db)):
+def update_my_profile(
+    background_tasks: BackgroundTasks,
+    user_id: int = Depends(current_user_id),
+    req: ProfileUpdateRequest = None,
+    db: Session = Depends(get_db)
+):
     """프로필 수정"""
     profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
 
@@ -1235,12 +1348,16 @@ def update_my_profile(user_id: int = Query(...), req: ProfileUpdateRequest = Non
     db.commit()
     db.refresh(profile)
 
+    # 이상형 조건/프로필이 바뀌었으므로 관련 점수만 재계산
+    candidate_cache.invalidate()
+    background_tasks.add_task(recalculate_for_users, user_id)
+
     return {"status": "success", "message": "프로필이 업데이트되었습니다"}
 
 
 @app.post("/profile/photos")
 async def upload_profile_photo(
-    user_id: int = Query(...),
+    user_id: int = Depends(current_user_id),
     photo_type: str = Query("profile"),
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
@@ -1286,6 +1403,7 @@ async def upload_profile_photo(
         db.add(photo)
         db.commit()
         db.refresh(photo)
+        stats_snapshot.apply_change(frozenset(), counter_keys(photo))
 
         return {
             "status": "success",
@@ -1301,11 +1419,12 @@ async def upload_profile_photo(
 
 
 @app.delete("/profile/photos/{photo_id}")
-def delete_profile_photo(photo_id: int, db: Session = Depends(get_db)):
+def delete_profile_photo(photo_id: int, request: Request, db: Session = Depends(get_db)):
     """프로필 사진 삭제"""
     photo = db.query(UserPhoto).filter(UserPhoto.id == photo_id).first()
     if not photo:
         raise HTTPException(status_code=404, detail="사진을 찾을 수 없습니다")
+    authorize_user(request, photo.user_id)
 
     # S3에서 삭제
     try:
@@ -1314,18 +1433,21 @@ def delete_profile_photo(photo_id: int, db: Session = Depends(get_db)):
     except Exception:
         pass
 
+    before = counter_keys(photo)
     db.delete(photo)
     db.commit()
+    stats_snapshot.apply_change(before, frozenset())
 
     return {"status": "success", "message": "사진이 삭제되었습니다"}
 
 
 @app.put("/profile/photos/{photo_id}/order")
-def update_photo_order(photo_id: int, order_index: int = Query(...), db: Session = Depends(get_db)):
+def update_photo_order(photo_id: int, request: Request, order_index: int = Query(...), db: Session = Depends(get_db)):
     """사진 순서 변경"""
     photo = db.query(UserPhoto).filter(UserPhoto.id == photo_id).first()
     if not photo:
         raise HTTPException(status_code=404, detail="사진을 찾을 수 없습니다")
+    authorize_user(request, photo.user_id)
 
     photo.order_index = order_index
     db.commit()
@@ -1334,14 +1456,26 @@ def update_photo_order(photo_id: int, order_index: int = Query(...), db: Session
 
 
 @app.get("/admin/photos/pending")
-def get_pending_photos(skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
+def get_pending_photos(
+    skip: int = 0,
+    limit: int = Query(50, ge=1),
+    cursor: str = None,
+    use_cursor: bool = False,
+    with_total: bool = False,
+    db: Session = Depends(get_db)
+):
     """승인 대기 사진 목록"""
     query = db.query(UserPhoto).filter(UserPhoto.is_approved == False)
-    total = query.count()
-    photos = query.offset(skip).limit(limit).all()
+
+    if use_cursor or cursor:
+        photos, page = cursor_page(query, UserPhoto.created_at, UserPhoto.id, cursor, limit, with_total)
+    else:
+        total = query.count()
+        photos = query.offset(skip).limit(limit).all()
+        page = {"total": total}
 
     return {
-        "total": total,
+        **page,
         "photos": [
             {
                 "id": p.id,
@@ -1362,8 +1496,11 @@ def approve_photo(photo_id: int, db: Session = Depends(get_db)):
     if not photo:
         raise HTTPException(status_code=404, detail="사진을 찾을 수 없습니다")
 
+    before = counter_keys(photo)
     photo.is_approved = True
+    after = counter_keys(photo)
     db.commit()
+    stats_snapshot.apply_change(before, after)
 
     return {"status": "success", "message": "사진이 승인되었습니다"}
 
@@ -1375,107 +1512,50 @@ def reject_photo(photo_id: int, reason: str = Query("부적절한 사진"), db:
     if not photo:
         raise HTTPException(status_code=404, detail="사진을 찾을 수 없습니다")
 
+    before = counter_keys(photo)
     photo.rejected_reason = reason
     db.delete(photo)
     db.commit()
+    stats_snapshot.apply_change(before, frozenset())
 
     return {"status": "success", "message": "사진이 거부되었습니다"}
 
 
 # ===== 매칭 추천 API (Phase 6-4) =====
 
-def calculate_match_score(user_profile, candidate_profile, candidate_user):
-    """매칭 점수 계산"""
-    score = 0
-    breakdown = {}
-
-    if not user_profile or not candidate_profile:
-        return 50, {"base": 50}
-
-    # 1. 이상형 나이 조건 (15점)
-    try:
-        candidate_age = int(candidate_user.age) if candidate_user.age else 0
-        if user_profile.ideal_age_min and user_profile.ideal_age_max:
-            if user_profile.ideal_age_min <= candidate_age <= user_profile.ideal_age_max:
-                score += 15
-                breakdown["age"] = 15
-    except:
-        pass
-
-    # 2. 이상형 키 조건 (15점)
-    if candidate_profile.height and user_profile.ideal_height_min and user_profile.ideal_height_max:
-        if user_profile.ideal_height_min <= candidate_profile.height <= user_profile.ideal_height_max:
-            score += 15
-            breakdown["height"] = 15
-
-    # 3. 지역 조건 (10점)
-    if user_profile.ideal_location and candidate_profile.location:
-        if user_profile.ideal_location in candidate_profile.location:
-            score += 10
-            breakdown["location"] = 10
-
-    # 4. 종교 조건 (10점)
-    if user_profile.ideal_religion and candidate_profile.religion:
-        if user_profile.ideal_religion == candidate_profile.religion or user_profile.ideal_religion == "상관없음":
-            score += 10
-            breakdown["religion"] = 10
-
-    # 5. 흡연 조건 (10점)
-    if user_profile.ideal_smoking and candidate_profile.smoking:
-        if user_profile.ideal_smoking == candidate_profile.smoking or user_profile.ideal_smoking == "상관없음":
-            score += 10
-            breakdown["smoking"] = 10
-
-    # 6. 프로필 완성도 (20점)
-    profile_fields = [candidate_profile.job, candidate_profile.education, candidate_profile.introduction]
-    filled = sum(1 for f in profile_fields if f)
-    completeness = (filled / len(profile_fields)) * 20
-    score += completeness
-    breakdown["completeness"] = completeness
-
-    # 7. 기본 점수 (20점)
-    score += 20
-    breakdown["base"] = 20
-
-    return min(score, 100), breakdown
-
-
 @app.get("/recommendations")
-def get_recommendations(user_id: int = Query(...), limit: int = 10, db: Session = Depends(get_db)):
-    """내 추천 목록"""
-    user = db.query(User).filter(User.user_id == user_id).first()
+async def get_recommendations(
+    background_tasks: BackgroundTasks,
+    user_id: int = Depends(current_user_id),
+    limit: int = 10,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    내 추천 목록
+    - 사전 계산된 match_scores에서 상위 N명 조회
+    - 아직 계산되지 않은 회원은 즉시 계산 후 백그라운드로 저장
+    """
+    user = await db.scalar(select(User).where(User.user_id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="사용자 없음")
 
-    user_profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
-
-    # 이성, 매칭전, 활성 사용자 조회
-    opposite_gender = "여" if user.gender == "남" else "남"
-    candidates = db.query(User).filter(
-        User.gender == opposite_gender,
-        User.status == "매칭전",
-        User.is_banned == False,
-        User.deleted_at == None,
-        User.user_id != user_id
-    ).all()
-
-    # 점수 계산
-    scored_candidates = []
-    for candidate in candidates:
-        candidate_profile = db.query(UserProfile).filter(UserProfile.user_id == candidate.user_id).first()
-        score, breakdown = calculate_match_score(user_profile, candidate_profile, candidate)
-        scored_candidates.append({
-            "user": candidate,
-            "profile": candidate_profile,
-            "score": score,
-            "breakdown": breakdown
-        })
-
-    # 점수순 정렬
-    scored_candidates.sort(key=lambda x: x["score"], reverse=True)
+    top_candidates = await read_top_scores_async(db, user_id, limit)
+
+    if top_candidates is None:
+        user_profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == user_id))
+
+        # 후보자 풀 로드(동기 세션)와 점수 계산은 CPU/블로킹 작업이므로 스레드풀에서 실행
+        def rank():
+            # 이성, 매칭전, 활성 사용자 + 프로필 (성별별 캐시)
+            pool = candidate_cache.get(opposite_gender_of(user.gender)).pool
+            # 점수 계산 및 상위 N명 선택
+            return rank_candidates(user_profile, pool, limit)
+
+        top_candidates = await run_in_threadpool(rank)
+        background_tasks.add_task(recalculate_for_users, user_id)
 
     return {
-        "total": len(scored_candidates[:limit]),
+        "total": len(top_candidates),
         "recommendations": [
             {
                 "user_id": c["user"].user_id,
@@ -1488,15 +1568,31 @@ def get_recommendations(user_id: int = Query(...), limit: int = 10, db: Session
                     "introduction": c["profile"].introduction[:100] if c["profile"] and c["profile"].introduction else None
                 } if c["profile"] else None
             }
-            for c in scored_candidates[:limit]
+            for c in top_candidates
         ]
     }
 
 
 @app.get("/admin/recommendations/{user_id}")
-def get_user_recommendations(user_id: int, limit: int = 20, db: Session = Depends(get_db)):
+async def get_user_recommendations(
+    user_id: int,
+    background_tasks: BackgroundTasks,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_async_db)
+):
     """특정 회원 추천 목록 (관리자)"""
-    return get_recommendations(user_id=user_id, limit=limit, db=db)
+    return await get_recommendations(background_tasks=background_tasks, user_id=user_id, limit=limit, db=db)
+
+
+@app.post("/admin/recommendations/calculate")
+def calculate_recommendations(background_tasks: BackgroundTasks):
+    """
+    전체 매칭 점수 재계산 (관리자)
+    - 모든 회원 x 이성 후보 점수를 match_scores에 저장
+    - 백그라운드에서 실행되며 즉시 응답
+    """
+    background_tasks.add_task(recalculate_all)
+    return {"status": "accepted", "message": "매칭 점수 재계산을 시작했습니다"}
 
 
 # ===== 성혼 후기 API (Phase 6-5) =====
@@ -1510,8 +1606,10 @@ class SuccessStoryCreateRequest(BaseModel):
 
 
 @app.post("/success-stories")
-def create_success_story(req: SuccessStoryCreateRequest, db: Session = Depends(get_db)):
+def create_success_story(req: SuccessStoryCreateRequest, request: Request, db: Session = Depends(get_db)):
     """성혼 후기 작성"""
+    if not request.state.is_admin and authorize_user(request) not in (req.user1_id, req.user2_id):
+        raise HTTPException(status_code=403, detail="본인 후기만 작성할 수 있습니다")
     story = SuccessStory(
         user1_id=req.user1_id,
         user2_id=req.user2_id,
@@ -1526,6 +1624,7 @@ def create_success_story(req: SuccessStoryCreateRequest, db: Session = Depends(g
     db.add(story)
     db.commit()
     db.refresh(story)
+    stats_snapshot.apply_change(frozenset(), counter_keys(story))
 
     return {
         "status": "success",
@@ -1559,17 +1658,29 @@ def get_public_success_stories(skip: int = 0, limit: int = 10, db: Session = Dep
 
 
 @app.get("/admin/success-stories")
-def get_all_success_stories(status: str = None, skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
+def get_all_success_stories(
+    status: str = None,
+    skip: int = 0,
+    limit: int = Query(50, ge=1),
+    cursor: str = None,
+    use_cursor: bool = False,
+    with_total: bool = False,
+    db: Session = Depends(get_db)
+):
     """전체 후기 목록 (관리자)"""
     query = db.query(SuccessStory)
     if status:
         query = query.filter(SuccessStory.status == status)
 
-    total = query.count()
-    stories = query.order_by(SuccessStory.created_at.desc()).offset(skip).limit(limit).all()
+    if use_cursor or cursor:
+        stories, page = cursor_page(query, SuccessStory.created_at, SuccessStory.id, cursor, limit, with_total)
+    else:
+        total = query.count()
+        stories = query.order_by(SuccessStory.created_at.desc()).offset(skip).limit(limit).all()
+        page = {"total": total}
 
     return {
-        "total": total,
+        **page,
         "stories": [
             {
                 "id": s.id,
@@ -1593,10 +1704,13 @@ def approve_success_story(story_id: int, is_public: bool = True, db: Session = D
     if not story:
         raise HTTPException(status_code=404, detail="후기를 찾을 수 없습니다")
 
+    before = counter_keys(story)
     story.status = "approved"
     story.is_public = is_public
     story.approved_at = datetime.now()
+    after = counter_keys(story)
     db.commit()
+    stats_snapshot.apply_change(before, after)
 
     return {"status": "success", "message": "후기가 승인되었습니다"}
 
@@ -1608,9 +1722,12 @@ def reject_success_story(story_id: int, note: str = None, db: Session = Depends(
     if not story:
         raise HTTPException(status_code=404, detail="후기를 찾을 수 없습니다")
 
+    before = counter_keys(story)
     story.status = "rejected"
     story.admin_note = note
+    after = counter_keys(story)
     db.commit()
+    stats_snapshot.apply_change(before, after)
 
     return {"status": "success", "message": "후기가 거부되었습니다"}
 
@@ -1624,7 +1741,7 @@ def generate_referral_code():
 
 
 @app.get("/referral/my-code")
-def get_my_referral_code(user_id: int = Query(...), db: Session = Depends(get_db)):
+def get_my_referral_code(user_id: int = Depends(current_user_id), db: Session = Depends(get_db)):
     """내 추천 코드 조회 (없으면 생성)"""
     user = db.query(User).filter(User.user_id == user_id).first()
     if not user:
@@ -1647,7 +1764,7 @@ def get_my_referral_code(user_id: int = Query(...), db: Session = Depends(get_db
 
 
 @app.post("/referral/apply")
-def apply_referral_code(user_id: int = Query(...), code: str = Query(...), db: Session = Depends(get_db)):
+def apply_referral_code(user_id: int = Depends(current_user_id), code: str = Query(...), db: Session = Depends(get_db)):
     """추천 코드 적용"""
     user = db.query(User).filter(User.user_id == user_id).first()
     if not user:
@@ -1676,6 +1793,7 @@ def apply_referral_code(user_id: int = Query(...), code: str = Query(...), db: S
     )
     db.add(referral)
     db.commit()
+    stats_snapshot.apply_change(frozenset(), counter_keys(referral))
 
     return {
         "status": "success",
@@ -1685,7 +1803,7 @@ def apply_referral_code(user_id: int = Query(...), code: str = Query(...), db: S
 
 
 @app.get("/referral/my-referrals")
-def get_my_referrals(user_id: int = Query(...), db: Session = Depends(get_db)):
+def get_my_referrals(user_id: int = Depends(current_user_id), db: Session = Depends(get_db)):
     """내가 추천한 사람 목록"""
     referrals = db.query(Referral).filter(Referral.referrer_id == user_id).all()
 
@@ -1704,17 +1822,29 @@ def get_my_referrals(user_id: int = Query(...), db: Session = Depends(get_db)):
 
 
 @app.get("/admin/referrals")
-def get_all_referrals(status: str = None, skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
+def get_all_referrals(
+    status: str = None,
+    skip: int = 0,
+    limit: int = Query(50, ge=1),
+    cursor: str = None,
+    use_cursor: bool = False,
+    with_total: bool = False,
+    db: Session = Depends(get_db)
+):
     """전체 추천 현황 (관리자)"""
     query = db.query(Referral)
     if status:
         query = query.filter(Referral.reward_status == status)
 
-    total = query.count()
-    referrals = query.order_by(Referral.created_at.desc()).offset(skip).limit(limit).all()
+    if use_cursor or cursor:
+        referrals, page = cursor_page(query, Referral.created_at, Referral.id, cursor, limit, with_total)
+    else:
+        total = query.count()
+        referrals = query.order_by(Referral.created_at.desc()).offset(skip).limit(limit).all()
+        page = {"total": total}
 
     return {
-        "total": total,
+        **page,
         "referrals": [
             {
                 "id": r.id,
@@ -1748,81 +1878,49 @@ def reward_referral(referral_id: int, reward_type: str = Query("discount"), db:
 # ===== 관리자 대시보드 고도화 API (Phase 6-7) =====
 
 @app.get("/admin/dashboard")
-def get_admin_dashboard(db: Session = Depends(get_db)):
+def get_admin_dashboard(fresh: bool = False, db: Session = Depends(get_db)):
     """종합 대시보드"""
-    # 기본 통계
-    total_users = db.query(User).filter(User.deleted_at == None).count()
-    active_users = db.query(User).filter(
-        User.deleted_at == None,
-        User.is_banned == False
-    ).count()
-
-    # 이번 달 신규 가입
-    today = datetime.now()
-    first_of_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    new_users_this_month = db.query(User).filter(
-        User.created_at >= first_of_month
-    ).count()
-
-    # 매칭 통계
-    total_matches = db.query(User).filter(User.matched_partner != None).count() // 2
-    success_matches = db.query(User).filter(User.status == "성혼").count() // 2
-
-    # 대기 항목
-    pending_photos = db.query(UserPhoto).filter(UserPhoto.is_approved == False).count()
-    pending_consultations = db.query(Consultation).filter(Consultation.status == "요청됨").count()
-    pending_stories = db.query(SuccessStory).filter(SuccessStory.status == "pending").count()
+    # 회원 통계 (1회 집계)
+    users = stats_snapshot.get(db, "users", fresh)
+
+    # 대기 항목 (1회 집계)
+    misc = stats_snapshot.get(db, "misc", fresh)
 
     return {
         "overview": {
-            "total_users": total_users,
-            "active_users": active_users,
-            "new_users_this_month": new_users_this_month,
-            "total_matches": total_matches,
-            "success_matches": success_matches
+            "total_users": users["total"],
+            "active_users": users["active"],
+            "new_users_this_month": users["new_this_month"],
+            "total_matches": users["matched_all"] // 2,
+            "success_matches": users["success_all"] // 2
         },
         "alerts": {
-            "pending_photos": pending_photos,
-            "pending_consultations": pending_consultations,
-            "pending_stories": pending_stories
+            "pending_photos": misc["pending_photos"],
+            "pending_consultations": misc["pending_consultations"],
+            "pending_stories": misc["pending_stories"]
         }
     }
 
 
 @app.get("/admin/analytics/users")
-def get_user_analytics(db: Session = Depends(get_db)):
+def get_user_analytics(fresh: bool = False, db: Session = Depends(get_db)):
     """사용자 분석"""
-    # 성별 분포
-    gender_counts = {}
-    for gender in ["남", "여"]:
-        count = db.query(User).filter(User.gender == gender, User.deleted_at == None).count()
-        gender_counts[gender] = count
-
-    # 멤버십 분포
-    membership_counts = {}
-    for membership in ["일반회원", "정회원", "결제회원"]:
-        count = db.query(User).filter(User.membership_type == membership, User.deleted_at == None).count()
-        membership_counts[membership] = count
-
-    # 상태 분포
-    status_counts = {}
-    for status in ["매칭전", "매칭중", "성혼", "만료"]:
-        count = db.query(User).filter(User.status == status, User.deleted_at == None).count()
-        status_counts[status] = count
+    counts = stats_snapshot.get(db, "users", fresh)
 
     return {
-        "gender_distribution": gender_counts,
-        "membership_distribution": membership_counts,
-        "status_distribution": status_counts
+        "gender_distribution": pick(counts, "gender", GENDERS),
+        "membership_distribution": pick(counts, "membership", MEMBERSHIP_TYPES),
+        "status_distribution": pick(counts, "status", USER_STATUSES)
     }
 
 
 @app.get("/admin/analytics/matches")
-def get_match_analytics(db: Session = Depends(get_db)):
+def get_match_analytics(fresh: bool = False, db: Session = Depends(get_db)):
     """매칭 분석"""
-    total_users = db.query(User).filter(User.deleted_at == None).count()
-    matched_users = db.query(User).filter(User.matched_partner != None, User.deleted_at == None).count()
-    success_users = db.query(User).filter(User.status == "성혼").count()
+    counts = stats_snapshot.get(db, "users", fresh)
+    total_users = counts["total"]
+    matched_users = counts["matched"]
+    success_users = counts["success_all"]
 
     match_rate = (matched_users / total_users * 100) if total_users > 0 else 0
     success_rate = (success_users / matched_users * 100) if matched_users > 0 else 0
@@ -1837,43 +1935,39 @@ def get_match_analytics(db: Session = Depends(get_db)):
 
 
 @app.get("/admin/analytics/consultations")
-def get_consultation_analytics(db: Session = Depends(get_db)):
+def get_consultation_analytics(fresh: bool = False, db: Session = Depends(get_db)):
     """상담 분석"""
-    total = db.query(Consultation).count()
-    by_status = {}
-    for status in ["요청됨", "확인됨", "완료됨", "취소됨"]:
-        count = db.query(Consultation).filter(Consultation.status == status).count()
-        by_status[status] = count
-
-    by_type = {}
-    for ctype in ["초기상담", "매칭상담", "사후상담"]:
-        count = db.query(Consultation).filter(Consultation.consultation_type == ctype).count()
-        by_type[ctype] = count
+    counts = stats_snapshot.get(db, "consultations", fresh)
 
     return {
-        "total": total,
-        "by_status": by_status,
-        "by_type": by_type
+        "total": counts["total"],
+        "by_status": pick(counts, "status", CONSULTATION_STATUSES),
+        "by_type": pick(counts, "type", CONSULTATION_TYPES)
     }
 
 
 @app.get("/admin/reports/summary")
-def get_summary_report(db: Session = Depends(get_db)):
+def get_summary_report(fresh: bool = False, db: Session = Depends(get_db)):
     """요약 리포트"""
     # 전체 통계
-    total_users = db.query(User).filter(User.deleted_at == None).count()
-    paid_users = db.query(User).filter(User.payment_date != None, User.deleted_at == None).count()
-    total_consultations = db.query(Consultation).count()
-    total_meetings = db.query(Meeting).count()
-    total_referrals = db.query(Referral).count()
+    users = stats_snapshot.get(db, "users", fresh)
+    misc = stats_snapshot.get(db, "misc", fresh)
+    total_users = users["total"]
+    paid_users = users["paid"]
 
     return {
         "summary": {
             "total_users": total_users,
             "paid_users": paid_users,
             "payment_rate": round((paid_users / total_users * 100) if total_users > 0 else 0, 1),
-            "total_consultations": total_consultations,
-            "total_meetings": total_meetings,
-            "total_referrals": total_referrals
+            "total_consultations": misc["total_consultations"],
+            "total_meetings": misc["total_meetings"],
+            "total_referrals": misc["total_referrals"]
         }
     }
+
+
+@app.on_event("startup")
+def start_jwt_revocations():
+    """로그아웃 토큰 목록 첫 동기화 (요청 처리 중에는 DB를 기다리지 않도록 시작 시 한 번)"""
+    token_verifier.revocations.start()
@@ -0,0 +1,281 @@
+# user-service/match_scores.py
+# 매칭 점수 사전 계산 (match_scores 테이블 유지)
+import json
+import threading
+from datetime import datetime
+from sqlalchemy import insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db import SessionLocal, User, UserProfile, MatchScore, MatchScoreStatus
+from matching import (
+    calculate_match_score, eligible_candidate_filters, load_candidates,
+    make_pool, opposite_gender_of, score_all
+)
+
+# 한 번에 INSERT할 행 수
+INSERT_BATCH_SIZE = 1000
+
+# 점수 교체(삭제 + INSERT + 커밋)만 짧게 직렬화 (여러 워커 포함, 점수 계산은 잠금 밖에서)
+WRITE_LOCK_NAME = "match_scores_write"
+
+# 전체 재계산은 프로세스당 하나만 (진행 중이면 새 요청은 건너뜀)
+_recalculate_all_lock = threading.Lock()
+
+
+def _lock_writes(db: Session):
+    """현재 트랜잭션이 끝날 때까지 다른 점수 교체 대기"""
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": WRITE_LOCK_NAME})
+
+
+def _mark_calculated(db: Session, user_id: int, candidate_count: int, calculated_at: datetime,
+                     unless_after: datetime = None) -> bool:
+    """
+    계산 상태 행 갱신
+    - unless_after: 이 시각 이후에 다른 작업이 이미 갱신한 행이면 덮어쓰지 않고 False
+    """
+    stmt = pg_insert(MatchScoreStatus).values(
+        user_id=user_id, candidate_count=candidate_count, calculated_at=calculated_at
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MatchScoreStatus.user_id],
+        set_={
+            "candidate_count": stmt.excluded.candidate_count,
+            "calculated_at": stmt.excluded.calculated_at,
+        },
+        where=(MatchScoreStatus.calculated_at <= unless_after) if unless_after is not None else None
+    )
+    return db.execute(stmt.returning(MatchScoreStatus.user_id)).first() is not None
+
+
+def _owner_query(db: Session):
+    """추천을 받는 회원 (추방/탈퇴 제외) + 프로필"""
+    return db.query(User, UserProfile).outerjoin(
+        UserProfile, UserProfile.user_id == User.user_id
+    ).filter(
+        User.is_banned == False,
+        User.deleted_at == None
+    )
+
+
+def _is_owner(user: User) -> bool:
+    return not user.is_banned and user.deleted_at is None
+
+
+def _is_candidate(user: User) -> bool:
+    return (
+        user.gender in ("남", "여")
+        and user.status == "매칭전"
+        and not user.is_banned
+        and user.deleted_at is None
+    )
+
+
+def _row(user_id: int, result: dict, calculated_at: datetime) -> dict:
+    return {
+        "user_id": user_id,
+        "candidate_id": result["user"].user_id,
+        "score": float(result["score"]),
+        "score_breakdown": json.dumps(result["breakdown"], ensure_ascii=False),
+        "calculated_at": calculated_at
+    }
+
+
+def _insert_rows(db: Session, rows: list):
+    for i in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.execute(insert(MatchScore), rows[i:i + INSERT_BATCH_SIZE])
+
+
+def recalculate_all():
+    """
+    전체 매칭 점수 재계산
+    - 성별마다 후보자 풀을 한 번만 로드해 모든 회원에 대해 벡터화 계산
+    - 회원 단위로 교체/커밋하므로 조회 중에도 부분적으로 비는 구간이 없음
+    - 실행 중 개별 재계산(recalculate_for_users)이 끝난 회원은 덮어쓰지 않고,
+      마지막에 그 회원들을 다시 계산 (시작 시 로드한 풀의 예전 값이 남지 않도록)
+    """
+    if not _recalculate_all_lock.acquire(blocking=False):
+        print("[MatchScore] 전체 재계산이 이미 진행 중")
+        return
+
+    db = SessionLocal()
+    try:
+        started = datetime.now()
+
+        # 더 이상 추천을 받지 않는 회원의 점수 삭제
+        active_owners = select(User.user_id).where(
+            User.is_banned == False,
+            User.deleted_at == None
+        )
+        _lock_writes(db)
+        db.query(MatchScore).filter(
+            ~MatchScore.user_id.in_(active_owners)
+        ).delete(synchronize_session=False)
+        db.query(MatchScoreStatus).filter(
+            ~MatchScoreStatus.user_id.in_(active_owners)
+        ).update({"candidate_count": 0}, synchronize_session=False)
+        db.commit()
+
+        pools = {
+            gender: make_pool(load_candidates(db, gender))
+            for gender in ("남", "여")
+        }
+
+        total_rows = 0
+        for owner, owner_profile in _owner_query(db).all():
+            pool = pools[opposite_gender_of(owner.gender)]
+            rows = [
+                _row(owner.user_id, result, started)
+                for result in score_all(owner_profile, pool)
+                if result["user"].user_id != owner.user_id
+            ]
+
+            _lock_writes(db)
+            if not _mark_calculated(db, owner.user_id, len(rows), started, unless_after=started):
+                # 시작 이후 개별 재계산된 회원 (더 새로운 값 유지)
+                db.rollback()
+                continue
+            db.query(MatchScore).filter(
+                MatchScore.user_id == owner.user_id
+            ).delete(synchronize_session=False)
+            _insert_rows(db, rows)
+            db.commit()
+            total_rows += len(rows)
+
+        changed = db.scalars(
+            select(MatchScoreStatus.user_id).where(MatchScoreStatus.calculated_at > started)
+        ).all()
+        db.rollback()
+        print(f"[MatchScore] 전체 재계산 완료: {total_rows}건, 실행 중 변경된 회원 {len(changed)}명 재계산")
+    except Exception as e:
+        db.rollback()
+        print(f"[MatchScore] 전체 재계산 실패: {e}")
+        return
+    finally:
+        db.close()
+        _recalculate_all_lock.release()
+
+    recalculate_for_users(*changed)
+
+
+def recalculate_for_users(*user_ids: int):
+    """
+    특정 회원과 관련된 점수만 재계산
+    - 회원 본인이 받는 추천 (user_id = 회원)
+    - 다른 회원의 추천에 후보로 포함된 행 (candidate_id = 회원)
+    프로필 수정, 상태/추방/탈퇴 변경 후 호출
+    - 점수 계산은 잠금 없이, 교체 트랜잭션만 짧게 직렬화 (전체 재계산 중에도 기다리지 않음)
+    """
+    db = SessionLocal()
+    try:
+        for user_id in user_ids:
+            _recalculate_user(db, user_id, datetime.now())
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"[MatchScore] 재계산 실패 {user_ids}: {e}")
+    finally:
+        db.close()
+
+
+def _recalculate_user(db: Session, user_id: int, now: datetime):
+    row = db.query(User, UserProfile).outerjoin(
+        UserProfile, UserProfile.user_id == User.user_id
+    ).filter(User.user_id == user_id).first()
+
+    owned = []
+    as_candidate = []
+    if row:
+        user, profile = row
+
+        # 1. 본인이 받는 추천
+        if _is_owner(user):
+            pool = make_pool(load_candidates(db, opposite_gender_of(user.gender), exclude_user_id=user_id))
+            owned = [_row(user_id, result, now) for result in score_all(profile, pool)]
+
+        # 2. 이 회원을 후보로 보는 다른 회원들의 추천
+        # 점수가 이미 계산된 회원만 (상태 행이 없는 회원은 조회 시 전체 계산, 이 회원만 든 목록이 남지 않도록)
+        if _is_candidate(user):
+            owners = _owner_query(db).filter(
+                User.user_id != user_id,
+                User.user_id.in_(select(MatchScoreStatus.user_id))
+            )
+            if user.gender == "여":
+                owners = owners.filter(User.gender == "남")
+            else:
+                # 남성 후보는 여성 + 성별 미입력 회원에게 추천됨
+                owners = owners.filter((User.gender != "남") | (User.gender == None))
+
+            for owner, owner_profile in owners.all():
+                score, breakdown = calculate_match_score(owner_profile, profile, user)
+                as_candidate.append(_row(owner.user_id, {
+                    "user": user,
+                    "score": score,
+                    "breakdown": breakdown
+                }, now))
+
+    _lock_writes(db)
+    db.query(MatchScore).filter(
+        (MatchScore.user_id == user_id) | (MatchScore.candidate_id == user_id)
+    ).delete(synchronize_session=False)
+    if not row:
+        db.query(MatchScoreStatus).filter(MatchScoreStatus.user_id == user_id).delete(synchronize_session=False)
+        return
+    _insert_rows(db, owned + as_candidate)
+    # 추천 대상이 아닌 회원도 0건으로 기록 (조회 시 다시 계산하지 않음)
+    # 기록 시각은 교체 시점 (전체 재계산이 이 회원을 덮어쓰지 않도록)
+    _mark_calculated(db, user_id, len(owned), datetime.now())
+
+
+def _top_scores_query(user_id: int, limit: int):
+    # 상태 행이 있는 회원의 점수만 (계산 전 회원의 일부 행은 믿지 않음)
+    return select(MatchScore, User, UserProfile).join(
+        MatchScoreStatus, MatchScoreStatus.user_id == MatchScore.user_id
+    ).join(
+        User, User.user_id == MatchScore.candidate_id
+    ).outerjoin(
+        UserProfile, UserProfile.user_id == User.user_id
+    ).where(
+        MatchScore.user_id == user_id,
+        *eligible_candidate_filters()
+    ).order_by(
+        MatchScore.score.desc(), MatchScore.candidate_id
+    ).limit(limit)
+
+
+def _has_scores_query(user_id: int):
+    return select(MatchScoreStatus.user_id).where(MatchScoreStatus.user_id == user_id)
+
+
+def _top_scores_result(rows) -> list:
+    return [
+        {
+            "user": candidate,
+            "profile": profile,
+            "score": match_score.score,
+            "breakdown": json.loads(match_score.score_breakdown) if match_score.score_breakdown else {}
+        }
+        for match_score, candidate, profile in rows
+    ]
+
+
+def read_top_scores(db: Session, user_id: int, limit: int):
+    """
+    저장된 점수에서 상위 N명 조회 (user_id, score 인덱스 사용)
+    - 후보 자격은 조회 시점에 다시 확인
+    - 점수가 한 번도 계산되지 않은 회원(상태 행 없음)이면 None 반환, 다른 회원 재계산으로
+      생긴 일부 행이 있어도 마찬가지 (후보 0명으로 계산된 회원은 빈 목록)
+    """
+    rows = db.execute(_top_scores_query(user_id, limit)).all()
+    if not rows and db.scalar(_has_scores_query(user_id)) is None:
+        return None
+    return _top_scores_result(rows)
+
+
+async def read_top_scores_async(db: AsyncSession, user_id: int, limit: int):
+    """read_top_scores의 AsyncSession 버전"""
+    rows = (await db.execute(_top_scores_query(user_id, limit))).all()
+    if not rows and await db.scalar(_has_scores_query(user_id)) is None:
+        return None
+    return _top_scores_result(rows)
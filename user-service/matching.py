@@ -0,0 +1,310 @@
+# user-service/matching.py
+# 매칭 추천 점수 계산 엔진
+import heapq
+from sqlalchemy.orm import Session
+
+try:
+    import numpy as np
+except ImportError:  # numpy 미설치 환경에서는 스칼라 경로로 계산
+    np = None
+
+from db import User, UserProfile
+
+
+def calculate_match_score(user_profile, candidate_profile, candidate_user):
+    """매칭 점수 계산"""
+    score = 0
+    breakdown = {}
+
+    if not user_profile or not candidate_profile:
+        return 50, {"base": 50}
+
+    # 1. 이상형 나이 조건 (15점)
+    try:
+        candidate_age = int(candidate_user.age) if candidate_user.age else 0
+        if user_profile.ideal_age_min and user_profile.ideal_age_max:
+            if user_profile.ideal_age_min <= candidate_age <= user_profile.ideal_age_max:
+                score += 15
+                breakdown["age"] = 15
+    except:
+        pass
+
+    # 2. 이상형 키 조건 (15점)
+    if candidate_profile.height and user_profile.ideal_height_min and user_profile.ideal_height_max:
+        if user_profile.ideal_height_min <= candidate_profile.height <= user_profile.ideal_height_max:
+            score += 15
+            breakdown["height"] = 15
+
+    # 3. 지역 조건 (10점)
+    if user_profile.ideal_location and candidate_profile.location:
+        if user_profile.ideal_location in candidate_profile.location:
+            score += 10
+            breakdown["location"] = 10
+
+    # 4. 종교 조건 (10점)
+    if user_profile.ideal_religion and candidate_profile.religion:
+        if user_profile.ideal_religion == candidate_profile.religion or user_profile.ideal_religion == "상관없음":
+            score += 10
+            breakdown["religion"] = 10
+
+    # 5. 흡연 조건 (10점)
+    if user_profile.ideal_smoking and candidate_profile.smoking:
+        if user_profile.ideal_smoking == candidate_profile.smoking or user_profile.ideal_smoking == "상관없음":
+            score += 10
+            breakdown["smoking"] = 10
+
+    # 6. 프로필 완성도 (20점)
+    profile_fields = [candidate_profile.job, candidate_profile.education, candidate_profile.introduction]
+    filled = sum(1 for f in profile_fields if f)
+    completeness = (filled / len(profile_fields)) * 20
+    score += completeness
+    breakdown["completeness"] = completeness
+
+    # 7. 기본 점수 (20점)
+    score += 20
+    breakdown["base"] = 20
+
+    return min(score, 100), breakdown
+
+
+def opposite_gender_of(gender):
+    """추천 대상 성별 (성별 미입력 회원은 남성 후보)"""
+    return "여" if gender == "남" else "남"
+
+
+def eligible_candidate_filters():
+    """추천/매칭 후보 조건: 매칭전, 추방/탈퇴 아님"""
+    return (
+        User.status == "매칭전",
+        User.is_banned == False,
+        User.deleted_at == None
+    )
+
+
+def load_candidates(db: Session, gender: str, exclude_user_id: int = None):
+    """
+    추천 후보자 일괄 조회
+    - 해당 성별의 매칭전, 활성 사용자와 프로필을 한 번의 조인 쿼리로 로드
+    - 프로필이 없는 후보자는 (User, None)으로 반환
+    """
+    query = db.query(User, UserProfile).outerjoin(
+        UserProfile, UserProfile.user_id == User.user_id
+    ).filter(User.gender == gender, *eligible_candidate_filters())
+
+    if exclude_user_id is not None:
+        query = query.filter(User.user_id != exclude_user_id)
+
+    return query.order_by(User.user_id).all()
+
+
+def _score_one(user_profile, candidate, candidate_profile):
+    score, breakdown = calculate_match_score(user_profile, candidate_profile, candidate)
+    return {
+        "user": candidate,
+        "profile": candidate_profile,
+        "score": score,
+        "breakdown": breakdown
+    }
+
+
+class CandidatePool:
+    """
+    후보자 풀 컬럼형 스냅샷 (벡터화 점수 계산용)
+    - 나이/키/종교/흡연/지역/완성도를 배열로 압축해 두고
+      한 회원의 이상형 조건에 대해 전체 풀을 한 번에 점수화
+    - 결과는 calculate_match_score와 완전히 동일해야 함
+    """
+
+    # 종교/흡연/지역 코드 0은 "값 없음"
+    _EMPTY = 0
+
+    def __init__(self, candidates):
+        self.candidates = list(candidates)
+        n = len(self.candidates)
+
+        self.has_profile = np.zeros(n, dtype=bool)
+        self.age = np.zeros(n, dtype=np.int64)
+        self.age_valid = np.zeros(n, dtype=bool)
+        self.height = np.zeros(n, dtype=np.int64)
+        self.religion = np.zeros(n, dtype=np.int32)
+        self.smoking = np.zeros(n, dtype=np.int32)
+        self.location = np.zeros(n, dtype=np.int32)
+        self.filled = np.zeros(n, dtype=np.int64)
+
+        self.religion_codes = {}
+        self.smoking_codes = {}
+        self.location_codes = {}
+
+        for i, (candidate, profile) in enumerate(self.candidates):
+            # 나이는 스칼라 계산과 같은 규칙으로 미리 파싱 (실패 시 나이 점수 없음)
+            try:
+                self.age[i] = int(candidate.age) if candidate.age else 0
+                self.age_valid[i] = True
+            except (TypeError, ValueError, OverflowError):
+                pass
+
+            if profile is None:
+                continue
+
+            self.has_profile[i] = True
+            self.height[i] = profile.height or 0
+            self.religion[i] = self._encode(self.religion_codes, profile.religion)
+            self.smoking[i] = self._encode(self.smoking_codes, profile.smoking)
+            self.location[i] = self._encode(self.location_codes, profile.location)
+            self.filled[i] = sum(1 for f in (profile.job, profile.education, profile.introduction) if f)
+
+        # 코드 -> 지역 문자열 (부분 문자열 비교는 고유 지역 단위로 한 번만 수행)
+        self.locations = [None] * (len(self.location_codes) + 1)
+        for value, code in self.location_codes.items():
+            self.locations[code] = value
+
+    def __len__(self):
+        return len(self.candidates)
+
+    @classmethod
+    def _encode(cls, codes: dict, value):
+        if not value:
+            return cls._EMPTY
+        if value not in codes:
+            codes[value] = len(codes) + 1
+        return codes[value]
+
+    def _match_code(self, codes: dict, column, ideal):
+        """종교/흡연 조건: 같은 값이거나 '상관없음'이면 일치"""
+        if not ideal:
+            return np.zeros(len(self), dtype=bool)
+        if ideal == "상관없음":
+            return column != self._EMPTY
+        code = codes.get(ideal)
+        if code is None:
+            return np.zeros(len(self), dtype=bool)
+        return column == code
+
+    def components(self, user_profile) -> dict:
+        """항목별 점수 배열 계산"""
+        n = len(self)
+        zeros = np.zeros(n, dtype=np.int64)
+
+        age_min, age_max = user_profile.ideal_age_min, user_profile.ideal_age_max
+        if age_min and age_max:
+            age = np.where(self.age_valid & (age_min <= self.age) & (self.age <= age_max), 15, 0)
+        else:
+            age = zeros
+
+        height_min, height_max = user_profile.ideal_height_min, user_profile.ideal_height_max
+        if height_min and height_max:
+            height = np.where((self.height != 0) & (height_min <= self.height) & (self.height <= height_max), 15, 0)
+        else:
+            height = zeros
+
+        ideal_location = user_profile.ideal_location
+        if ideal_location:
+            matches = np.array(
+                [value is not None and ideal_location in value for value in self.locations],
+                dtype=bool
+            )
+            location = np.where(matches[self.location], 10, 0)
+        else:
+            location = zeros
+
+        religion = np.where(self._match_code(self.religion_codes, self.religion, user_profile.ideal_religion), 10, 0)
+        smoking = np.where(self._match_code(self.smoking_codes, self.smoking, user_profile.ideal_smoking), 10, 0)
+        completeness = (self.filled / 3) * 20
+
+        # 합산 순서도 스칼라 계산과 동일하게 유지 (정수 항목 -> 완성도 -> 기본 점수)
+        total = np.minimum((age + height + location + religion + smoking) + completeness + 20, 100)
+        total = np.where(self.has_profile, total, 50.0)
+
+        return {
+            "age": age,
+            "height": height,
+            "location": location,
+            "religion": religion,
+            "smoking": smoking,
+            "completeness": completeness,
+            "total": total
+        }
+
+    def scores(self, user_profile):
+        """전체 후보자 점수 배열"""
+        if not user_profile:
+            return np.full(len(self), 50.0)
+        return self.components(user_profile)["total"]
+
+    def _result(self, i: int, comps):
+        candidate, profile = self.candidates[i]
+        if comps is None or not self.has_profile[i]:
+            score, breakdown = 50, {"base": 50}
+        else:
+            breakdown = {}
+            for key in ("age", "height", "location", "religion", "smoking"):
+                if comps[key][i]:
+                    breakdown[key] = int(comps[key][i])
+            breakdown["completeness"] = float(comps["completeness"][i])
+            breakdown["base"] = 20
+            score = float(comps["total"][i])
+        return {
+            "user": candidate,
+            "profile": profile,
+            "score": score,
+            "breakdown": breakdown
+        }
+
+    def results(self, user_profile):
+        """전체 후보자 점수 결과 (풀 순서)"""
+        comps = self.components(user_profile) if user_profile else None
+        return [self._result(i, comps) for i in range(len(self))]
+
+    def top_k(self, user_profile, k: int):
+        """
+        상위 K명 선택
+        - 부분 선택(argpartition)으로 후보를 줄인 뒤 K명만 정렬
+        - 동점자는 풀 순서를 유지 (스칼라 경로와 동일한 순서)
+        """
+        n = len(self)
+        k = min(max(k, 0), n)
+        if k == 0:
+            return []
+
+        comps = self.components(user_profile) if user_profile else None
+        scores = comps["total"] if comps else np.full(n, 50.0)
+
+        if k < n:
+            kth = np.partition(scores, n - k)[n - k]
+            idx = np.flatnonzero(scores >= kth)
+        else:
+            idx = np.arange(n)
+        order = idx[np.lexsort((idx, -scores[idx]))][:k]
+
+        return [self._result(int(i), comps) for i in order]
+
+
+def make_pool(candidates):
+    """점수 계산용 후보자 풀 생성 (numpy가 없으면 리스트 그대로 사용)"""
+    if np is not None:
+        return CandidatePool(candidates)
+    return list(candidates)
+
+
+def score_all(user_profile, pool):
+    """풀 전체 후보자 점수 계산 (풀 순서 유지)"""
+    if np is not None:
+        return pool.results(user_profile)
+    return [_score_one(user_profile, candidate, profile) for candidate, profile in pool]
+
+
+def rank_candidates(user_profile, pool, limit: int):
+    """
+    후보자 점수 계산 후 상위 N명 반환
+    - numpy가 있으면 CandidatePool로 전체 풀을 벡터화 계산
+    - 없으면 크기 N의 힙으로 상위 후보만 유지
+    - 동점자는 조회 순서를 유지 (sorted(..., reverse=True)와 동일한 결과)
+    """
+    if np is not None:
+        return pool.top_k(user_profile, limit)
+
+    scored = (
+        _score_one(user_profile, candidate, candidate_profile)
+        for candidate, candidate_profile in pool
+    )
+    return heapq.nlargest(max(limit, 0), scored, key=lambda x: x["score"])
@@ -0,0 +1,292 @@
+# user-service/member_search.py
+# 회원 이름/전화번호 검색
+# - PostgreSQL pg_trgm GIN 인덱스 사용 (migrations.py에서 생성)
+# - 확장/인덱스가 없는 환경에서는 프로세스 내 n-gram 인덱스로 대체
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from itertools import chain
+
+from sqlalchemy import event, func, inspect, text
+from sqlalchemy.orm import Session
+
+from db import SessionLocal, User
+
+# auto: 인덱스 존재 여부로 결정 / trigram / ngram / like (기존 방식)
+MEMBER_SEARCH_BACKEND = os.getenv("MEMBER_SEARCH_BACKEND", "auto")
+# auto일 때 인덱스 존재 여부를 다시 확인하는 주기 (초, 시작 후 마이그레이션을 실행해도 반영되도록)
+MEMBER_SEARCH_RECHECK = float(os.getenv("MEMBER_SEARCH_RECHECK", "300"))
+# 이보다 짧은 검색어(한 글자 성씨 등)는 인덱스로 좁힐 수 없어 기존 LIKE 조건으로 검색
+MEMBER_SEARCH_MIN_LENGTH = int(os.getenv("MEMBER_SEARCH_MIN_LENGTH", "2"))
+# 프로세스 내 n-gram 인덱스 유지 시간 (초)
+NGRAM_INDEX_TTL = float(os.getenv("NGRAM_INDEX_TTL", "300"))
+# n-gram 결과가 이보다 많으면 IN 목록 대신 LIKE 조건 사용
+NGRAM_MAX_IDS = int(os.getenv("NGRAM_MAX_IDS", "5000"))
+
+NAME_TRGM_INDEX = "ix_users_name_trgm"
+PHONE_TRGM_INDEX = "ix_users_phone_digits_trgm"
+
+# 검색 결과에 영향을 주는 users 컬럼 (변경 시 n-gram 인덱스 폐기)
+SEARCH_COLUMNS = ("name", "phone_number", "deleted_at")
+
+_NON_DIGITS = re.compile(r"[^0-9]")
+_PHONE_LIKE = re.compile(r"[0-9\-\s+()]+")
+
+
+def normalize_digits(value: str) -> str:
+    """전화번호에서 숫자만 추출 (010-1234-5678 -> 01012345678)"""
+    return _NON_DIGITS.sub("", value or "")
+
+
+def phone_digits_expr():
+    """전화번호 숫자만 남긴 식 (인덱스 식과 같아야 인덱스 사용 가능)"""
+    return func.regexp_replace(func.coalesce(User.phone_number, ""), "[^0-9]", "", "g")
+
+
+def phone_term(term: str) -> str:
+    """검색어가 전화번호 형태이고 숫자가 3자리 이상이면 숫자만, 아니면 빈 문자열"""
+    digits = normalize_digits(term) if _PHONE_LIKE.fullmatch(term) else ""
+    return digits if len(digits) >= NgramIndex.PHONE_N else ""
+
+
+def _like_pattern(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _ngrams(value: str, n: int) -> set:
+    return {value[i:i + n] for i in range(len(value) - n + 1)}
+
+
+class NgramIndex:
+    """
+    프로세스 내 n-gram 역색인
+    - 이름은 2-gram (한글 이름은 대부분 2~4글자), 전화번호 숫자는 3-gram
+    - 검색어의 n-gram 목록을 교집합한 뒤 부분 문자열 일치로 최종 확인
+    """
+
+    NAME_N = 2
+    PHONE_N = 3
+
+    def __init__(self, rows):
+        self.names = {}
+        self.phones = {}
+        self._postings = defaultdict(set)
+        for user_id, name, phone_number in rows:
+            self.names[user_id] = (name or "").lower()
+            self.phones[user_id] = normalize_digits(phone_number)
+            for gram in _ngrams(self.names[user_id], self.NAME_N):
+                self._postings["n", gram].add(user_id)
+            for gram in _ngrams(self.phones[user_id], self.PHONE_N):
+                self._postings["p", gram].add(user_id)
+        self.loaded_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _match(self, field: str, values: dict, term: str, n: int) -> set:
+        grams = _ngrams(term, n)
+        if not grams:
+            # n보다 짧은 검색어는 여기까지 오지 않음 (MemberSearch.apply / phone_term에서 걸러짐)
+            return set()
+
+        postings = sorted((self._postings.get((field, gram), set()) for gram in grams), key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return {user_id for user_id in candidates if term in values[user_id]}
+
+    def lookup(self, term: str) -> set:
+        """이름 또는 전화번호에 검색어가 포함된 회원 ID"""
+        result = self._match("n", self.names, term.lower(), self.NAME_N)
+        digits = phone_term(term)
+        if digits:
+            result |= self._match("p", self.phones, digits, self.PHONE_N)
+        return result
+
+
+class MemberSearch:
+    """
+    회원 검색 필터
+    - apply()가 기존 쿼리에 이름/전화번호 조건을 추가
+    - backend=auto면 trigram 인덱스 존재 여부를 recheck초마다 다시 확인
+    - MEMBER_SEARCH_MIN_LENGTH보다 짧은 검색어는 방식과 관계없이 LIKE 조건
+    """
+
+    def __init__(self, backend: str = MEMBER_SEARCH_BACKEND, ttl: float = NGRAM_INDEX_TTL,
+                 recheck: float = MEMBER_SEARCH_RECHECK):
+        self.configured = backend
+        self.backend = backend
+        self.ttl = ttl
+        self.recheck = recheck
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()   # pg_indexes 확인은 한 번에 하나만
+        self._index = None
+        self._generation = 0
+        self.lookups = 0
+        self.short_terms = 0
+        self.index_builds = 0
+        self.lookup_seconds = 0.0
+
+    def _check_due(self) -> bool:
+        with self._lock:
+            return self._checked_at is None or time.monotonic() - self._checked_at >= self.recheck
+
+    def _resolve_backend(self, db: Session) -> str:
+        if self.configured != "auto" or not self._check_due():
+            return self.backend
+        # 첫 확인이면 결과를 기다리고 (auto 상태로 n-gram 인덱스를 만들지 않도록),
+        # 재확인 중이면 다른 요청은 지금 방식을 그대로 사용
+        if not self._check_lock.acquire(blocking=self.backend == "auto"):
+            return self.backend
+        try:
+            if not self._check_due():
+                # 기다리는 동안 다른 요청이 확인함
+                return self.backend
+            try:
+                found = db.execute(text(
+                    "SELECT count(*) FROM pg_indexes "
+                    "WHERE tablename = 'users' AND indexname IN (:name_index, :phone_index)"
+                ), {"name_index": NAME_TRGM_INDEX, "phone_index": PHONE_TRGM_INDEX}).scalar()
+            except Exception as e:
+                db.rollback()
+                print(f"[MemberSearch] trigram 인덱스 확인 실패, n-gram 사용: {e}")
+                found = 0
+
+            backend = "trigram" if found == 2 else "ngram"
+            with self._lock:
+                if backend != self.backend:
+                    print(f"[MemberSearch] 검색 방식: {self.backend} -> {backend}")
+                    self.backend = backend
+                    if backend == "trigram":
+                        self._index = None
+                self._checked_at = time.monotonic()
+                return self.backend
+        finally:
+            self._check_lock.release()
+
+    def _like_condition(self, term: str):
+        # OR로 묶인 두 식이 모두 trigram 인덱스 대상이어야 BitmapOr로 처리됨
+        condition = User.name.ilike(_like_pattern(term))
+        digits = phone_term(term)
+        if digits:
+            condition = condition | phone_digits_expr().like(_like_pattern(digits))
+        return condition
+
+    def _get_index(self) -> NgramIndex:
+        with self._lock:
+            index = self._index
+            if index is not None and time.monotonic() - index.loaded_at < self.ttl:
+                return index
+            generation = self._generation
+
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                db.query(User.user_id, User.name, User.phone_number)
+                .statement
+                .execution_options(stream_results=True, yield_per=10000)
+            )
+            index = NgramIndex(rows)
+        finally:
+            db.close()
+
+        with self._lock:
+            self.index_builds += 1
+            if generation == self._generation:
+                self._index = index
+        return index
+
+    def apply(self, db: Session, query, term: str):
+        """쿼리에 검색 조건 추가"""
+        term = term.strip()
+        if not term:
+            return query
+        started = time.perf_counter()
+        if len(term) < max(MEMBER_SEARCH_MIN_LENGTH, NgramIndex.NAME_N):
+            # "김" 같은 한 글자 검색: n-gram / trigram으로 좁힐 수 없으므로 기존 방식
+            with self._lock:
+                self.short_terms += 1
+            backend = "like"
+        else:
+            backend = self._resolve_backend(db)
+        try:
+            if backend in ("trigram", "like"):
+                # trigram: 같은 LIKE 조건이지만 GIN 인덱스로 처리됨
+                return query.filter(self._like_condition(term))
+
+            user_ids = self._get_index().lookup(term)
+            if len(user_ids) > NGRAM_MAX_IDS:
+                return query.filter(self._like_condition(term))
+            return query.filter(User.user_id.in_(user_ids))
+        finally:
+            with self._lock:
+                self.lookups += 1
+                self.lookup_seconds += time.perf_counter() - started
+
+    def invalidate(self):
+        """n-gram 인덱스 폐기 (회원 추가/수정/삭제가 커밋된 뒤 자동 호출)"""
+        with self._lock:
+            self._generation += 1
+            self._index = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "configured": self.configured,
+                "lookups": self.lookups,
+                "short_terms": self.short_terms,
+                "avg_lookup_ms": round(self.lookup_seconds / self.lookups * 1000, 3) if self.lookups else 0,
+                "index_builds": self.index_builds,
+                "ngram_index": {
+                    "size": len(self._index),
+                    "age_seconds": round(time.monotonic() - self._index.loaded_at, 1)
+                } if self._index is not None else None
+            }
+
+
+# 전역 회원 검색 인스턴스
+member_search = MemberSearch()
+
+
+# ===== 검색 대상 컬럼 변경 감지 =====
+# 이 프로세스의 모든 세션(AsyncSession 포함)에서 회원 추가/삭제 또는 SEARCH_COLUMNS 변경이
+# flush되면 표시해 두고, 커밋된 뒤 n-gram 인덱스 폐기 (커밋 전에 폐기하면 다시 만든 인덱스가 예전 값을 읽음)
+# 다른 워커 / 컨테이너의 변경은 NGRAM_INDEX_TTL 안에 반영
+
+_DIRTY_KEY = "member_search_dirty"
+
+
+def _search_columns_changed(user: User) -> bool:
+    attrs = inspect(user).attrs
+    return any(attrs[column].history.has_changes() for column in SEARCH_COLUMNS)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_search_changes(session, flush_context):
+    for obj in chain(session.new, session.deleted, session.dirty):
+        if isinstance(obj, User) and (
+            obj in session.new or obj in session.deleted or _search_columns_changed(obj)
+        ):
+            session.info[_DIRTY_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_bulk_update")
+@event.listens_for(Session, "after_bulk_delete")
+def _track_bulk_changes(context):
+    if context.mapper.class_ is User:
+        context.session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    if session.info.pop(_DIRTY_KEY, False):
+        member_search.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(_DIRTY_KEY, None)
@@ -0,0 +1,197 @@
+# user-service/migrations.py
+# 스키마 보조 마이그레이션
+# - create_all은 이미 있는 테이블에 인덱스를 추가하지 않으므로 모델에 선언된 인덱스를 따로 생성
+# - create_all로 만들 수 없는 확장/식 인덱스
+# - 인덱스는 모두 CREATE INDEX CONCURRENTLY (운영 중인 테이블의 쓰기를 막지 않음, AUTOCOMMIT 연결에서 실행)
+# 실행: python migrations.py            (마이그레이션)
+#       python migrations.py --explain  (주요 쿼리 인덱스 사용 여부 확인)
+import sys
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from db import (
+    engine, create_tables, Base, SessionLocal,
+    User, Consultation, Meeting, MeetingReview, UserPhoto, Referral, MatchScore
+)
+from matching import eligible_candidate_filters
+from member_search import NAME_TRGM_INDEX, PHONE_TRGM_INDEX, member_search
+
+# (이름, SQL) - 모두 여러 번 실행해도 안전해야 함
+MIGRATIONS = [
+    ("pg_trgm 확장", "CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+    (
+        "회원 이름 trigram 인덱스",
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {NAME_TRGM_INDEX} "
+        "ON users USING gin (name gin_trgm_ops)"
+    ),
+    (
+        "회원 전화번호(숫자) trigram 인덱스",
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {PHONE_TRGM_INDEX} "
+        "ON users USING gin ((regexp_replace(coalesce(phone_number, ''), '[^0-9]', '', 'g')) gin_trgm_ops)"
+    ),
+]
+
+
+def _autocommit():
+    """CREATE INDEX CONCURRENTLY는 트랜잭션 안에서 실행할 수 없음"""
+    return engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+
+
+def drop_invalid_index(conn, name: str) -> bool:
+    """
+    CONCURRENTLY 생성이 중간에 실패하면 INVALID 인덱스가 남음
+    - IF NOT EXISTS가 그 인덱스를 건너뛰지 않도록 먼저 삭제
+    """
+    invalid = conn.execute(text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first()
+    if invalid:
+        conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+        print(f"[Migration] INVALID 인덱스 {name} 삭제 후 다시 생성")
+    return invalid is not None
+
+
+def index_ddl(index) -> CreateIndex:
+    """CREATE INDEX CONCURRENTLY IF NOT EXISTS 문"""
+    # Column(index=True)로 만든 인덱스는 모델에서 옵션을 줄 수 없어 여기서 지정
+    index.dialect_options["postgresql"]["concurrently"] = True
+    return CreateIndex(index, if_not_exists=True)
+
+
+def create_declared_indexes() -> dict:
+    """모델(__table_args__)에 선언된 인덱스 중 DB에 없는 것만 생성 (CREATE INDEX CONCURRENTLY IF NOT EXISTS)"""
+    results = {}
+    with _autocommit() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                try:
+                    drop_invalid_index(conn, index.name)
+                    conn.execute(index_ddl(index))
+                    results[index.name] = "ok"
+                except Exception as e:
+                    results[index.name] = f"실패: {e}"
+                print(f"[Migration] 인덱스 {index.name}: {results[index.name]}")
+    return results
+
+
+def run_migrations():
+    """
+    테이블 생성 → 선언된 인덱스 생성 → MIGRATIONS 순서대로 실행
+    - 항목마다 AUTOCOMMIT으로 실행 (확장 권한이 없어도 나머지는 계속 진행)
+    """
+    create_tables()
+
+    results = create_declared_indexes()
+    with _autocommit() as conn:
+        for index_name in (NAME_TRGM_INDEX, PHONE_TRGM_INDEX):
+            drop_invalid_index(conn, index_name)
+        for name, sql in MIGRATIONS:
+            try:
+                conn.execute(text(sql))
+                results[name] = "ok"
+            except Exception as e:
+                results[name] = f"실패: {e}"
+            print(f"[Migration] {name}: {results[name]}")
+    return results
+
+
+# ===== 인덱스 사용 확인 (EXPLAIN) =====
+
+def hot_queries(db) -> dict:
+    """인덱스를 타야 하는 주요 API 쿼리 (이름 -> (쿼리, 대상 테이블))"""
+    keyset_order = lambda model, id_col: (model.created_at.desc().nullslast(), id_col.desc())
+    return {
+        "매칭 후보자 풀": (
+            db.query(User).filter(User.gender == "여", *eligible_candidate_filters()),
+            "users"
+        ),
+        "회원 이름/전화번호 검색": (
+            # 이름 trigram + 전화번호 숫자 trigram 인덱스 (BitmapOr)
+            db.query(User).filter(member_search._like_condition("010-1234")),
+            "users"
+        ),
+        "회원 검색 페이지": (
+            db.query(User).filter(User.deleted_at == None).order_by(*keyset_order(User, User.user_id)).limit(51),
+            "users"
+        ),
+        "내 상담 목록": (
+            db.query(Consultation).filter(Consultation.user_id == 1).order_by(Consultation.created_at.desc()),
+            "consultations"
+        ),
+        "상담 상태별 목록": (
+            db.query(Consultation).filter(Consultation.status == "요청됨")
+            .order_by(*keyset_order(Consultation, Consultation.id)).limit(51),
+            "consultations"
+        ),
+        "상담 목록 페이지": (
+            db.query(Consultation).order_by(*keyset_order(Consultation, Consultation.id)).limit(51),
+            "consultations"
+        ),
+        "내 만남 목록": (
+            db.query(Meeting).filter((Meeting.user_id == 1) | (Meeting.partner_id == 1)),
+            "meetings"
+        ),
+        "만남별 후기": (
+            db.query(MeetingReview).filter(MeetingReview.meeting_id == 1),
+            "meeting_reviews"
+        ),
+        "내 사진 목록": (
+            db.query(UserPhoto).filter(UserPhoto.user_id == 1).order_by(UserPhoto.order_index),
+            "user_photos"
+        ),
+        "승인 대기 사진": (
+            db.query(UserPhoto).filter(UserPhoto.is_approved == False)
+            .order_by(*keyset_order(UserPhoto, UserPhoto.id)).limit(51),
+            "user_photos"
+        ),
+        "내가 추천한 사람": (
+            db.query(Referral).filter(Referral.referrer_id == 1),
+            "referrals"
+        ),
+        "추천 점수 상위 N": (
+            db.query(MatchScore).filter(MatchScore.user_id == 1).order_by(MatchScore.score.desc()).limit(20),
+            "match_scores"
+        ),
+    }
+
+
+def _seq_scanned(plan: dict, table: str) -> bool:
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") == table:
+        return True
+    return any(_seq_scanned(child, table) for child in plan.get("Plans", []))
+
+
+def check_index_usage() -> dict:
+    """
+    주요 쿼리의 실행 계획 확인
+    - enable_seqscan = off 상태에서도 Seq Scan이 나오면 쓸 수 있는 인덱스가 없다는 뜻
+    - 테이블이 비어 있어도 결과가 같으므로 배포 전 점검에 사용
+
+    Returns:
+        {쿼리 이름: True(인덱스 사용) / False}
+    """
+    db = SessionLocal()
+    results = {}
+    try:
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+        for name, (query, table) in hot_queries(db).items():
+            # named paramstyle: LIKE의 %를 여기서 두 번 쓰지 않음 (text() 실행 시 드라이버에 맞게 처리)
+            sql = str(query.statement.compile(
+                dialect=postgresql.dialect(paramstyle="named"), compile_kwargs={"literal_binds": True}
+            ))
+            plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()[0]["Plan"]
+            results[name] = not _seq_scanned(plan, table)
+            print(f"[Explain] {name}: {'index' if results[name] else 'SEQ SCAN'}")
+    finally:
+        db.rollback()
+        db.close()
+    return results
+
+
+if __name__ == "__main__":
+    if "--explain" in sys.argv:
+        sys.exit(0 if all(check_index_usage().values()) else 1)
+    run_migrations()
@@ -0,0 +1,79 @@
+# user-service/pagination.py
+# 관리자 목록 키셋(커서) 페이징
+import base64
+import json
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+
+def encode_cursor(created_at, row_id) -> str:
+    """(created_at, id)를 불투명한 커서 문자열로 변환"""
+    payload = [created_at.isoformat() if created_at else None, row_id]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """커서 문자열 -> (created_at, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(created_at) if created_at else None), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="유효하지 않은 커서입니다")
+
+
+def keyset_page(query, created_col, id_col, cursor: str, limit: int):
+    """
+    키셋 페이징
+    - created_at DESC (NULL은 마지막), id DESC 순서
+    - OFFSET 없이 마지막 행의 키 다음부터 조회하므로 페이지 깊이와 무관하게 일정한 비용
+    - limit + 1건을 읽어 다음 페이지 존재 여부 판단
+    - (created_at, id) < 커서 조건과 created_at IS NULL 구간을 나눠 조회
+      (OR로 묶으면 키셋 인덱스의 범위 조건으로 쓰이지 못함)
+
+    Returns:
+        (rows, next_cursor) - 마지막 페이지면 next_cursor는 None
+    """
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit은 1 이상이어야 합니다")
+
+    null_rows = query.filter(created_col == None).order_by(id_col.desc())
+
+    if not cursor:
+        rows = query.order_by(
+            created_col.desc().nullslast(), id_col.desc()
+        ).limit(limit + 1).all()
+    else:
+        created_at, row_id = decode_cursor(cursor)
+        if created_at is None:
+            rows = null_rows.filter(id_col < row_id).limit(limit + 1).all()
+        else:
+            rows = query.filter(
+                tuple_(created_col, id_col) < tuple_(created_at, row_id)
+            ).order_by(
+                created_col.desc().nullslast(), id_col.desc()
+            ).limit(limit + 1).all()
+            if len(rows) <= limit:
+                rows += null_rows.limit(limit + 1 - len(rows)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
+
+    return rows, next_cursor
+
+
+def cursor_page(query, created_col, id_col, cursor: str, limit: int, with_total: bool = False):
+    """
+    커서 모드 목록 응답용 페이지 정보
+    - 전체 건수(COUNT)는 with_total=True일 때만 계산
+
+    Returns:
+        (rows, {"total", "limit", "next_cursor"})
+    """
+    total = query.count() if with_total else None
+    rows, next_cursor = keyset_page(query, created_col, id_col, cursor, limit)
+    return rows, {"total": total, "limit": limit, "next_cursor": next_cursor}
@@ -0,0 +1,281 @@
+# user-service/stats.py
+# 관리자 통계 집계 (테이블당 한 번의 스캔)
+import os
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from db import User, Consultation, Meeting, MeetingReview, UserPhoto, SuccessStory, Referral
+
+USER_STATUSES = ["매칭전", "매칭중", "성혼", "만료"]
+GENDERS = ["남", "여"]
+MEMBERSHIP_TYPES = ["일반회원", "정회원", "결제회원"]
+CONSULTATION_STATUSES = ["요청됨", "확인됨", "완료됨", "취소됨"]
+CONSULTATION_TYPES = ["초기상담", "매칭상담", "사후상담"]
+MEETING_INTENTS = ["원함", "미정", "원하지않음"]
+
+
+def count_where(db: Session, model, conditions: dict) -> dict:
+    """
+    조건별 건수를 한 번의 쿼리로 계산
+    - COUNT(*) FILTER (WHERE ...) 컬럼을 조건 수만큼 생성
+    - 조건이 None이면 전체 건수
+    """
+    columns = [
+        (func.count().filter(condition) if condition is not None else func.count()).label(f"c{i}")
+        for i, condition in enumerate(conditions.values())
+    ]
+    row = db.query(*columns).select_from(model).one()
+    return dict(zip(conditions.keys(), row))
+
+
+def first_of_month(now: datetime = None) -> datetime:
+    now = now or datetime.now()
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def user_conditions() -> dict:
+    """users 테이블 집계 조건 (탈퇴 회원 제외 기준은 항목별로 다름)"""
+    alive = User.deleted_at == None
+    conditions = {
+        "total": alive,
+        "active": alive & (User.is_banned == False),
+        "paid": alive & (User.payment_date != None),
+        "matched": alive & (User.matched_partner != None),
+        "banned": User.is_banned == True,
+        "matched_all": User.matched_partner != None,
+        "success_all": User.status == "성혼",
+        "new_this_month": User.created_at >= first_of_month(),
+    }
+    for status in USER_STATUSES:
+        conditions[f"status:{status}"] = alive & (User.status == status)
+    for gender in GENDERS:
+        conditions[f"gender:{gender}"] = alive & (User.gender == gender)
+    for membership in MEMBERSHIP_TYPES:
+        conditions[f"membership:{membership}"] = alive & (User.membership_type == membership)
+    return conditions
+
+
+def user_counts(db: Session) -> dict:
+    """회원 집계 (1회 조회)"""
+    return count_where(db, User, user_conditions())
+
+
+def consultation_counts(db: Session) -> dict:
+    """상담 집계 (1회 조회)"""
+    conditions = {"total": None}
+    for status in CONSULTATION_STATUSES:
+        conditions[f"status:{status}"] = Consultation.status == status
+    for ctype in CONSULTATION_TYPES:
+        conditions[f"type:{ctype}"] = Consultation.consultation_type == ctype
+    return count_where(db, Consultation, conditions)
+
+
+def meeting_counts(db: Session) -> dict:
+    """만남 집계 (1회 조회)"""
+    return count_where(db, Meeting, {
+        "total": None,
+        "completed": Meeting.status == "완료됨",
+        "cancelled": Meeting.status == "취소됨",
+    })
+
+
+def review_counts(db: Session) -> dict:
+    """만남 후기 집계 (1회 조회)"""
+    conditions = {"total": None}
+    for intent in MEETING_INTENTS:
+        conditions[f"intent:{intent}"] = MeetingReview.next_meeting_intent == intent
+    return count_where(db, MeetingReview, conditions)
+
+
+def misc_counts(db: Session) -> dict:
+    """대기 항목 및 테이블별 전체 건수 (스칼라 서브쿼리로 1회 조회)"""
+    def scalar_count(model, *conditions):
+        return select(func.count()).select_from(model).where(*conditions).scalar_subquery()
+
+    columns = {
+        "pending_photos": scalar_count(UserPhoto, UserPhoto.is_approved == False),
+        "pending_consultations": scalar_count(Consultation, Consultation.status == "요청됨"),
+        "pending_stories": scalar_count(SuccessStory, SuccessStory.status == "pending"),
+        "total_consultations": scalar_count(Consultation),
+        "total_meetings": scalar_count(Meeting),
+        "total_referrals": scalar_count(Referral),
+    }
+    row = db.query(*(column.label(key) for key, column in columns.items())).one()
+    return dict(zip(columns.keys(), row))
+
+
+def pick(counts: dict, prefix: str, values: list) -> dict:
+    """'prefix:value' 키를 {value: count} 형태로 변환"""
+    return {value: counts[f"{prefix}:{value}"] for value in values}
+
+
+# ===== 집계 스냅샷 캐시 =====
+
+# 스냅샷 유지 시간 (초)
+STATS_SNAPSHOT_TTL = float(os.getenv("STATS_SNAPSHOT_TTL", "30"))
+# 쓰기 API에서 증감분을 스냅샷에 바로 반영할지 여부 (끄면 해당 그룹을 무효화)
+STATS_WRITE_THROUGH = os.getenv("STATS_WRITE_THROUGH", "1") == "1"
+
+# 그룹 이름 -> 집계 함수
+STATS_LOADERS = {
+    "users": user_counts,
+    "consultations": consultation_counts,
+    "meetings": meeting_counts,
+    "reviews": review_counts,
+    "misc": misc_counts,
+}
+
+
+def counter_keys(obj) -> frozenset:
+    """
+    행 하나가 기여하는 (그룹, 키) 집합
+    - 위 집계 조건과 같은 규칙을 파이썬으로 평가 (NULL은 어떤 조건에도 포함되지 않음)
+    - 변경 전/후 집합의 차이가 스냅샷 증감분이 됨
+    """
+    keys = set()
+
+    if obj is None:
+        pass
+
+    elif isinstance(obj, User):
+        alive = obj.deleted_at is None
+        not_banned = obj.is_banned is not None and not obj.is_banned
+        flags = {
+            "total": alive,
+            "active": alive and not_banned,
+            "paid": alive and obj.payment_date is not None,
+            "matched": alive and obj.matched_partner is not None,
+            "banned": bool(obj.is_banned),
+            "matched_all": obj.matched_partner is not None,
+            "success_all": obj.status == "성혼",
+            "new_this_month": obj.created_at is not None and obj.created_at >= first_of_month(),
+            f"status:{obj.status}": alive,
+            f"gender:{obj.gender}": alive,
+            f"membership:{obj.membership_type}": alive,
+        }
+        keys.update(("users", key) for key, on in flags.items() if on)
+
+    elif isinstance(obj, Consultation):
+        keys.update({
+            ("consultations", "total"),
+            ("consultations", f"status:{obj.status}"),
+            ("consultations", f"type:{obj.consultation_type}"),
+            ("misc", "total_consultations"),
+        })
+        if obj.status == "요청됨":
+            keys.add(("misc", "pending_consultations"))
+
+    elif isinstance(obj, Meeting):
+        keys.update({("meetings", "total"), ("misc", "total_meetings")})
+        if obj.status == "완료됨":
+            keys.add(("meetings", "completed"))
+        elif obj.status == "취소됨":
+            keys.add(("meetings", "cancelled"))
+
+    elif isinstance(obj, MeetingReview):
+        keys.update({("reviews", "total"), ("reviews", f"intent:{obj.next_meeting_intent}")})
+
+    elif isinstance(obj, UserPhoto):
+        if obj.is_approved is not None and not obj.is_approved:
+            keys.add(("misc", "pending_photos"))
+
+    elif isinstance(obj, SuccessStory):
+        if obj.status == "pending":
+            keys.add(("misc", "pending_stories"))
+
+    elif isinstance(obj, Referral):
+        keys.add(("misc", "total_referrals"))
+
+    return frozenset(keys)
+
+
+class StatsSnapshot:
+    """
+    관리자 통계 스냅샷
+    - 그룹별 집계 결과를 TTL 동안 메모리에 보관
+    - 쓰기 API는 apply_change()로 증감분을 즉시 반영
+    - 그룹별 세대 번호: 집계 중에 증감분이 들어오면 (반영 여부를 알 수 없으므로) 결과를 저장하지 않음
+    """
+
+    def __init__(self, ttl: float = STATS_SNAPSHOT_TTL, write_through: bool = STATS_WRITE_THROUGH):
+        self.ttl = ttl
+        self.write_through = write_through
+        self._lock = threading.Lock()
+        self._groups = {}
+        self._generations = dict.fromkeys(STATS_LOADERS, 0)
+        self.hits = 0
+        self.misses = 0
+        self.deltas_applied = 0
+        self.discarded_loads = 0
+
+    def get(self, db: Session, group: str, fresh: bool = False) -> dict:
+        """그룹 집계 조회 (fresh=True면 DB에서 다시 계산)"""
+        with self._lock:
+            entry = self._groups.get(group)
+            if not fresh and entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self.hits += 1
+                return dict(entry[1])
+            self.misses += 1
+            generation = self._generations[group]
+
+        counts = STATS_LOADERS[group](db)
+
+        with self._lock:
+            if self._generations[group] == generation:
+                self._groups[group] = (time.monotonic(), dict(counts))
+            else:
+                # 집계 도중 apply_change / invalidate가 실행됨 (다음 조회에서 다시 집계)
+                self.discarded_loads += 1
+        return counts
+
+    def apply_change(self, before: frozenset, after: frozenset):
+        """변경 전/후 counter_keys 차이를 스냅샷에 반영"""
+        changed = before ^ after
+        if not changed:
+            return
+
+        with self._lock:
+            for group in {group for group, _ in changed}:
+                self._generations[group] += 1
+
+            if not self.write_through:
+                for group, _ in changed:
+                    self._groups.pop(group, None)
+                return
+
+            for group, key in changed:
+                entry = self._groups.get(group)
+                if entry is None or key not in entry[1]:
+                    continue
+                entry[1][key] += 1 if (group, key) in after else -1
+                self.deltas_applied += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._groups.clear()
+            for group in self._generations:
+                self._generations[group] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0,
+                "deltas_applied": self.deltas_applied,
+                "discarded_loads": self.discarded_loads,
+                "write_through": self.write_through,
+                "ttl_seconds": self.ttl,
+                "groups": {
+                    group: round(time.monotonic() - loaded_at, 1)
+                    for group, (loaded_at, _) in self._groups.items()
+                }
+            }
+
+
+# 전역 통계 스냅샷 인스턴스
+stats_snapshot = StatsSnapshot()
@@ -0,0 +1,188 @@
+# user-service/tests/test_async_endpoints.py
+# AsyncSession 엔드포인트: 응답 형식 + DB 대기 중 스레드풀을 점유하지 않음 (SQLite 메모리 DB)
+# 동기 세션 / AsyncSession 추천 조회 부하 비교 (USER_SERVICE_BENCH=1 + PostgreSQL)
+import asyncio
+import os
+import time
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateTable
+
+import main
+from db import SessionLocal, User, UserPhoto, UserProfile
+from jwt_utils import create_jwt
+from match_scores import read_top_scores, read_top_scores_async
+
+
+class SlowAsyncSession:
+    """AsyncSession 대체: await마다 network_delay만큼 대기 후 동기 세션으로 실행, 동시 대기 수 기록"""
+
+    def __init__(self, sync_session, network_delay: float, probe: dict):
+        self._sync = sync_session
+        self._delay = network_delay
+        self._probe = probe
+
+    async def _wait(self):
+        self._probe["waiting"] += 1
+        self._probe["peak"] = max(self._probe["peak"], self._probe["waiting"])
+        try:
+            await asyncio.sleep(self._delay)
+        finally:
+            self._probe["waiting"] -= 1
+
+    async def scalar(self, stmt):
+        await self._wait()
+        return self._sync.scalar(stmt)
+
+    async def scalars(self, stmt):
+        await self._wait()
+        return self._sync.scalars(stmt)
+
+    async def execute(self, stmt):
+        await self._wait()
+        return self._sync.execute(stmt)
+
+
+@pytest.fixture
+def app_client():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as conn:
+        for model in (User, UserProfile, UserPhoto):
+            conn.execute(CreateTable(model.__table__))
+    session = sessionmaker(bind=engine)()
+    session.add(User(user_id=7, name="김철수", email="a@b.c", age=30, gender="남",
+                     matching_count=2, status="활동", consultation_count=1, created_at=datetime(2026, 1, 1)))
+    session.add(UserProfile(user_id=7, job="개발자", location="서울"))
+    session.commit()
+
+    probe = {"waiting": 0, "peak": 0}
+    delay = {"seconds": 0.0}
+
+    async def override():
+        yield SlowAsyncSession(session, delay["seconds"], probe)
+
+    main.app.dependency_overrides[main.get_async_db] = override
+    transport = httpx.ASGITransport(app=main.app)
+
+    def request(method, url, **kwargs):
+        async def go():
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.request(method, url, **kwargs)
+        return asyncio.run(go())
+
+    def concurrent(count, url, network_delay):
+        delay["seconds"] = network_delay
+
+        async def go():
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await asyncio.gather(*(client.get(url) for _ in range(count)))
+        return asyncio.run(go())
+
+    yield request, concurrent, probe
+    main.app.dependency_overrides.clear()
+    session.close()
+
+
+def test_get_user(app_client):
+    request, _, _ = app_client
+    body = request("GET", "/users/7").json()
+    assert body["user_id"] == 7
+    assert body["name"] == "김철수"
+    assert body["matching_count"] == 2
+    assert request("GET", "/users/8").status_code == 404
+
+
+def test_login_or_register_reports_membership(app_client):
+    request, _, _ = app_client
+    member = request("POST", "/users/login-or-register", json={"kakao_id": "7", "nickname": "철수"}).json()
+    guest = request("POST", "/users/login-or-register", json={"kakao_id": "8", "nickname": "영희"}).json()
+    assert member["member_status"] == "회원"
+    assert guest["member_status"] == "비회원"
+
+
+def test_profile_uses_token_user(app_client):
+    request, _, _ = app_client
+    token = create_jwt({"kakao_id": "7"})
+    body = request("GET", "/profile/my", headers={"Authorization": f"Bearer {token}"}).json()
+    assert body["user_id"] == 7
+    assert body["profile"]["job"] == "개발자"
+    assert body["photos"] == []
+
+
+def test_db_waits_overlap_beyond_threadpool_size(app_client):
+    # 스레드풀(기본 40) 엔드포인트라면 동시 DB 대기는 40을 넘지 못함
+    _, concurrent, probe = app_client
+    responses = concurrent(100, "/users/7", network_delay=0.05)
+    assert all(r.status_code == 200 for r in responses)
+    assert probe["peak"] == 100
+
+
+BENCH_CLIENTS = 200
+BENCH_REQUESTS_PER_CLIENT = 5
+
+
+def _bench_app() -> FastAPI:
+    """추천 조회만 비교: 동기 세션(def, 스레드풀) / AsyncSession(async def)"""
+    app = FastAPI()
+
+    @app.get("/sync/{user_id}")
+    def sync_recommendations(user_id: int, db=Depends(main.get_db)):
+        return len(read_top_scores(db, user_id, 10) or [])
+
+    @app.get("/async/{user_id}")
+    async def async_recommendations(user_id: int, db=Depends(main.get_async_db)):
+        return len(await read_top_scores_async(db, user_id, 10) or [])
+
+    return app
+
+
+def _load(app: FastAPI, path: str) -> dict:
+    """BENCH_CLIENTS개 클라이언트가 각자 BENCH_REQUESTS_PER_CLIENT번 순서대로 요청"""
+    latencies = []
+
+    async def client_loop(client):
+        for _ in range(BENCH_REQUESTS_PER_CLIENT):
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200
+
+    async def go():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await client.get(path)   # 커넥션 풀 준비
+            started = time.perf_counter()
+            await asyncio.gather(*(client_loop(client) for _ in range(BENCH_CLIENTS)))
+            return time.perf_counter() - started
+
+    elapsed = asyncio.run(go())
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+    }
+
+
+@pytest.mark.skipif(not (os.getenv("USER_SERVICE_BENCH") and os.getenv("DB_HOST")),
+                    reason="USER_SERVICE_BENCH=1 + PostgreSQL(DB_HOST)일 때만 실행")
+def test_recommendations_load_sync_vs_async():
+    db = SessionLocal()
+    try:
+        user_id = db.scalar(text("SELECT user_id FROM match_score_status LIMIT 1"))
+    finally:
+        db.close()
+    if user_id is None:
+        pytest.skip("match_score_status가 비어 있음 (전체 재계산 후 실행)")
+
+    app = _bench_app()
+    results = {mode: _load(app, f"/{mode}/{user_id}") for mode in ("sync", "async")}
+    for mode, r in results.items():
+        print(f"[Bench] {mode} 추천 조회 ({BENCH_CLIENTS}명 동시): "
+              f"{r['rps']:.0f} req/s, p50 {r['p50_ms']:.1f}ms, p95 {r['p95_ms']:.1f}ms")
+    assert results["async"]["rps"] >= results["sync"]["rps"]
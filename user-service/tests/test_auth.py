@@ -0,0 +1,71 @@
+# user-service/tests/test_auth.py
+# JWT 미들웨어 + current_user_id 의존성 (토큰 사용자와 다른 user_id 거부)
+import pytest
+from fastapi import Depends, FastAPI, WebSocket
+from fastapi.testclient import TestClient
+
+from jwt_utils import JWTAuthMiddleware, TokenVerifier, authorize_user, create_jwt, current_user_id
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(JWTAuthMiddleware, verifier=TokenVerifier())
+
+    @app.put("/profile/my")
+    def update(user_id: int = Depends(current_user_id)):
+        return {"user_id": user_id}
+
+    @app.websocket("/ws")
+    async def ws(websocket: WebSocket, user_id: int = None):
+        await websocket.accept()
+        try:
+            user_id = authorize_user(websocket, user_id)
+        except Exception as e:
+            await websocket.send_json({"error": e.status_code})
+        else:
+            await websocket.send_json({"user_id": user_id})
+        await websocket.close()
+
+    return TestClient(app)
+
+
+def bearer(**claims):
+    return {"Authorization": f"Bearer {create_jwt(claims)}"}
+
+
+def test_token_user_is_used_when_user_id_omitted(client):
+    r = client.put("/profile/my", headers=bearer(kakao_id=7))
+    assert r.status_code == 200
+    assert r.json() == {"user_id": 7}
+
+
+def test_matching_user_id_is_accepted(client):
+    r = client.put("/profile/my", params={"user_id": 7}, headers=bearer(kakao_id=7))
+    assert r.json() == {"user_id": 7}
+
+
+def test_mismatched_user_id_is_rejected(client):
+    r = client.put("/profile/my", params={"user_id": 8}, headers=bearer(kakao_id=7))
+    assert r.status_code == 403
+
+
+def test_missing_or_invalid_token_is_rejected(client):
+    assert client.put("/profile/my", params={"user_id": 7}).status_code == 401
+    r = client.put("/profile/my", params={"user_id": 7}, headers={"Authorization": "Bearer nope"})
+    assert r.status_code == 401
+
+
+def test_admin_token_may_target_other_users(client):
+    r = client.put("/profile/my", params={"user_id": 8}, headers=bearer(kakao_id=1, is_admin=True))
+    assert r.json() == {"user_id": 8}
+
+
+def test_websocket_token_query_param(client):
+    token = create_jwt({"kakao_id": 7})
+    with client.websocket_connect(f"/ws?token={token}&user_id=7") as ws:
+        assert ws.receive_json() == {"user_id": 7}
+    with client.websocket_connect(f"/ws?token={token}&user_id=8") as ws:
+        assert ws.receive_json() == {"error": 403}
+    with client.websocket_connect("/ws?user_id=7") as ws:
+        assert ws.receive_json() == {"error": 401}
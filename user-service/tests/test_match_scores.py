@@ -0,0 +1,93 @@
+# user-service/tests/test_match_scores.py
+# 개별 재계산 후 저장된 추천 조회 (SQLite 메모리 DB, advisory lock / PostgreSQL upsert는 대체)
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateTable
+
+import match_scores
+from db import MatchScore, MatchScoreStatus, User, UserProfile
+from match_scores import read_top_scores, recalculate_for_users
+
+
+def _mark_calculated(db, user_id, candidate_count, calculated_at, unless_after=None):
+    stmt = sqlite_insert(MatchScoreStatus).values(
+        user_id=user_id, candidate_count=candidate_count, calculated_at=calculated_at
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[MatchScoreStatus.user_id],
+        set_={"candidate_count": candidate_count, "calculated_at": calculated_at},
+    ))
+    return True
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as conn:
+        for model in (User, UserProfile, MatchScore, MatchScoreStatus):
+            conn.execute(CreateTable(model.__table__))
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(match_scores, "SessionLocal", factory)
+    monkeypatch.setattr(match_scores, "_lock_writes", lambda db: None)
+    monkeypatch.setattr(match_scores, "_mark_calculated", _mark_calculated)
+
+    db = factory()
+    db.add_all([
+        User(user_id=1, name="남1", gender="남", status="매칭전", is_banned=False),
+        User(user_id=2, name="여1", gender="여", status="매칭전", is_banned=False),
+        User(user_id=3, name="여2", gender="여", status="매칭전", is_banned=False),
+    ])
+    db.commit()
+    db.close()
+    return factory
+
+
+def _add_user(factory, user_id, gender):
+    db = factory()
+    db.add(User(user_id=user_id, name=f"신규{user_id}", gender=gender, status="매칭전", is_banned=False))
+    db.commit()
+    db.close()
+    recalculate_for_users(user_id)
+
+
+def test_uncalculated_owner_is_not_served_partial_list(session_factory):
+    # 회원 1은 아직 계산 전 → 신규 회원 추가 후에도 None (전체 계산으로 대체)
+    _add_user(session_factory, 4, "여")
+    db = session_factory()
+    assert read_top_scores(db, 1, 10) is None
+    assert db.query(MatchScore).filter(MatchScore.user_id == 1).count() == 0
+    # 신규 회원 본인의 추천은 계산됨
+    assert [r["user"].user_id for r in read_top_scores(db, 4, 10)] == [1]
+
+
+def test_calculated_owner_gets_new_candidate_added(session_factory):
+    recalculate_for_users(1)
+    db = session_factory()
+    assert sorted(r["user"].user_id for r in read_top_scores(db, 1, 10)) == [2, 3]
+    db.close()
+
+    _add_user(session_factory, 4, "여")
+    db = session_factory()
+    assert sorted(r["user"].user_id for r in read_top_scores(db, 1, 10)) == [2, 3, 4]
+
+
+def test_stray_rows_without_status_are_ignored(session_factory):
+    db = session_factory()
+    db.add(MatchScore(user_id=1, candidate_id=2, score=50.0, score_breakdown="{}", calculated_at=datetime.now()))
+    db.commit()
+    assert read_top_scores(db, 1, 10) is None
+
+
+def test_owner_with_no_candidates_reads_empty_list(session_factory):
+    db = session_factory()
+    db.query(User).filter(User.gender == "여").update({"status": "매칭완료"})
+    db.commit()
+    db.close()
+    recalculate_for_users(1)
+    db = session_factory()
+    assert read_top_scores(db, 1, 10) == []
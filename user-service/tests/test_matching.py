@@ -0,0 +1,112 @@
+# user-service/tests/test_matching.py
+# CandidatePool(벡터화)과 calculate_match_score(스칼라) 결과 일치 확인
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import matching
+from matching import CandidatePool, calculate_match_score, rank_candidates
+
+# 동점이 자주 나오도록 값 범위를 좁게 잡음
+AGES = [None, "", "25", "29", "31", "35", "40", "abc", 33, 0]
+HEIGHTS = [None, 0, 155, 162, 170, 178, 185]
+LOCATIONS = [None, "", "서울", "서울 강남구", "경기 성남시", "부산", "서울 마포구"]
+RELIGIONS = [None, "", "무교", "기독교", "불교", "상관없음"]
+SMOKING = [None, "", "비흡연", "흡연", "상관없음"]
+TEXTS = [None, "", "있음"]
+
+
+def _profile(rng, **fields):
+    profile = dict(
+        height=rng.choice(HEIGHTS),
+        location=rng.choice(LOCATIONS),
+        religion=rng.choice(RELIGIONS),
+        smoking=rng.choice(SMOKING),
+        job=rng.choice(TEXTS),
+        education=rng.choice(TEXTS),
+        introduction=rng.choice(TEXTS),
+    )
+    profile.update(fields)
+    return SimpleNamespace(**profile)
+
+
+def _ideal(rng):
+    age_min = rng.choice([None, 0, 25, 28, 30])
+    height_min = rng.choice([None, 0, 150, 165])
+    return _profile(
+        rng,
+        ideal_age_min=age_min,
+        ideal_age_max=None if age_min is None else age_min + rng.choice([0, 5, 10]),
+        ideal_height_min=height_min,
+        ideal_height_max=None if height_min is None else height_min + rng.choice([0, 10, 30]),
+        ideal_location=rng.choice(LOCATIONS + ["강남", "서울 "]),
+        ideal_religion=rng.choice(RELIGIONS + ["천주교"]),
+        ideal_smoking=rng.choice(SMOKING),
+    )
+
+
+def _pool(rng, n):
+    candidates = []
+    for user_id in range(1, n + 1):
+        user = SimpleNamespace(user_id=user_id, age=rng.choice(AGES))
+        profile = None if rng.random() < 0.15 else _profile(rng)
+        candidates.append((user, profile))
+    return candidates
+
+
+def _scalar(user_profile, candidates):
+    results = []
+    for user, profile in candidates:
+        score, breakdown = calculate_match_score(user_profile, profile, user)
+        results.append({"user": user, "profile": profile, "score": score, "breakdown": breakdown})
+    return results
+
+
+def _key(results):
+    return [(r["user"].user_id, r["score"], r["breakdown"]) for r in results]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_results_match_scalar_scores(seed):
+    rng = random.Random(seed)
+    candidates = _pool(rng, rng.randint(1, 80))
+    user_profile = _ideal(rng)
+
+    assert _key(CandidatePool(candidates).results(user_profile)) == _key(_scalar(user_profile, candidates))
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_top_k_matches_sorted_scalar_scores_including_ties(seed):
+    rng = random.Random(1000 + seed)
+    candidates = _pool(rng, rng.randint(1, 80))
+    user_profile = _ideal(rng)
+    pool = CandidatePool(candidates)
+    # sorted는 안정 정렬 -> 동점자는 풀 순서
+    expected = sorted(_scalar(user_profile, candidates), key=lambda x: x["score"], reverse=True)
+
+    for k in (0, 1, 5, len(candidates) // 2, len(candidates), len(candidates) + 3):
+        assert _key(pool.top_k(user_profile, k)) == _key(expected[:k])
+
+
+def test_top_k_without_user_profile_keeps_pool_order():
+    rng = random.Random(7)
+    candidates = _pool(rng, 20)
+
+    top = CandidatePool(candidates).top_k(None, 5)
+
+    assert [r["user"].user_id for r in top] == [1, 2, 3, 4, 5]
+    assert all(r["score"] == 50 and r["breakdown"] == {"base": 50} for r in top)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_heap_fallback_matches_vectorized_ranking(seed, monkeypatch):
+    rng = random.Random(2000 + seed)
+    candidates = _pool(rng, 60)
+    user_profile = _ideal(rng)
+    vectorized = rank_candidates(user_profile, matching.make_pool(candidates), 10)
+
+    monkeypatch.setattr(matching, "np", None)
+    fallback = rank_candidates(user_profile, matching.make_pool(candidates), 10)
+
+    assert _key(fallback) == _key(vectorized)
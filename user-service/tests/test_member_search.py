@@ -0,0 +1,206 @@
+# user-service/tests/test_member_search.py
+# n-gram 인덱스 검색 결과, 검색 방식 재확인, 커밋 시 인덱스 폐기
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+import member_search as search_module
+from db import User
+from member_search import MemberSearch, NgramIndex, normalize_digits, phone_term
+
+SYLLABLES = "김이박최정강조윤장임민서준지우현수영"
+
+
+def _rows(rng, n):
+    rows = []
+    for user_id in range(1, n + 1):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        phone = f"010-{rng.randint(0, 9999):04d}-{rng.randint(0, 9999):04d}" if rng.random() < 0.9 else None
+        rows.append((user_id, name, phone))
+    return rows
+
+
+def _brute_force(rows, term):
+    digits = phone_term(term)
+    return {
+        user_id for user_id, name, phone in rows
+        if term.lower() in name.lower() or (digits and digits in normalize_digits(phone))
+    }
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_ngram_lookup_matches_substring_scan(seed):
+    rng = random.Random(seed)
+    rows = _rows(rng, 300)
+    index = NgramIndex(rows)
+
+    terms = ["김이", "민서준", "010", "1234", "0101", "5-67", "없는이름"]
+    terms += [name[:2] for _, name, _ in rng.sample(rows, 10)]
+    terms += [normalize_digits(phone)[3:8] for _, _, phone in rng.sample(rows, 10) if phone]
+    for term in terms:
+        assert index.lookup(term) == _brute_force(rows, term), term
+
+
+def test_short_phone_terms_are_not_phone_searches():
+    assert phone_term("01") == ""
+    assert phone_term("010") == "010"
+    assert phone_term("홍길동") == ""
+
+
+class FakeDB:
+    """pg_indexes 조회 결과(찾은 인덱스 수)를 차례로 돌려주는 세션 대역"""
+
+    def __init__(self, *found):
+        self.found = list(found)
+        self.queries = 0
+
+    def execute(self, *args, **kwargs):
+        self.queries += 1
+        value = self.found.pop(0)
+        return type("Result", (), {"scalar": lambda _self: value})()
+
+    def rollback(self):
+        pass
+
+
+def test_auto_backend_is_rechecked_after_interval():
+    search = MemberSearch(backend="auto", recheck=0)
+    db = FakeDB(0, 2)
+
+    assert search._resolve_backend(db) == "ngram"
+    # 시작 후 migrations.py로 인덱스가 생긴 경우
+    assert search._resolve_backend(db) == "trigram"
+    assert db.queries == 2
+
+
+def test_concurrent_first_requests_wait_for_backend_check():
+    entered, release = threading.Event(), threading.Event()
+
+    class SlowDB(FakeDB):
+        def execute(self, *args, **kwargs):
+            entered.set()
+            release.wait(2)
+            return super().execute(*args, **kwargs)
+
+    search = MemberSearch(backend="auto", recheck=3600)
+    db = SlowDB(2)
+    results = []
+    first = threading.Thread(target=lambda: results.append(search._resolve_backend(db)))
+    first.start()
+    assert entered.wait(2)
+    second = threading.Thread(target=lambda: results.append(search._resolve_backend(db)))
+    second.start()
+    second.join(0.05)
+    # 확인이 끝나기 전에 n-gram 방식으로 넘어가지 않음
+    assert second.is_alive()
+
+    release.set()
+    first.join(2)
+    second.join(2)
+    assert results == ["trigram", "trigram"]
+    assert db.queries == 1
+
+
+def test_auto_backend_is_cached_within_interval():
+    search = MemberSearch(backend="auto", recheck=3600)
+    db = FakeDB(0)
+
+    search._resolve_backend(db)
+    assert search._resolve_backend(db) == "ngram"
+    assert db.queries == 1
+
+
+@pytest.fixture
+def session(monkeypatch):
+    engine = create_engine("sqlite://")
+    # 인덱스(NULLS LAST 등 PostgreSQL 전용)는 빼고 테이블만 생성
+    with engine.begin() as conn:
+        conn.execute(CreateTable(User.__table__))
+    db = sessionmaker(bind=engine)()
+    db.add(User(user_id=1, name="홍길동", phone_number="010-1111-2222", created_at=datetime(2026, 1, 1)))
+    db.commit()
+
+    search = MemberSearch(backend="ngram")
+    monkeypatch.setattr(search_module, "member_search", search)
+    yield db, search
+    db.close()
+
+
+def test_single_character_term_falls_back_to_like(session):
+    db, search = session
+
+    result = search.apply(db, db.query(User), " 홍 ").all()
+
+    assert [user.user_id for user in result] == [1]
+    assert search._index is None   # n-gram 인덱스를 만들지 않음
+    assert search.stats()["short_terms"] == 1
+
+
+@pytest.mark.parametrize("field, value", [
+    ("name", "김철수"),
+    ("phone_number", "010-3333-4444"),
+    ("deleted_at", datetime(2026, 2, 1)),
+])
+def test_commit_changing_searchable_column_invalidates_index(session, field, value):
+    db, search = session
+    user = db.get(User, 1)
+
+    setattr(user, field, value)
+    db.flush()
+    assert search._generation == 0   # 커밋 전에는 유지
+
+    db.commit()
+    assert search._generation == 1
+
+
+def test_other_column_changes_and_rollbacks_keep_index(session):
+    db, search = session
+    user = db.get(User, 1)
+
+    user.status = "매칭중"
+    db.commit()
+    user.name = "김철수"
+    db.flush()
+    db.rollback()
+
+    assert search._generation == 0
+
+
+def test_insert_delete_and_bulk_update_invalidate_index(session):
+    db, search = session
+
+    db.add(User(user_id=2, name="이영희"))
+    db.commit()
+    db.delete(db.get(User, 2))
+    db.commit()
+    db.query(User).filter(User.user_id == 1).update({"name": "박민수"}, synchronize_session=False)
+    db.commit()
+
+    assert search._generation == 3
+
+
+@pytest.mark.skipif(not os.getenv("MEMBER_SEARCH_BENCH"), reason="MEMBER_SEARCH_BENCH=1일 때만 실행 (100만 명 인덱스 생성에 10초 이상)")
+def test_ngram_lookup_under_10ms_at_one_million_users():
+    rng = random.Random(0)
+    rows = _rows(rng, 1_000_000)
+    index = NgramIndex(rows)
+
+    terms = [name[:rng.randint(2, 3)] for _, name, _ in rng.sample(rows, 100)]
+    terms += [normalize_digits(phone)[3:8] for _, _, phone in rng.sample(rows, 100) if phone]
+    timings = []
+    for term in terms:
+        started = time.perf_counter()
+        index.lookup(term)
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95)]
+    print(f"[Bench] n-gram 검색 {len(timings)}건: p50 {timings[len(timings) // 2] * 1000:.2f}ms, p95 {p95 * 1000:.2f}ms")
+    assert p95 < 0.010
@@ -0,0 +1,85 @@
+# user-service/tests/test_migrations.py
+# 인덱스 마이그레이션이 운영 중인 테이블의 쓰기를 막지 않는지 (CONCURRENTLY + AUTOCOMMIT)
+# 주요 쿼리 인덱스 사용 여부 (EXPLAIN, DB_HOST가 있을 때만)
+import os
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import migrations
+from db import Base, SessionLocal
+
+
+def _declared_indexes():
+    return [index for table in Base.metadata.sorted_tables for index in table.indexes]
+
+
+def test_declared_indexes_are_built_concurrently():
+    for index in _declared_indexes():
+        sql = str(migrations.index_ddl(index).compile(dialect=postgresql.dialect()))
+        assert sql.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS "), sql
+
+
+def test_extension_indexes_are_built_concurrently():
+    for name, sql in migrations.MIGRATIONS:
+        if sql.startswith("CREATE INDEX"):
+            assert sql.startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS "), name
+
+
+class RecordingConnection:
+    def __init__(self, invalid=()):
+        self.invalid = set(invalid)
+        self.isolation_level = None
+        self.statements = []
+
+    def execution_options(self, isolation_level=None):
+        self.isolation_level = isolation_level
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        # 트랜잭션 안에서 실행되면 PostgreSQL이 CONCURRENTLY를 거부함
+        assert self.isolation_level == "AUTOCOMMIT"
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        name = (params or {}).get("name")
+        return type("Result", (), {"first": lambda _self: (1,) if name in self.invalid else None})()
+
+
+class RecordingEngine:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def connect(self):
+        return self.conn
+
+
+def test_create_declared_indexes_runs_on_autocommit_and_rebuilds_invalid(monkeypatch):
+    conn = RecordingConnection(invalid={"ix_meetings_user"})
+    monkeypatch.setattr(migrations, "engine", RecordingEngine(conn))
+
+    results = migrations.create_declared_indexes()
+
+    assert set(results) == {index.name for index in _declared_indexes()}
+    assert all(result == "ok" for result in results.values())
+    drop = conn.statements.index('DROP INDEX CONCURRENTLY IF EXISTS "ix_meetings_user"')
+    create = next(i for i, sql in enumerate(conn.statements) if "IF NOT EXISTS ix_meetings_user " in sql)
+    assert drop < create
+
+
+@pytest.fixture(scope="module")
+def index_usage():
+    # 배포와 같은 순서: 마이그레이션(여러 번 실행해도 안전) 후 실행 계획 확인
+    migrations.run_migrations()
+    return migrations.check_index_usage()
+
+
+@pytest.mark.skipif(not os.getenv("DB_HOST"), reason="PostgreSQL(DB_HOST)이 있을 때만 실행")
+@pytest.mark.parametrize("name", list(migrations.hot_queries(SessionLocal())))
+def test_hot_query_uses_index(index_usage, name):
+    assert index_usage[name], f"{name}: Seq Scan"
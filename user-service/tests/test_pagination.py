@@ -0,0 +1,70 @@
+# user-service/tests/test_pagination.py
+# 키셋 페이징 (SQLite 메모리 DB)
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, Integer, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from pagination import cursor_page, keyset_page
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "rows"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=True)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    base = datetime(2026, 1, 1)
+    # 같은 시각 / NULL 시각이 섞인 24행
+    session.add_all(
+        Row(id=i, created_at=None if i % 7 == 0 else base + timedelta(hours=i // 3))
+        for i in range(1, 25)
+    )
+    session.commit()
+    yield session
+    session.close()
+
+
+def _expected(db):
+    rows = db.query(Row).all()
+    dated = sorted((r for r in rows if r.created_at), key=lambda r: (r.created_at, r.id), reverse=True)
+    undated = sorted((r for r in rows if not r.created_at), key=lambda r: r.id, reverse=True)
+    return [r.id for r in dated + undated]
+
+
+@pytest.mark.parametrize("limit", [1, 3, 5, 24, 30])
+def test_pages_cover_every_row_once_in_order(db, limit):
+    seen, cursor = [], None
+    while True:
+        rows, cursor = keyset_page(db.query(Row), Row.created_at, Row.id, cursor, limit)
+        assert len(rows) <= limit
+        seen.extend(r.id for r in rows)
+        if cursor is None:
+            break
+
+    assert seen == _expected(db)
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_non_positive_limit_is_rejected(db, limit):
+    with pytest.raises(HTTPException) as exc:
+        cursor_page(db.query(Row), Row.created_at, Row.id, None, limit)
+
+    assert exc.value.status_code == 400
+
+
+def test_invalid_cursor_is_rejected(db):
+    with pytest.raises(HTTPException) as exc:
+        keyset_page(db.query(Row), Row.created_at, Row.id, "not-a-cursor", 5)
+
+    assert exc.value.status_code == 400
@@ -0,0 +1,77 @@
+# user-service/tests/test_stats.py
+# StatsSnapshot: 집계 도중 들어온 증감분과 스냅샷 설치 순서
+import pytest
+
+import stats
+from stats import StatsSnapshot
+
+DELTA = frozenset({("meetings", "total")})
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """meetings 집계 함수를 호출 순서대로 값을 돌려주는 대역으로 교체"""
+    calls = []
+
+    def install(*results, during_load=None):
+        def loader(db):
+            calls.append(db)
+            if during_load:
+                during_load(len(calls))
+            return dict(results[len(calls) - 1])
+        monkeypatch.setitem(stats.STATS_LOADERS, "meetings", loader)
+        return calls
+
+    return install
+
+
+def test_cached_snapshot_receives_deltas(loads):
+    snapshot = StatsSnapshot(ttl=60)
+    calls = loads({"total": 3})
+
+    assert snapshot.get(None, "meetings") == {"total": 3}
+    snapshot.apply_change(frozenset(), DELTA)
+
+    assert snapshot.get(None, "meetings") == {"total": 4}
+    assert len(calls) == 1
+
+
+def test_load_overlapping_a_delta_is_not_installed(loads):
+    snapshot = StatsSnapshot(ttl=60)
+
+    def write_during_first_load(n):
+        # 집계 결과가 이 행을 포함하는지 알 수 없음
+        if n == 1:
+            snapshot.apply_change(frozenset(), DELTA)
+
+    calls = loads({"total": 4}, {"total": 4}, during_load=write_during_first_load)
+
+    assert snapshot.get(None, "meetings") == {"total": 4}
+    # 버려진 결과에 증감분이 두 번 적용되지 않고 다시 집계
+    assert snapshot.get(None, "meetings") == {"total": 4}
+    assert len(calls) == 2
+    assert snapshot.stats()["discarded_loads"] == 1
+
+    assert snapshot.get(None, "meetings") == {"total": 4}
+    assert len(calls) == 2
+
+
+def test_invalidate_during_load_discards_result(loads):
+    snapshot = StatsSnapshot(ttl=60)
+    calls = loads({"total": 1}, {"total": 2}, during_load=lambda n: n == 1 and snapshot.invalidate())
+
+    snapshot.get(None, "meetings")
+
+    assert snapshot.get(None, "meetings") == {"total": 2}
+    assert len(calls) == 2
+
+
+def test_delta_for_other_group_keeps_load(loads):
+    snapshot = StatsSnapshot(ttl=60)
+    other = frozenset({("reviews", "total")})
+    calls = loads({"total": 5}, during_load=lambda n: snapshot.apply_change(frozenset(), other))
+
+    snapshot.get(None, "meetings")
+
+    assert snapshot.get(None, "meetings") == {"total": 5}
+    assert len(calls) == 1
@@ -0,0 +1,74 @@
+# user-service/user_export.py
+# 전체 회원 스트리밍 내보내기 (NDJSON / CSV)
+import csv
+import io
+import json
+import os
+
+from db import SessionLocal, User
+
+# 서버 측 커서에서 한 번에 가져올 행 수
+EXPORT_BATCH_SIZE = int(os.getenv("USER_EXPORT_BATCH_SIZE", "1000"))
+
+# /admin/users 응답(UserOut)과 같은 필드
+EXPORT_FIELDS = [
+    "user_id", "name", "email", "phone_number", "age", "gender", "birth_date",
+    "matching_count", "status", "first_consultation", "last_consultation",
+    "consultation_count", "matched_partner"
+]
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _iter_batches(batch_size: int = EXPORT_BATCH_SIZE):
+    """
+    회원 행을 배치 단위로 조회
+    - 필요한 컬럼만 튜플로 조회 (ORM 객체/identity map 누적 없음)
+    - stream_results + yield_per로 서버 측 커서 사용 → 메모리 사용량 일정
+    - 스트리밍 중 요청 세션이 닫히므로 자체 세션 사용
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            db.query(*(getattr(User, f) for f in EXPORT_FIELDS))
+            .order_by(User.user_id)
+            .statement
+            .execution_options(stream_results=True, yield_per=batch_size)
+        )
+        for batch in result.partitions():
+            yield batch
+    finally:
+        db.close()
+
+
+def iter_ndjson():
+    for batch in _iter_batches():
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False, default=str) + "\n"
+            for row in batch
+        )
+
+
+def iter_csv():
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+    buffer.write("\ufeff")
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue()
+
+    for batch in _iter_batches():
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue()
+
+
+EXPORT_WRITERS = {
+    "ndjson": iter_ndjson,
+    "csv": iter_csv,
+}